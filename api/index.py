@@ -1,6 +1,10 @@
 """
 Vercel serverless function entry point.
 This file wraps the Flask application for Vercel's Python runtime.
+
+Module-level state (the Flask app, the botocore model loader, cached sessions
+and clients in `aws_runtime`) survives across warm invocations of the same
+instance; only a cold start pays for building it.
 """
 import os
 import sys
@@ -9,7 +13,12 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app import app
+from aws_runtime import start_preload
+
+# Load the SNS/SQS/CloudWatch/STS models in the background while the first
+# request is routed (set AWS_PRELOAD_MODELS=0 to disable)
+if os.environ.get("AWS_PRELOAD_MODELS", "1") != "0":
+    start_preload()
 
 # Vercel expects the app to be named 'app' or 'handler'
 # Flask apps work directly with Vercel's Python runtime
-
@@ -1,31 +1,46 @@
 #!/usr/bin/env python3
+import hashlib
+import io
 import os
 import sys
 import json
-import webbrowser
+import tempfile
 import threading
 import time
 from typing import Dict, List, Optional
 
 from datetime import datetime, timedelta
 
-from flask import Flask, render_template, request, jsonify, send_file
-import boto3
+from flask import Flask, Response, render_template, request, jsonify, send_file
 
-# Keyring is optional - not available in serverless environments like Vercel
+# Keyring is optional - not available in serverless environments like Vercel.
+# It is imported on first use (get_keyring) to keep it off the cold-start path.
 IS_VERCEL = os.environ.get("VERCEL") == "1"
 keyring = None
-if not IS_VERCEL:
-    try:
-        import keyring as _keyring
-        keyring = _keyring
-    except ImportError:
-        pass
+_keyring_loaded = IS_VERCEL
+
+def get_keyring():
+    global keyring, _keyring_loaded
+    if not _keyring_loaded:
+        _keyring_loaded = True
+        if keyring is None:
+            try:
+                import keyring as _keyring
+                keyring = _keyring
+            except ImportError:
+                pass
+    return keyring
 
 # Import logic from existing map script to reuse AWS logic
 # We need to make sure aws_sns_sqs_map is importable
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from aws_sns_sqs_map import get_session, build_inventory, to_mermaid
+from aws_sns_sqs_map import get_session, build_inventory, discover_regions, to_mermaid
+from aws_runtime import cached_client, credential_scope
+from aws_metrics import REGISTRY as AWS_METRICS
+from scan_trace import ScanTracer
+from json_response import json_response
+# Exporters, the inventory index, the shared cache and the latency stores are
+# imported by the routes that use them, to keep them off the cold-start path.
 
 # Configure Flask with absolute paths for Vercel compatibility
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -36,12 +51,40 @@ app = Flask(
 )
 SERVICE_NAME = "aws-sns-sqs-gui"
 
+# Shared cache lifetimes in seconds (see shared_cache.get_cache: per process or shared by workers)
+SCAN_CACHE_TTL = 30
+STATS_CACHE_TTL = 300
+QUEUE_URL_CACHE_TTL = 3600
+
+# Inventory index shared by all requests (and worker processes, through the SQLite file)
+_inventory_index = None
+_inventory_index_lock = threading.Lock()
+
+def cache_key(kind: str, session, *parts) -> str:
+    """Cache key scoped to the credentials the session resolves to (secrets only enter through a digest).
+
+    Profiles and the default chain are scoped by their actual credentials, not by name.
+    """
+    scope = credential_scope(session)
+    digest = hashlib.sha256(json.dumps([kind, scope, list(parts)], default=str).encode("utf-8")).hexdigest()
+    return f"{kind}:{digest}"
+
+def get_inventory_index():
+    global _inventory_index
+    if _inventory_index is None:
+        with _inventory_index_lock:
+            if _inventory_index is None:
+                from inventory_index import DEFAULT_INDEX_PATH, InventoryIndex
+                _inventory_index = InventoryIndex(os.environ.get("INVENTORY_INDEX_PATH", DEFAULT_INDEX_PATH))
+    return _inventory_index
+
 @app.route("/")
 def index():
     return render_template("index.html")
 
 @app.route("/api/credentials", methods=["GET", "POST"])
 def credentials():
+    keyring = get_keyring()
     if request.method == "GET":
         # Load saved credentials (only available in local environment with keyring)
         if keyring is None:
@@ -120,7 +163,7 @@ def test_connection():
             secret_key=data.get("secret_key"),
             session_token=data.get("session_token")
         )
-        sts = session.client("sts")
+        sts = cached_client(session, "sts")
         identity = sts.get_caller_identity()
         return jsonify({
             "success": True,
@@ -134,7 +177,7 @@ def test_connection():
 def scan():
     data = request.json
     regions = [r.strip() for r in data.get("regions", "").split(",") if r.strip()]
-    if not regions:
+    if not regions and not data.get("all_regions"):
         regions = ["us-east-1"]
 
     try:
@@ -144,11 +187,97 @@ def scan():
             secret_key=data.get("secret_key"),
             session_token=data.get("session_token")
         )
-        inventory = build_inventory(session, regions)
-        return jsonify(inventory)
+        from shared_cache import get_cache
+
+        # Optional profiling: {"trace": true} returns a Chrome trace-event JSON alongside the inventory
+        tracer = ScanTracer() if data.get("trace") else None
+
+        def run_scan():
+            scan_regions = regions
+            if data.get("all_regions"):
+                # Probe every enabled region (or only the given ones) and scan those holding resources
+                scan_regions = discover_regions(session, candidates=regions or None, tracer=tracer)
+            # Optional {"deadline": seconds, "hedge_after": seconds}; each region reports its own "status"
+            return build_inventory(session, scan_regions, tracer=tracer, sharded_queues=bool(data.get("sharded_queues")),
+                                   deadline=data.get("deadline"), hedge_after=data.get("hedge_after"))
+
+        if tracer or data.get("refresh"):
+            inventory = run_scan()
+        else:
+            # Identical scans within SCAN_CACHE_TTL (from any worker) share one scan; incomplete ones are not kept
+            key = cache_key("inventory", session, sorted(regions), bool(data.get("all_regions")), bool(data.get("sharded_queues")),
+                            data.get("deadline"), data.get("hedge_after"))
+            inventory = get_cache().get_or_compute(
+                key, run_scan, SCAN_CACHE_TTL,
+                should_cache=lambda inv: all((item.get("status") or {}).get("state", "ok") == "ok" for item in inv))
+        if data.get("index"):
+            # Server-side index: return only a summary, the UI pages through /api/inventory/<scan_id>/...
+            scan_id = get_inventory_index().add(inventory)
+            return json_response(get_inventory_index().summary(scan_id))
+        if tracer:
+            return json_response({"inventory": inventory, "trace": tracer.to_chrome_trace()})
+        return json_response(inventory)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/inventory", methods=["POST"])
+def index_inventory():
+    """Index an inventory (as returned by /api/scan) for server-side search"""
+    inventory = request.json
+    try:
+        scan_id = get_inventory_index().add(inventory)
+        return json_response(get_inventory_index().summary(scan_id))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/inventory/<scan_id>", methods=["GET"])
+def inventory_summary(scan_id):
+    summary = get_inventory_index().summary(scan_id)
+    if summary is None:
+        return jsonify({"error": f"Unknown scan id: {scan_id}"}), 404
+    return json_response(summary)
+
+@app.route("/api/inventory/<scan_id>/raw", methods=["GET"])
+def inventory_raw(scan_id):
+    """The whole indexed inventory, as /api/scan returns it (for exports and diagrams)"""
+    inventory = get_inventory_index().inventory(scan_id)
+    if inventory is None:
+        return jsonify({"error": f"Unknown scan id: {scan_id}"}), 404
+    return json_response(inventory)
+
+@app.route("/api/inventory/<scan_id>/<kind>", methods=["GET"])
+def inventory_query(scan_id, kind):
+    """Paginated topics / queues / links: ?region=&prefix=&q=&orphans=1&sort=name&order=asc&limit=100&offset=0"""
+    index = get_inventory_index()
+    if index.summary(scan_id) is None:
+        return jsonify({"error": f"Unknown scan id: {scan_id}"}), 404
+    args = request.args
+    try:
+        if kind == "links":
+            page = index.links(
+                scan_id,
+                topic_arn=args.get("topic_arn"),
+                queue_arn=args.get("queue_arn"),
+                limit=args.get("limit", 100, type=int),
+                offset=args.get("offset", 0, type=int),
+            )
+        else:
+            page = index.query(
+                scan_id,
+                kind,
+                region=args.get("region"),
+                prefix=args.get("prefix"),
+                search=args.get("q"),
+                orphans=args.get("orphans") in ("1", "true"),
+                sort=args.get("sort", "name"),
+                order=args.get("order", "asc"),
+                limit=args.get("limit", 100, type=int),
+                offset=args.get("offset", 0, type=int),
+            )
+        return json_response(page)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
 @app.route("/api/stats", methods=["POST"])
 def get_stats():
     data = request.json
@@ -175,21 +304,21 @@ def get_stats():
             secret_key=data.get("secret_key"),
             session_token=data.get("session_token")
         )
+        from shared_cache import get_cache
 
         end_time = datetime.utcnow()
         start_time = end_time - timedelta(days=28)  # 4 weeks
 
         for region, region_items in by_region.items():
-            cw = session.client("cloudwatch", region_name=region)
+            cw = cached_client(session, "cloudwatch", region)
             
             for item in region_items:
                 arn = item.get("arn")
                 rtype = item.get("type") # 'topic' or 'queue'
                 name = item.get("name")
                 
-                metrics = {}
-                
-                try:
+                def fetch_metrics():
+                    metrics = {}
                     if rtype == 'topic':
                         # SNS: NumberOfMessagesPublished
                         resp = cw.get_metric_statistics(
@@ -224,13 +353,18 @@ def get_stats():
                                 # Sum all datapoints over the 28 days
                                 val = int(sum(dp['Sum'] for dp in resp['Datapoints']))
                             metrics[metric.lower() + '_28d'] = val
-                            
+                    return metrics
+                
+                try:
+                    # 28-day daily sums move slowly: shared by requests and workers for STATS_CACHE_TTL
+                    metrics = get_cache().get_or_compute(cache_key("stats", session, region, rtype, arn or name),
+                                                         fetch_metrics, STATS_CACHE_TTL)
                 except Exception as e:
-                    metrics['error'] = str(e)
+                    metrics = {'error': str(e)}
                 
                 results[arn] = metrics
 
-        return jsonify(results)
+        return json_response(results)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -259,8 +393,12 @@ def monitor():
             session_token=data.get("session_token")
         )
         
+        from delivery_latency import LATENCIES
+        from shared_cache import get_cache
+
+        latencies = LATENCIES.store(credential_scope(session))
         for region, region_items in by_region.items():
-            sqs = session.client('sqs', region_name=region)
+            sqs = cached_client(session, "sqs", region)
             
             for item in region_items:
                 arn = item.get("arn")
@@ -271,7 +409,7 @@ def monitor():
                 if rtype != 'queue':
                     continue
                 
-                try:
+                def resolve_queue_url():
                     # Get queue URL from ARN
                     queue_url = None
                     if arn and arn.startswith('arn:') and ':sqs:' in arn:
@@ -288,6 +426,12 @@ def monitor():
                                     queue_url = urls[0]
                             except Exception:
                                 pass
+                    return queue_url
+                
+                try:
+                    # Queue URLs do not change: resolved once per QUEUE_URL_CACHE_TTL instead of on every poll
+                    queue_url = get_cache().get_or_compute(cache_key("queue_url", session, region, arn),
+                                                           resolve_queue_url, QUEUE_URL_CACHE_TTL)
                     
                     if not queue_url:
                         continue
@@ -302,6 +446,7 @@ def monitor():
                     )
                     
                     messages = resp.get('Messages', [])
+                    observed_ms = time.time() * 1000.0
                     
                     if messages:
                         for msg in messages:
@@ -322,7 +467,7 @@ def monitor():
                             else:
                                 timestamp = datetime.utcnow().isoformat()
                             
-                            results.append({
+                            event = {
                                 'timestamp': timestamp,
                                 'type': 'message',
                                 'resource': name,
@@ -332,7 +477,13 @@ def monitor():
                                 'region': region,
                                 'message_id': msg_id,
                                 'body': body[:500]  # Limit body to 500 chars for UI
-                            })
+                            }
+                            # SNS envelope: record the topic -> queue delivery latency
+                            delivery = latencies.observe(arn, msg, observed_ms)
+                            if delivery:
+                                event['topic_arn'] = delivery['topic_arn']
+                                event['delays_ms'] = delivery['delays_ms']
+                            results.append(event)
                             
                             # Make message visible again immediately (non-destructive read)
                             try:
@@ -362,341 +513,134 @@ def monitor():
         # Sort by timestamp descending (most recent first)
         results.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
         
-        return jsonify(results)
+        return json_response(results)
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def caller_latencies(data):
+    """Delivery latencies recorded by /api/monitor with the credentials (profile or keys) given in `data`."""
+    from delivery_latency import LATENCIES
+
+    session = get_session(
+        profile=data.get("profile"),
+        access_key=data.get("access_key"),
+        secret_key=data.get("secret_key"),
+        session_token=data.get("session_token")
+    )
+    return LATENCIES.lookup(credential_scope(session))
+
+@app.route("/api/latency", methods=["POST"])
+def delivery_latency():
+    """Per topic -> queue delivery latency histograms of the caller's monitored messages (?buckets=1 for mergeable counts)"""
+    data = request.json or {}
+    try:
+        latencies = caller_latencies(data)
+        return json_response(latencies.snapshot(buckets=request.args.get("buckets") in ("1", "true")))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route("/api/export/mermaid", methods=["POST"])
 def export_mermaid():
-    inventory = request.json
+    # The inventory list, or {"inventory": [...]} plus credentials to label edges with their latency
+    payload = request.json
+    inventory = payload.get("inventory") if isinstance(payload, dict) else payload
     try:
-        content = to_mermaid(inventory)
-        return jsonify({"content": content})
+        # ?latency=1 labels topic -> queue edges with their p50 / p99 delivery latency
+        labels = None
+        if request.args.get("latency") in ("1", "true"):
+            labels = caller_latencies(payload if isinstance(payload, dict) else {}).edge_labels()
+        content = to_mermaid(inventory, edge_labels=labels)
+        return json_response({"content": content})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/diff", methods=["POST"])
+def diff():
+    """Change set between two inventories: {"old": [...], "new": [...], "format": "json"|"mermaid"}"""
+    from inventory_diff import diff_inventories, diff_to_mermaid
+
+    payload = request.json or {}
+    if not isinstance(payload.get("old"), list) or not isinstance(payload.get("new"), list):
+        return jsonify({"error": "Both 'old' and 'new' inventories are required"}), 400
+    try:
+        changes = diff_inventories(payload["old"], payload["new"])
+        if payload.get("format") == "mermaid":
+            return json_response({"summary": changes["summary"], "content": diff_to_mermaid(changes)})
+        return json_response(changes)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route("/api/export/sql", methods=["POST"])
 def export_sql():
-    # Simple SQL generation based on inventory
+    """SQL export: ?mode=inserts (multi-row INSERTs, default), copy (PostgreSQL COPY) or sqlite (database file)"""
+    from sql_export import DEFAULT_BATCH_SIZE, to_sql_copy, to_sql_inserts, write_sqlite
+
     inventory = request.json
+    mode = request.args.get("mode", "inserts")
     try:
-        ddl_parts = [
-            "CREATE TABLE sns_topic (arn VARCHAR(2048) PRIMARY KEY, name VARCHAR(255), region VARCHAR(64));",
-            "CREATE TABLE sqs_queue (arn VARCHAR(2048) PRIMARY KEY, name VARCHAR(255), url VARCHAR(2048), region VARCHAR(64));",
-            "CREATE TABLE subscription (topic_arn VARCHAR(2048), queue_arn VARCHAR(2048), region VARCHAR(64), PRIMARY KEY (topic_arn, queue_arn));"
-        ]
-        
-        # Generate INSERTs
-        inserts = []
-        for item in inventory:
-            region = item.get("region", "")
-            for t in item.get("topics", []):
-                inserts.append(f"INSERT INTO sns_topic VALUES ('{t['arn']}', '{t['name']}', '{region}');")
-            for q in item.get("queues", []):
-                inserts.append(f"INSERT INTO sqs_queue VALUES ('{q['arn']}', '{q['name']}', '{q['url']}', '{region}');")
-            for l in item.get("links", []):
-                inserts.append(f"INSERT INTO subscription VALUES ('{l['from_arn']}', '{l['to_arn']}', '{region}');")
-
-        return jsonify({"content": "\n".join(ddl_parts + [""] + inserts)})
+        if mode == "sqlite":
+            fd, path = tempfile.mkstemp(suffix=".sqlite")
+            os.close(fd)
+            try:
+                write_sqlite(inventory, path)
+                with open(path, "rb") as f:
+                    data = f.read()
+            finally:
+                os.remove(path)
+            return send_file(io.BytesIO(data), mimetype="application/vnd.sqlite3", as_attachment=True, download_name="inventory.sqlite")
+        if mode == "copy":
+            return json_response({"content": to_sql_copy(inventory)})
+        if mode == "inserts":
+            batch_size = request.args.get("batch_size", DEFAULT_BATCH_SIZE, type=int)
+            return json_response({"content": to_sql_inserts(inventory, batch_size=batch_size)})
+        return jsonify({"error": f"Unknown SQL export mode: {mode}"}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route("/api/export/canvas", methods=["POST"])
 def export_canvas():
     """Export inventory to JSON Canvas format (compatible with Obsidian)"""
+    from diagram_export import to_canvas
+
     inventory = request.json
     try:
-        # JSON Canvas structure: { "nodes": [...], "edges": [...] }
-        nodes = []
-        edges = []
-        
-        # Build maps for positioning
-        topic_map = {}
-        queue_map = {}
-        arn_to_node_id = {}
-        node_id_counter = 1
-        
-        # Layout parameters
-        start_x = 100
-        start_y = 100
-        topic_x = start_x
-        topic_y = start_y
-        queue_x = start_x + 400
-        queue_y = start_y
-        spacing_y = 120
-        node_width = 200
-        node_height = 80
-        
-        # Collect all topics and queues
-        all_topics = []
-        all_queues = []
-        topic_to_queues = {}
-        
-        for item in inventory:
-            region = item.get("region", "")
-            for t in item.get("topics", []):
-                topic_arn = t.get("arn")
-                topic_name = t.get("name", "")
-                all_topics.append({
-                    "arn": topic_arn,
-                    "name": topic_name,
-                    "region": region
-                })
-                if topic_arn not in topic_to_queues:
-                    topic_to_queues[topic_arn] = []
-                topic_map[topic_arn] = {"name": topic_name, "region": region}
-            
-            for q in item.get("queues", []):
-                queue_arn = q.get("arn")
-                queue_name = q.get("name", "")
-                all_queues.append({
-                    "arn": queue_arn,
-                    "name": queue_name,
-                    "region": region
-                })
-                queue_map[queue_arn] = {"name": queue_name, "region": region}
-            
-            for link in item.get("links", []):
-                topic_arn = link.get("from_arn")
-                queue_arn = link.get("to_arn")
-                if topic_arn and queue_arn:
-                    if topic_arn not in topic_to_queues:
-                        topic_to_queues[topic_arn] = []
-                    topic_to_queues[topic_arn].append(queue_arn)
-        
-        # Create topic nodes
-        current_topic_y = topic_y
-        for topic in all_topics:
-            topic_arn = topic["arn"]
-            node_id = f"node_{node_id_counter}"
-            arn_to_node_id[topic_arn] = node_id
-            node_id_counter += 1
-            
-            # Create topic node
-            nodes.append({
-                "id": node_id,
-                "type": "text",
-                "x": topic_x,
-                "y": current_topic_y,
-                "width": node_width,
-                "height": node_height,
-                "text": f"**{topic['name']}**\n*Topic*\n{topic['region']}",
-                "color": "1"
-            })
-            current_topic_y += spacing_y
-        
-        # Create queue nodes
-        current_queue_y = queue_y
-        for queue in all_queues:
-            queue_arn = queue["arn"]
-            node_id = f"node_{node_id_counter}"
-            arn_to_node_id[queue_arn] = node_id
-            node_id_counter += 1
-            
-            # Create queue node
-            nodes.append({
-                "id": node_id,
-                "type": "text",
-                "x": queue_x,
-                "y": current_queue_y,
-                "width": node_width,
-                "height": node_height,
-                "text": f"**{queue['name']}**\n*Queue*\n{queue['region']}",
-                "color": "2"
-            })
-            current_queue_y += spacing_y
-        
-        # Create edges (connections from topics to queues)
-        edge_id_counter = 1
-        for topic_arn, queue_arns in topic_to_queues.items():
-            topic_node_id = arn_to_node_id.get(topic_arn)
-            if not topic_node_id:
-                continue
-            
-            for queue_arn in queue_arns:
-                queue_node_id = arn_to_node_id.get(queue_arn)
-                if not queue_node_id:
-                    continue
-                
-                edges.append({
-                    "id": f"edge_{edge_id_counter}",
-                    "fromNode": topic_node_id,
-                    "fromSide": "right",
-                    "toNode": queue_node_id,
-                    "toSide": "left"
-                })
-                edge_id_counter += 1
-        
-        canvas_data = {
-            "nodes": nodes,
-            "edges": edges
-        }
-        
-        return jsonify(canvas_data)
+        return json_response(to_canvas(inventory))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route("/api/export/drawio", methods=["POST"])
 def export_drawio():
+    from diagram_export import to_drawio
+
     inventory = request.json
     try:
-        # Basic Draw.io XML structure
-        xml_parts = [
-            '<mxfile host="app.diagrams.net" modified="2023-01-01T00:00:00.000Z" agent="AWS-Manager" version="21.0.0" type="device">',
-            '  <diagram id="aws-diagram" name="AWS Resources">',
-            '    <mxGraphModel dx="1422" dy="798" grid="1" gridSize="10" guides="1" tooltips="1" connect="1" arrows="1" fold="1" page="1" pageScale="1" pageWidth="827" pageHeight="1169" math="0" shadow="0">',
-            '      <root>',
-            '        <mxCell id="0" />',
-            '        <mxCell id="1" parent="0" />'
-        ]
-
-        # Styles
-        style_topic = "rounded=1;whiteSpace=wrap;html=1;fillColor=#dae8fc;strokeColor=#6c8ebf;fontStyle=1;"
-        style_queue = "shape=cylinder3;whiteSpace=wrap;html=1;boundedLbl=1;backgroundOutline=1;size=15;fillColor=#ffe6cc;strokeColor=#d79b00;fontStyle=1;"
-        style_edge = "edgeStyle=orthogonalEdgeStyle;rounded=0;orthogonalLoop=1;jettySize=auto;html=1;"
-
-        # Build subscription map: topic_arn -> [queue_arns]
-        topic_to_queues = {}
-        all_topics = set()
-        all_queues = set()
-        
-        for item in inventory:
-            for t in item.get("topics", []):
-                all_topics.add(t["arn"])
-                if t["arn"] not in topic_to_queues:
-                    topic_to_queues[t["arn"]] = []
-            
-            for q in item.get("queues", []):
-                all_queues.add(q["arn"])
-            
-            for link in item.get("links", []):
-                topic_arn = link.get("from_arn")
-                queue_arn = link.get("to_arn")
-                if topic_arn and queue_arn:
-                    if topic_arn not in topic_to_queues:
-                        topic_to_queues[topic_arn] = []
-                    topic_to_queues[topic_arn].append(queue_arn)
-        
-        # Find unsubscribed queues
-        subscribed_queues = set()
-        for queues in topic_to_queues.values():
-            subscribed_queues.update(queues)
-        unsubscribed_queues = all_queues - subscribed_queues
-        
-        # Find topics with no subscriptions
-        topics_with_subs = [t for t in all_topics if topic_to_queues.get(t)]
-        topics_without_subs = [t for t in all_topics if not topic_to_queues.get(t)]
-        
-        # Get topic and queue objects
-        topic_map = {}
-        queue_map = {}
-        for item in inventory:
-            for t in item.get("topics", []):
-                topic_map[t["arn"]] = t
-            for q in item.get("queues", []):
-                queue_map[q["arn"]] = q
-        
-        # Layout parameters
-        arn_to_id = {}
-        current_id = 2
-        
-        start_x = 40
-        column_width = 200
-        topic_y = 40
-        queue_start_y = 150
-        queue_spacing_y = 80
-        topic_w = 160
-        topic_h = 60
-        queue_w = 120
-        queue_h = 60
-        
-        current_x = start_x
-        
-        # Layout topics with subscriptions and their queues
-        for topic_arn in topics_with_subs:
-            topic = topic_map.get(topic_arn)
-            if not topic:
-                continue
-            
-            # Add topic
-            xml_parts.append(f'        <mxCell id="{current_id}" value="{topic["name"]}" style="{style_topic}" vertex="1" parent="1">')
-            xml_parts.append(f'          <mxGeometry x="{current_x}" y="{topic_y}" width="{topic_w}" height="{topic_h}" as="geometry" />')
-            xml_parts.append('        </mxCell>')
-            arn_to_id[topic_arn] = current_id
-            current_id += 1
-            
-            # Add subscribed queues below this topic
-            queue_y = queue_start_y
-            for queue_arn in topic_to_queues[topic_arn]:
-                queue = queue_map.get(queue_arn)
-                if not queue or queue_arn in arn_to_id:
-                    continue
-                
-                xml_parts.append(f'        <mxCell id="{current_id}" value="{queue["name"]}" style="{style_queue}" vertex="1" parent="1">')
-                xml_parts.append(f'          <mxGeometry x="{current_x}" y="{queue_y}" width="{queue_w}" height="{queue_h}" as="geometry" />')
-                xml_parts.append('        </mxCell>')
-                arn_to_id[queue_arn] = current_id
-                current_id += 1
-                queue_y += queue_spacing_y
-            
-            # Move to next column
-            current_x += column_width
-        
-        # Add topics without subscriptions
-        for topic_arn in topics_without_subs:
-            topic = topic_map.get(topic_arn)
-            if not topic:
-                continue
-            
-            xml_parts.append(f'        <mxCell id="{current_id}" value="{topic["name"]}" style="{style_topic}" vertex="1" parent="1">')
-            xml_parts.append(f'          <mxGeometry x="{current_x}" y="{topic_y}" width="{topic_w}" height="{topic_h}" as="geometry" />')
-            xml_parts.append('        </mxCell>')
-            arn_to_id[topic_arn] = current_id
-            current_id += 1
-            current_x += column_width
-        
-        # Add unsubscribed queues at the end
-        queue_y = queue_start_y
-        for queue_arn in unsubscribed_queues:
-            queue = queue_map.get(queue_arn)
-            if not queue:
-                continue
-            
-            xml_parts.append(f'        <mxCell id="{current_id}" value="{queue["name"]}" style="{style_queue}" vertex="1" parent="1">')
-            xml_parts.append(f'          <mxGeometry x="{current_x}" y="{queue_y}" width="{queue_w}" height="{queue_h}" as="geometry" />')
-            xml_parts.append('        </mxCell>')
-            arn_to_id[queue_arn] = current_id
-            current_id += 1
-            queue_y += queue_spacing_y
-            
-            # If too many unsubscribed queues, move to next column
-            if queue_y > 600:
-                current_x += column_width
-                queue_y = queue_start_y
-
-        # Add Links
-        for item in inventory:
-            for l in item.get("links", []):
-                source_id = arn_to_id.get(l["from_arn"])
-                target_id = arn_to_id.get(l["to_arn"])
-                
-                if source_id and target_id:
-                    xml_parts.append(f'        <mxCell id="{current_id}" value="" style="{style_edge}" edge="1" parent="1" source="{source_id}" target="{target_id}">')
-                    xml_parts.append('          <mxGeometry relative="1" as="geometry" />')
-                    xml_parts.append('        </mxCell>')
-                    current_id += 1
-
-        xml_parts.append('      </root>')
-        xml_parts.append('    </mxGraphModel>')
-        xml_parts.append('  </diagram>')
-        xml_parts.append('</mxfile>')
-
-        return jsonify({"content": "\n".join(xml_parts)})
+        return json_response({"content": to_drawio(inventory)})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/export/bundle", methods=["POST"])
+def export_bundle():
+    """Zip of several formats rendered in one pass: ?formats=json,mermaid,sql,sql-copy,sqlite,drawio,canvas"""
+    from export_bundle import iter_bundle, parse_formats
+
+    inventory = request.json
+    if not isinstance(inventory, list):
+        return jsonify({"error": "An inventory (JSON array) is required"}), 400
+    try:
+        formats = parse_formats(request.args.get("formats"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return Response(iter_bundle(inventory, formats), mimetype="application/zip",
+                    headers={"Content-Disposition": "attachment; filename=inventory-bundle.zip"})
+
+@app.route("/api/metrics", methods=["GET"])
+def metrics():
+    """AWS call metrics (counts, retries, throttles, latency) in Prometheus text format"""
+    return Response(AWS_METRICS.render_prometheus(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
 def open_browser():
+    import webbrowser
     time.sleep(1.5)
     webbrowser.open("http://127.0.0.1:5000")
 
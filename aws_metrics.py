@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Per-AWS-call instrumentation based on botocore event hooks.
+
+Hooks are registered on the boto3 session so that every client created from it
+records, per (service, operation, region): call count, errors, retries,
+throttles and a latency histogram. Metrics can be rendered in the Prometheus
+text format (`/api/metrics`) or as a short timing summary for the CLI.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Latency histogram buckets in seconds (Prometheus client defaults)
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+THROTTLE_ERROR_CODES = frozenset({
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottled",
+    "RequestThrottledException",
+    "RequestLimitExceeded",
+    "TooManyRequestsException",
+    "SlowDown",
+    "AWS.SimpleQueueService.RequestThrottled",
+})
+
+_START_KEY = "aws_metrics_start"
+_UNIQUE_PREFIX = "aws-metrics"
+
+MetricKey = Tuple[str, str, str]  # (service, operation, region)
+
+
+class _OperationStats:
+    __slots__ = ("calls", "errors", "retries", "throttles", "latency_sum", "buckets")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.throttles = 0
+        self.latency_sum = 0.0
+        # One counter per bucket plus the +Inf bucket (non-cumulative)
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, latency: float) -> None:
+        self.latency_sum += latency
+        for idx, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.buckets[idx] += 1
+                return
+        self.buckets[-1] += 1
+
+
+class CallMetrics:
+    """Thread-safe registry of AWS call metrics."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[MetricKey, _OperationStats] = {}
+
+    def _get(self, key: MetricKey) -> _OperationStats:
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _OperationStats()
+        return stats
+
+    def record_call(self, service: str, operation: str, region: str, latency: float,
+                    retries: int = 0, error: bool = False) -> None:
+        with self._lock:
+            stats = self._get((service, operation, region))
+            stats.calls += 1
+            stats.retries += retries
+            if error:
+                stats.errors += 1
+            stats.observe(latency)
+
+    def record_throttle(self, service: str, operation: str, region: str) -> None:
+        with self._lock:
+            self._get((service, operation, region)).throttles += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self) -> Dict[MetricKey, Dict[str, object]]:
+        """Return a plain-dict copy of the current metrics."""
+        with self._lock:
+            return {
+                key: {
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "retries": s.retries,
+                    "throttles": s.throttles,
+                    "latency_sum": s.latency_sum,
+                    "buckets": list(s.buckets),
+                }
+                for key, s in self._stats.items()
+            }
+
+    def render_prometheus(self) -> str:
+        """Render metrics in the Prometheus text exposition format (0.0.4)."""
+        snap = self.snapshot()
+        keys = sorted(snap)
+        lines: List[str] = []
+
+        counters = [
+            ("aws_api_calls_total", "calls", "AWS API calls by service, operation and region."),
+            ("aws_api_call_errors_total", "errors", "AWS API calls that ended in an error."),
+            ("aws_api_retries_total", "retries", "Retry attempts made by botocore."),
+            ("aws_api_throttles_total", "throttles", "Attempts rejected with a throttling error."),
+        ]
+        for name, field, help_text in counters:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for key in keys:
+                lines.append(f"{name}{{{_labels(key)}}} {snap[key][field]}")
+
+        name = "aws_api_call_duration_seconds"
+        lines.append(f"# HELP {name} AWS API call latency, including retries.")
+        lines.append(f"# TYPE {name} histogram")
+        for key in keys:
+            labels = _labels(key)
+            buckets: List[int] = snap[key]["buckets"]  # type: ignore
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, buckets):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += buckets[-1]
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {snap[key]['latency_sum']:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {cumulative}")
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Human-readable timing summary, slowest operations first."""
+        snap = self.snapshot()
+        if not snap:
+            return "No AWS calls recorded."
+        rows = sorted(snap.items(), key=lambda kv: kv[1]["latency_sum"], reverse=True)  # type: ignore
+        header = f"{'service':<12} {'operation':<28} {'region':<16} {'calls':>6} {'retries':>7} {'throttles':>9} {'total s':>9} {'avg ms':>8}"
+        lines = [header, "-" * len(header)]
+        for (service, operation, region), s in rows:
+            calls = s["calls"] or 1
+            total = float(s["latency_sum"])  # type: ignore
+            lines.append(
+                f"{service:<12} {operation:<28} {region:<16} {s['calls']:>6} {s['retries']:>7} "
+                f"{s['throttles']:>9} {total:>9.3f} {total / calls * 1000:>8.1f}"
+            )
+        return "\n".join(lines)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(key: MetricKey) -> str:
+    service, operation, region = key
+    return f'service="{_escape(service)}",operation="{_escape(operation)}",region="{_escape(region)}"'
+
+
+# Default registry shared by the CLI and the Flask app
+REGISTRY = CallMetrics()
+
+
+def _service_name(model) -> str:
+    return model.service_model.service_id.hyphenize()
+
+
+def _error_code(parsed: Optional[dict]) -> Optional[str]:
+    if not parsed:
+        return None
+    return (parsed.get("Error") or {}).get("Code")
+
+
+def instrument_session(session, registry: Optional[CallMetrics] = None):
+    """
+    Register metric hooks on a boto3 session.
+
+    Clients created from the session afterwards inherit the hooks. Calling this
+    several times on the same session is harmless (handlers are registered with
+    a unique id).
+    """
+    registry = registry or REGISTRY
+    events = session.events
+    suffix = f"{_UNIQUE_PREFIX}-{id(registry)}"
+
+    def before_call(model, context, **kwargs):
+        context[_START_KEY] = time.perf_counter()
+
+    def after_call(http_response, parsed, model, context, **kwargs):
+        start = context.get(_START_KEY)
+        if start is None:
+            return
+        latency = time.perf_counter() - start
+        retries = int((parsed or {}).get("ResponseMetadata", {}).get("RetryAttempts", 0) or 0)
+        error = getattr(http_response, "status_code", 200) >= 300
+        registry.record_call(_service_name(model), model.name, context.get("client_region") or "global",
+                             latency, retries=retries, error=error)
+
+    def after_call_error(exception, context, event_name=None, **kwargs):
+        start = context.get(_START_KEY)
+        if start is None:
+            return
+        # event_name: after-call-error.<service>.<operation>
+        parts = (event_name or "").split(".")
+        service = parts[1] if len(parts) > 2 else "unknown"
+        operation = parts[2] if len(parts) > 2 else "unknown"
+        registry.record_call(service, operation, context.get("client_region") or "global",
+                             time.perf_counter() - start, error=True)
+
+    def needs_retry(response=None, operation=None, request_dict=None, **kwargs):
+        # Called after every attempt; only used to count throttled attempts
+        if response is None or operation is None:
+            return None
+        if _error_code(response[1]) in THROTTLE_ERROR_CODES:
+            context = (request_dict or {}).get("context") or {}
+            registry.record_throttle(_service_name(operation), operation.name,
+                                     context.get("client_region") or "global")
+        return None
+
+    events.register("before-call.*.*", before_call, unique_id=f"{suffix}-before-call")
+    events.register("after-call.*.*", after_call, unique_id=f"{suffix}-after-call")
+    events.register("after-call-error.*.*", after_call_error, unique_id=f"{suffix}-after-call-error")
+    events.register("needs-retry.*.*", needs_retry, unique_id=f"{suffix}-needs-retry")
+    return session
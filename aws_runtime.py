@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Process-wide boto3/botocore state reused across requests and warm invocations.
+
+- One botocore data loader is shared by every session, so service models
+  (JSON files of several hundred KB each) are read and parsed once per
+  process instead of once per session.
+- Sessions are cached by credentials (LRU with a TTL) and clients by
+  (service, region) per session, so warm requests reuse connection pools.
+- `preload_service_models()` warms the loader with only the models this app
+  uses (SNS, SQS, CloudWatch, STS); `start_preload()` does it on a background
+  thread, e.g. right after a serverless cold start.
+
+boto3/botocore are imported lazily so that importing this module is cheap.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+AWS_SERVICES: Tuple[str, ...] = ("sns", "sqs", "cloudwatch", "sts")
+PAGINATED_SERVICES: Tuple[str, ...] = ("sns", "sqs")
+SESSION_CACHE_SIZE = 16
+SESSION_CACHE_TTL = 900.0
+
+_loader = None
+_loader_lock = threading.Lock()
+_preload_thread: Optional[threading.Thread] = None
+
+
+class _SearchPaths(list):
+    """Loader search paths; boto3 appends its data path on every Session()."""
+
+    def append(self, path) -> None:
+        if path not in self:
+            super().append(path)
+
+
+def shared_loader():
+    """The process-wide botocore Loader (created on first use)."""
+    global _loader
+    if _loader is None:
+        with _loader_lock:
+            if _loader is None:
+                from botocore.loaders import Loader  # type: ignore
+
+                extra = [os.path.expandvars(os.path.expanduser(p))
+                         for p in os.environ.get("AWS_DATA_PATH", "").split(os.pathsep) if p]
+                _loader = Loader(extra_search_paths=_SearchPaths(extra))
+    return _loader
+
+
+def new_botocore_session():
+    """A botocore session wired to the shared loader.
+
+    Waits for a running preload rather than loading the same models twice.
+    """
+    preload = _preload_thread
+    if preload is not None and preload is not threading.current_thread():
+        preload.join()
+    import botocore.session  # type: ignore
+
+    session = botocore.session.Session()
+    session.register_component("data_loader", shared_loader())
+    return session
+
+
+def preload_service_models(services: Iterable[str] = AWS_SERVICES, region: str = "us-east-1") -> None:
+    """Load everything client creation needs for `services` into the shared loader."""
+    import boto3  # noqa: F401  (imported here so the first request finds it in sys.modules)
+
+    session = new_botocore_session()
+    loader = shared_loader()
+    for service in services:
+        # Creating a client loads exactly the model, endpoint rules and defaults it needs; no request is sent
+        session.create_client(service, region_name=region, aws_access_key_id="preload", aws_secret_access_key="preload")
+        if service in PAGINATED_SERVICES:
+            loader.load_service_model(service, "paginators-1")
+
+
+def start_preload(services: Iterable[str] = AWS_SERVICES) -> threading.Thread:
+    """Run `preload_service_models` once, on a daemon thread."""
+    global _preload_thread
+    with _loader_lock:
+        if _preload_thread is None:
+            _preload_thread = threading.Thread(target=preload_service_models, args=(tuple(services),),
+                                               name="aws-preload", daemon=True)
+            _preload_thread.start()
+        return _preload_thread
+
+
+def _fingerprint(secret: Optional[str]) -> Optional[str]:
+    return hashlib.sha256(str(secret).encode("utf-8")).hexdigest() if secret else None
+
+
+class TTLCache:
+    """Thread-safe LRU whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, object]]" = OrderedDict()
+
+    def lookup(self, key: Hashable, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] >= self.ttl:
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, key: Hashable, factory: Callable[[], object]):
+        """Cached value for `key`, built with `factory()` when missing or expired."""
+        missing = object()
+        value = self.lookup(key, missing)
+        if value is missing:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SessionCache(TTLCache):
+    """Sessions keyed by credentials."""
+
+    def __init__(self, maxsize: int = SESSION_CACHE_SIZE, ttl: float = SESSION_CACHE_TTL):
+        super().__init__(maxsize, ttl)
+
+    @staticmethod
+    def key(profile: Optional[str], access_key: Optional[str], secret_key: Optional[str],
+            session_token: Optional[str]) -> Hashable:
+        # Secrets are only kept as digests in the key
+        return (profile, access_key, _fingerprint(secret_key), _fingerprint(session_token))
+
+
+SESSIONS = SessionCache()
+
+
+def credential_scope(session) -> Hashable:
+    """Digest-only identity of the credentials a session actually resolves to (profile, env, role...)."""
+    credentials = session.get_credentials()
+    if credentials is None:
+        return None
+    if hasattr(credentials, "get_frozen_credentials"):
+        credentials = credentials.get_frozen_credentials()
+    return (credentials.access_key, _fingerprint(credentials.secret_key), _fingerprint(credentials.token))
+
+
+_clients: "weakref.WeakKeyDictionary[object, Dict[Hashable, object]]" = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+def cached_client(session, service: str, region_name: Optional[str] = None, config=None, tag: str = ""):
+    """Client for (service, region, tag) created once per session; clients are thread-safe.
+
+    `tag` distinguishes clients created with different `config`s.
+    """
+    key = (service, region_name, tag)
+    with _clients_lock:
+        per_session = _clients.setdefault(session, {})
+        client = per_session.get(key)
+    if client is None:
+        kwargs = {"region_name": region_name} if region_name else {}
+        if config is not None:
+            kwargs["config"] = config
+        client = session.client(service, **kwargs)
+        with _clients_lock:
+            client = per_session.setdefault(key, client)
+    return client
@@ -2,15 +2,51 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import getpass
 import json
+import string
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass, asdict, field
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+
+from json_response import dumps
+from scan_trace import NULL_TRACER, ScanTracer
+
+if TYPE_CHECKING:
+    from resilience import Deadline
 
 # boto3 and botocore are imported lazily inside functions so that the CLI --help
-# can be displayed even if the packages are not installed.
+# can be displayed even if the packages are not installed. So is `resilience`,
+# which only scans need (deadlines, hedging, circuit breakers).
+
+
+# SQS list_queues returns at most 1000 URLs per call
+QUEUE_PAGE_SIZE = 1000
+# Characters allowed in SQS queue names ("." only appears in the ".fifo" suffix)
+QUEUE_NAME_ALPHABET = string.ascii_letters + string.digits + "-_."
+QUEUE_SHARD_WORKERS = 32
+# Message counters change all the time; keeping them would make every scan differ
+QUEUE_VOLATILE_ATTRIBUTE_PREFIX = "Approximate"
+# Subscription attributes kept on links (filter policy, raw delivery, subscription-level DLQ)
+SUBSCRIPTION_ATTRIBUTES = ("RawMessageDelivery", "FilterPolicy", "FilterPolicyScope", "RedrivePolicy")
+SUBSCRIPTION_ATTRIBUTE_WORKERS = 10
+# Subscription attributes rarely change: cache them by subscription ARN across scans
+SUBSCRIPTION_ATTRIBUTES_TTL = 300.0
+SUBSCRIPTION_ATTRIBUTES_CACHE_SIZE = 100000
+# --all-regions: concurrent probes, and how long the set of non-empty regions is reused
+REGION_PROBE_WORKERS = 32
+REGION_DISCOVERY_TTL = 900.0
+# Errors meaning "region not enabled for this account" (opt-in regions)
+REGION_DISABLED_ERRORS = ("InvalidClientTokenId", "UnrecognizedClientException", "AuthFailure", "OptInRequired")
+# Per-call timeouts and attempts (first one included) of the scan clients (botocore defaults to 60 s each);
+# with a scan deadline the timeouts are lowered to fit in the remaining time
+SCAN_CONNECT_TIMEOUT = 5.0
+SCAN_READ_TIMEOUT = 15.0
+SCAN_MAX_ATTEMPTS = 6
+SCAN_MIN_TIMEOUT = 0.1
 
 
 @dataclass
@@ -24,6 +60,7 @@ class Queue:
     arn: str
     url: str
     name: str
+    attributes: Dict[str, str] = field(default_factory=dict)
 
 
 @dataclass
@@ -36,14 +73,51 @@ class Link:
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Inventorier SNS/SQS et générer JSON ou Mermaid")
-    parser.add_argument("--region", action="append", required=True, help="Région AWS (répétable)")
+    parser.add_argument("--region", action="append", default=None, help="Région AWS (répétable)")
+    parser.add_argument("--all-regions", action="store_true",
+                        help="Découvrir les régions activées, les sonder en parallèle et ne scanner que celles qui ne sont pas vides")
     parser.add_argument("--profile", default=None, help="Profil AWS à utiliser")
     parser.add_argument("--aws-access-key-id", default=None, help="AWS Access Key ID (optionnel)")
     parser.add_argument("--aws-secret-access-key", default=None, help="AWS Secret Access Key (optionnel; si omis et --aws-access-key-id fourni, vous serez invité)")
     parser.add_argument("--aws-session-token", default=None, help="AWS Session Token (optionnel)")
-    parser.add_argument("--format", choices=["json", "mermaid"], default="json", help="Format de sortie")
+    parser.add_argument("--format", choices=["json", "mermaid", "sql", "sql-copy", "sqlite", "bundle"], default="json",
+                        help="Format de sortie (sql: INSERT multi-lignes, sql-copy: COPY PostgreSQL, sqlite: base SQLite, "
+                             "bundle: archive zip de plusieurs formats; sqlite et bundle requièrent --output)")
+    parser.add_argument("--bundle-formats", default=None,
+                        help="Formats inclus dans --format bundle, séparés par des virgules (json,mermaid,sql,sql-copy,sqlite,drawio,canvas)")
     parser.add_argument("--output", default=None, help="Chemin de fichier de sortie (sinon stdout)")
-    return parser.parse_args()
+    parser.add_argument("--deadline", type=float, default=None, metavar="SECONDS",
+                        help="Durée maximale du scan: les régions non terminées sont marquées \"timeout\"")
+    parser.add_argument("--hedge-after", type=float, default=None, metavar="SECONDS",
+                        help="Relancer en parallèle un appel de listage sans réponse après SECONDS (le premier résultat l'emporte)")
+    parser.add_argument("--sharded-queues", action="store_true", help="Lister les files SQS par préfixes en parallèle (comptes avec beaucoup de files)")
+    parser.add_argument("--compact", action="store_true", help="JSON compact (sans indentation, encodeur rapide orjson si disponible)")
+    parser.add_argument("--trace", default=None, metavar="FILE", help="Écrire une trace de profilage du scan (format Chrome trace-event JSON)")
+    parser.add_argument("--timings", action="store_true", help="Afficher un résumé des appels AWS (latence, retries, throttles) sur stderr")
+    parser.add_argument("--snapshot-dir", default=None, help="Enregistrer aussi l'inventaire comme snapshot horodaté dans ce dossier (voir inventory_diff.py)")
+    parser.add_argument("--watch", type=float, default=None, metavar="INTERVAL",
+                        help="Mode surveillance: re-scanner toutes les INTERVAL secondes et n'émettre que les changements (NDJSON)")
+    args = parser.parse_args()
+    if bool(args.region) == args.all_regions:
+        parser.error("indiquer --region ou --all-regions (un seul des deux)")
+    if args.format in ("sqlite", "bundle") and not args.output:
+        parser.error(f"--format {args.format} requiert --output")
+    if args.format == "bundle":
+        from export_bundle import parse_formats
+        try:
+            args.bundle_formats = parse_formats(args.bundle_formats)
+        except ValueError as e:
+            parser.error(str(e))
+    for name in ("deadline", "hedge_after"):
+        value = getattr(args, name)
+        if value is not None and value <= 0:
+            parser.error(f"--{name.replace('_', '-')} requiert une durée positive")
+    if args.watch is not None:
+        if args.watch <= 0:
+            parser.error("--watch requiert un intervalle positif")
+        if args.format != "json" or args.trace or args.snapshot_dir or args.deadline or args.hedge_after:
+            parser.error("--watch n'est pas compatible avec --format, --trace, --snapshot-dir, --deadline ni --hedge-after")
+    return args
 
 
 def get_session(profile: Optional[str], access_key: Optional[str], secret_key: Optional[str], session_token: Optional[str]):
@@ -54,27 +128,75 @@ def get_session(profile: Optional[str], access_key: Optional[str], secret_key: O
     - Si --aws-access-key-id est fourni, utilise les clés passées en argument (prompt pour le secret si omis).
     - Si --profile est fourni, utilise le profil.
     - Sinon, laisse boto3 utiliser sa résolution par défaut (env, shared config, SSO, etc.).
+
+    Les sessions sont mises en cache par identifiants (voir `aws_runtime.SESSIONS`) et partagent
+    le chargeur de modèles botocore du processus.
     """
+    from aws_runtime import SESSIONS
+
+    if access_key and not secret_key:
+        # Ne pas obliger à passer le secret sur la ligne de commande : prompt sécurisé
+        secret_key = getpass.getpass("AWS Secret Access Key: ")
+    key = SESSIONS.key(profile if not access_key else None, access_key, secret_key, session_token if access_key else None)
+    return SESSIONS.get(key, lambda: _new_session(profile, access_key, secret_key, session_token))
+
+
+def _new_session(profile: Optional[str], access_key: Optional[str], secret_key: Optional[str], session_token: Optional[str]):
     # Import boto3 only when actually creating a session
-    try:
-        import boto3
-    except Exception:
-        raise
+    import boto3
+    from aws_metrics import instrument_session
+    from aws_runtime import new_botocore_session
 
     if access_key:
-        if not secret_key:
-            # Ne pas obliger à passer le secret sur la ligne de commande : prompt sécurisé
-            secret_key = getpass.getpass("AWS Secret Access Key: ")
-        return boto3.Session(aws_access_key_id=access_key, aws_secret_access_key=secret_key, aws_session_token=session_token)
-    if profile:
-        return boto3.Session(profile_name=profile)
-    return boto3.Session()
+        session = boto3.Session(aws_access_key_id=access_key, aws_secret_access_key=secret_key, aws_session_token=session_token,
+                                botocore_session=new_botocore_session())
+    elif profile:
+        session = boto3.Session(profile_name=profile, botocore_session=new_botocore_session())
+    else:
+        session = boto3.Session(botocore_session=new_botocore_session())
+    # Every client created from this session records per-call metrics and goes through the circuit breakers;
+    # sessions are cached per credentials, so are their breakers
+    from resilience import BreakerRegistry, guard_session
+    return guard_session(instrument_session(session), BreakerRegistry())
+
 
+def _pages(client, operation: str, hedge_after: Optional[float] = None, page_size: Optional[int] = None,
+           **params) -> Iterator[dict]:
+    """Pages of a NextToken-paginated list operation.
 
-def list_topics(sns_client) -> List[Topic]:
+    Without `hedge_after` this is the client's paginator. With it, pages are
+    requested one by one and each request is hedged on its own, so a slow page
+    is retried from its own token instead of restarting the listing.
+    `page_size` is sent as MaxResults (ListQueues).
+    """
+    if hedge_after is None:
+        config = {"PageSize": page_size} if page_size else {}
+        yield from client.get_paginator(operation).paginate(PaginationConfig=config, **params)
+        return
+    from resilience import hedged
+
+    call = getattr(client, operation)
+    if page_size:
+        params["MaxResults"] = page_size
+    token = None
+    while True:
+        kwargs = dict(params, NextToken=token) if token else dict(params)
+        page = hedged(functools.partial(call, **kwargs), hedge_after)
+        yield page
+        token = page.get("NextToken")
+        if not token:
+            return
+
+
+def list_topics(sns_client, tracer=None, hedge_after: Optional[float] = None) -> List[Topic]:
+    tracer = tracer or NULL_TRACER
+    with tracer.span("topics"):
+        return _list_topics(sns_client, hedge_after)
+
+
+def _list_topics(sns_client, hedge_after: Optional[float] = None) -> List[Topic]:
     topics: List[Topic] = []
-    paginator = sns_client.get_paginator("list_topics")
-    for page in paginator.paginate():
+    for page in _pages(sns_client, "list_topics", hedge_after):
         for t in page.get("Topics", []):
             arn = t["TopicArn"]
             name = arn.split(":")[-1]
@@ -82,73 +204,303 @@ def list_topics(sns_client) -> List[Topic]:
     return topics
 
 
-def list_queues(sqs_client) -> List[Queue]:
+def list_queue_urls_sharded(sqs_client, max_workers: int = QUEUE_SHARD_WORKERS, tracer=None) -> List[str]:
+    """
+    List queue URLs by splitting the namespace on QueueNamePrefix.
+
+    Each prefix is listed with a single call; when a prefix holds more than one
+    page of queues it is refined into one child prefix per allowed character,
+    and all shards are listed concurrently. Results are deduplicated.
+    """
+    tracer = tracer or NULL_TRACER
+    seen: Dict[str, None] = {}
+
+    def list_prefix(prefix: str):
+        with tracer.span("list_queues shard", prefix=prefix):
+            kwargs = {"MaxResults": QUEUE_PAGE_SIZE}
+            if prefix:
+                kwargs["QueueNamePrefix"] = prefix
+            resp = sqs_client.list_queues(**kwargs)
+            urls = resp.get("QueueUrls", []) or []
+            dense = bool(resp.get("NextToken"))
+            if dense and prefix and not any(u.rsplit("/", 1)[-1] == prefix for u in urls):
+                # A queue named exactly like the prefix is not covered by the child prefixes
+                try:
+                    urls = urls + [sqs_client.get_queue_url(QueueName=prefix)["QueueUrl"]]
+                except Exception:
+                    pass
+            return prefix, urls, dense
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(list_prefix, "")}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                prefix, urls, dense = future.result()
+                for url in urls:
+                    seen[url] = None
+                if dense:
+                    pending.update(executor.submit(list_prefix, prefix + c) for c in QUEUE_NAME_ALPHABET)
+    return list(seen)
+
+
+def list_queues(sqs_client, tracer=None, sharded: bool = False, hedge_after: Optional[float] = None,
+                unreadable: Optional[List[str]] = None) -> List[Queue]:
+    """Queues with their attributes; those whose attributes cannot be read are left out.
+
+    The URLs of the queues left out are appended to `unreadable` when given.
+    """
+    tracer = tracer or NULL_TRACER
+    with tracer.span("queues"):
+        return _list_queues(sqs_client, tracer, sharded, hedge_after, unreadable)
+
+
+def _list_queue_urls(sqs_client, hedge_after: Optional[float] = None) -> List[str]:
+    queue_urls: List[str] = []
+    # Without MaxResults, SQS returns the first 1000 queues and no NextToken
+    for page in _pages(sqs_client, "list_queues", hedge_after, page_size=QUEUE_PAGE_SIZE):
+        queue_urls.extend(page.get("QueueUrls", []) or [])
+    return queue_urls
+
+
+def _list_queues(sqs_client, tracer, sharded: bool, hedge_after: Optional[float] = None,
+                 unreadable: Optional[List[str]] = None) -> List[Queue]:
+    from resilience import CircuitOpenError
+
     queues: List[Queue] = []
     queue_urls: List[str] = []
     
     # First, collect all queue URLs
-    paginator = sqs_client.get_paginator("list_queues")
-    for page in paginator.paginate():
-        queue_urls.extend(page.get("QueueUrls", []) or [])
+    if sharded:
+        queue_urls = list_queue_urls_sharded(sqs_client, tracer=tracer)
+    else:
+        with tracer.span("list_queues pages"):
+            queue_urls = _list_queue_urls(sqs_client, hedge_after)
     
-    # Parallelize get_queue_attributes calls
+    # Parallelize get_queue_attributes calls; the full set costs the same single call as QueueArn alone
     def get_queue_info(url: str) -> Queue:
-        attrs = sqs_client.get_queue_attributes(QueueUrl=url, AttributeNames=["QueueArn"])
-        arn = attrs.get("Attributes", {}).get("QueueArn", "")
+        attrs = sqs_client.get_queue_attributes(QueueUrl=url, AttributeNames=["All"]).get("Attributes", {})
+        arn = attrs.get("QueueArn", "")
         name = url.rsplit("/", 1)[-1]
-        return Queue(arn=arn, url=url, name=name)
+        settings = {k: v for k, v in attrs.items()
+                    if k != "QueueArn" and not k.startswith(QUEUE_VOLATILE_ATTRIBUTE_PREFIX)}
+        return Queue(arn=arn, url=url, name=name, attributes=settings)
     
     # Use ThreadPoolExecutor to fetch queue attributes in parallel
-    with ThreadPoolExecutor(max_workers=10) as executor:
+    with tracer.span("get_queue_attributes fan-out", queues=len(queue_urls)), ThreadPoolExecutor(max_workers=10) as executor:
         futures = {executor.submit(get_queue_info, url): url for url in queue_urls}
         for future in as_completed(futures):
             try:
                 queue = future.result()
                 queues.append(queue)
+            except CircuitOpenError:
+                # The service is failing in this region: report the region rather than an empty queue list
+                raise
             except Exception as e:
                 # Skip queues that fail to fetch attributes
-                pass
+                if unreadable is not None:
+                    unreadable.append(futures[future])
     
     return queues
 
 
-def list_links_sns_to_sqs(sns_client, topics: List[Topic]) -> List[Link]:
+def list_links_sns_to_sqs(sns_client, topics: List[Topic], tracer=None, hedge_after: Optional[float] = None,
+                          deadline: Optional[Deadline] = None) -> List[Link]:
+    tracer = tracer or NULL_TRACER
+    deadline = _or_no_deadline(deadline)
+    links: List[Link] = []
+    with tracer.span("links", topics=len(topics)):
+        for topic in topics:
+            deadline.check()
+            with tracer.span("list_subscriptions_by_topic", topic=topic.name):
+                links.extend(_topic_links(sns_client, topic, hedge_after))
+    return links
+
+
+def _topic_links(sns_client, topic: Topic, hedge_after: Optional[float] = None) -> List[Link]:
+    links: List[Link] = []
+    for page in _pages(sns_client, "list_subscriptions_by_topic", hedge_after, TopicArn=topic.arn):
+        for sub in page.get("Subscriptions", []) or []:
+            protocol = sub.get("Protocol")
+            endpoint = sub.get("Endpoint")
+            sub_arn = sub.get("SubscriptionArn")
+            if protocol == "sqs" and endpoint:
+                # endpoint est normalement l'ARN de la file SQS
+                attributes = {"subscriptionArn": sub_arn or ""}
+                links.append(Link(from_arn=topic.arn, to_arn=endpoint, protocol=protocol, attributes=attributes))
+    return links
+
+
+_subscription_attributes_cache = None
+
+
+def _subscription_cache():
+    global _subscription_attributes_cache
+    if _subscription_attributes_cache is None:
+        from aws_runtime import TTLCache
+        _subscription_attributes_cache = TTLCache(SUBSCRIPTION_ATTRIBUTES_CACHE_SIZE, SUBSCRIPTION_ATTRIBUTES_TTL)
+    return _subscription_attributes_cache
+
+
+def fetch_subscription_attributes(sns_client, links: List[Link], tracer=None, scope=None) -> None:
+    """Add filter policy, raw delivery and redrive settings to `links`, in place.
+
+    Calls run concurrently and results are cached by (`scope`, subscription
+    ARN), so repeated scans only fetch new (or expired) subscriptions and
+    attributes read with one set of credentials (`credential_scope`) are
+    never served to another. A subscription whose attributes cannot be read
+    keeps only its ARN.
+    """
+    tracer = tracer or NULL_TRACER
+    cache = _subscription_cache()
+    missing: Dict[str, Dict[str, str]] = {}
+    pending: List[Link] = []
+    for link in links:
+        sub_arn = link.attributes.get("subscriptionArn", "")
+        # "PendingConfirmation" is not a real ARN
+        if not sub_arn.startswith("arn:"):
+            continue
+        cached = cache.lookup((scope, sub_arn))
+        if cached is None:
+            missing[sub_arn] = {}
+            pending.append(link)
+        else:
+            link.attributes.update(cached)
+
+    def fetch(sub_arn: str) -> Dict[str, str]:
+        attrs = sns_client.get_subscription_attributes(SubscriptionArn=sub_arn).get("Attributes", {})
+        return {k: attrs[k] for k in SUBSCRIPTION_ATTRIBUTES if k in attrs}
+
+    if not missing:
+        return
+    with tracer.span("get_subscription_attributes fan-out", subscriptions=len(missing)), \
+            ThreadPoolExecutor(max_workers=SUBSCRIPTION_ATTRIBUTE_WORKERS) as executor:
+        futures = {executor.submit(fetch, sub_arn): sub_arn for sub_arn in missing}
+        for future in as_completed(futures):
+            sub_arn = futures[future]
+            try:
+                missing[sub_arn] = future.result()
+            except Exception:
+                continue
+            cache.put((scope, sub_arn), missing[sub_arn])
+    for link in pending:
+        link.attributes.update(missing[link.attributes["subscriptionArn"]])
+
+
+def redrive_links(queues: List[Queue]) -> List[Link]:
+    """Queue -> dead-letter queue edges from the RedrivePolicy attributes (no extra calls)."""
     links: List[Link] = []
-    for topic in topics:
-        paginator = sns_client.get_paginator("list_subscriptions_by_topic")
-        for page in paginator.paginate(TopicArn=topic.arn):
-            for sub in page.get("Subscriptions", []) or []:
-                protocol = sub.get("Protocol")
-                endpoint = sub.get("Endpoint")
-                sub_arn = sub.get("SubscriptionArn")
-                if protocol == "sqs" and endpoint:
-                    # endpoint est normalement l'ARN de la file SQS
-                    attributes = {"subscriptionArn": sub_arn or ""}
-                    links.append(Link(from_arn=topic.arn, to_arn=endpoint, protocol=protocol, attributes=attributes))
+    for queue in queues:
+        policy = queue.attributes.get("RedrivePolicy")
+        if not policy:
+            continue
+        try:
+            redrive = json.loads(policy)
+        except ValueError:
+            continue
+        target = redrive.get("deadLetterTargetArn")
+        if target:
+            attributes = {"maxReceiveCount": str(redrive.get("maxReceiveCount", ""))}
+            links.append(Link(from_arn=queue.arn, to_arn=target, protocol="redrive", attributes=attributes))
     return links
 
 
-def fetch_region_inventory(session: boto3.Session, region: str) -> Dict[str, object]:
-    """Fetch inventory for a single region with parallel API calls."""
+def _or_no_deadline(deadline: Optional[Deadline]) -> Deadline:
+    from resilience import NO_DEADLINE
+
+    return NO_DEADLINE if deadline is None else deadline
+
+
+def _scan_config(deadline: Optional[Deadline] = None):
     from botocore.config import Config  # type: ignore
-    
-    config = Config(retries={"max_attempts": 5, "mode": "standard"})
-    sns = session.client("sns", region_name=region, config=config)
-    sqs = session.client("sqs", region_name=region, config=config)
-    
+
+    connect, read = SCAN_CONNECT_TIMEOUT, SCAN_READ_TIMEOUT
+    remaining = None if deadline is None else deadline.remaining()
+    if remaining is not None:
+        # No single attempt may outlive the scan; retries stay (bind_deadline stops them once it expires)
+        remaining = max(remaining, SCAN_MIN_TIMEOUT)
+        connect, read = min(connect, remaining), min(read, remaining)
+    # Connection pool sized for the attribute fan-out plus concurrent queue shards
+    return Config(retries={"total_max_attempts": SCAN_MAX_ATTEMPTS, "mode": "standard"},
+                  max_pool_connections=10 + QUEUE_SHARD_WORKERS, connect_timeout=connect, read_timeout=read)
+
+
+def region_clients(session: boto3.Session, region: str, cached: bool = True, deadline: Optional[Deadline] = None):
+    """SNS and SQS clients for a region, created once per session to keep connections warm.
+
+    With `cached=False` new clients are returned, e.g. for a traced scan whose
+    call hooks must not see the calls of concurrent scans. With a `deadline`,
+    new clients are always returned: their timeouts fit in the remaining time
+    and they stop calling AWS, retries included, once it has expired.
+    """
+    from aws_runtime import cached_client
+
+    if deadline is not None and deadline.expires_at is not None:
+        from resilience import bind_deadline
+
+        config = _scan_config(deadline)
+        return (bind_deadline(session.client("sns", region_name=region, config=config), deadline),
+                bind_deadline(session.client("sqs", region_name=region, config=config), deadline))
+    config = _scan_config()
+    if not cached:
+        return (session.client("sns", region_name=region, config=config),
+                session.client("sqs", region_name=region, config=config))
+    return (cached_client(session, "sns", region, config=config, tag="scan"),
+            cached_client(session, "sqs", region, config=config, tag="scan"))
+
+
+def fetch_region_inventory(session: boto3.Session, region: str, tracer: Optional[ScanTracer] = None,
+                           sharded_queues: bool = False, clients=None, hedge_after: Optional[float] = None,
+                           deadline: Optional[Deadline] = None, unreadable_queues: Optional[List[str]] = None) -> Dict[str, object]:
+    """Fetch inventory for a single region with parallel API calls.
+
+    `clients` is an optional (sns, sqs) pair from `region_clients`. List calls
+    are hedged after `hedge_after` seconds. `deadline` is checked between
+    phases and, on the clients created here, before every call attempt, so
+    that an abandoned region stops issuing calls. URLs of listed queues
+    whose attributes could not be read are appended to `unreadable_queues`.
+    """
+    tracer = tracer or NULL_TRACER
+    with tracer.span("region", region=region):
+        return _fetch_region_inventory(session, region, tracer, sharded_queues, clients, hedge_after, deadline,
+                                       unreadable_queues)
+
+
+def _fetch_region_inventory(session: boto3.Session, region: str, tracer, sharded_queues: bool, clients,
+                            hedge_after: Optional[float] = None, deadline: Optional[Deadline] = None,
+                            unreadable_queues: Optional[List[str]] = None) -> Dict[str, object]:
+    from aws_runtime import credential_scope
+
+    sns, sqs = clients or region_clients(session, region, cached=not tracer.enabled, deadline=deadline)
+    tracer.instrument_client(sns)
+    tracer.instrument_client(sqs)
+    try:
+        return _region_inventory(region, sns, sqs, tracer, sharded_queues, hedge_after, _or_no_deadline(deadline),
+                                 unreadable_queues, credential_scope(session))
+    finally:
+        tracer.uninstrument_client(sns)
+        tracer.uninstrument_client(sqs)
+
+
+def _region_inventory(region: str, sns, sqs, tracer, sharded_queues: bool, hedge_after: Optional[float],
+                      deadline: Deadline, unreadable_queues: Optional[List[str]] = None,
+                      scope=None) -> Dict[str, object]:
     # Parallelize topics and queues fetching
     topics: List[Topic] = []
     queues: List[Queue] = []
     
     with ThreadPoolExecutor(max_workers=2) as executor:
-        future_topics = executor.submit(list_topics, sns)
-        future_queues = executor.submit(list_queues, sqs)
+        future_topics = executor.submit(list_topics, sns, tracer, hedge_after)
+        future_queues = executor.submit(list_queues, sqs, tracer, sharded_queues, hedge_after, unreadable_queues)
         
         topics = future_topics.result()
         queues = future_queues.result()
     
     # Fetch links after we have topics
-    links = list_links_sns_to_sqs(sns, topics)
+    deadline.check()
+    links = list_links_sns_to_sqs(sns, topics, tracer, hedge_after, deadline)
+    deadline.check()
+    fetch_subscription_attributes(sns, links, tracer, scope)
     
     # Déterminer accountId depuis un ARN existant si possible
     account_id: Optional[str] = None
@@ -164,32 +516,163 @@ def fetch_region_inventory(session: boto3.Session, region: str) -> Dict[str, obj
         "topics": [asdict(t) for t in topics],
         "queues": [asdict(q) for q in queues],
         "links": [asdict(l) for l in links],
+        "dlq_links": [asdict(l) for l in redrive_links(queues)],
     }
 
 
-def build_inventory(session: boto3.Session, regions: List[str]) -> List[Dict[str, object]]:
-    """Build inventory for multiple regions in parallel."""
-    inventory: List[Dict[str, object]] = []
+def _empty_region(region: str) -> Dict[str, object]:
+    return {"region": region, "accountId": None, "topics": [], "queues": [], "links": [], "dlq_links": []}
+
+
+def _scan_region(session: boto3.Session, region: str, tracer, sharded_queues: bool, hedge_after: Optional[float],
+                 deadline: Deadline) -> Dict[str, object]:
+    start = time.monotonic()
+    try:
+        item = fetch_region_inventory(session, region, tracer, sharded_queues, hedge_after=hedge_after, deadline=deadline)
+        status: Dict[str, object] = {"state": "ok"}
+    except Exception as e:
+        from resilience import CircuitOpenError, DeadlineExceeded
+
+        if isinstance(e, DeadlineExceeded) or deadline.expired():
+            # Whatever failed once the budget is spent (timeouts, aborted calls) is reported by build_inventory
+            item, status = _empty_region(region), {"state": "timeout", "error": "scan deadline exceeded"}
+        else:
+            # Log error but continue with other regions
+            print(f"Error fetching inventory for region {region}: {e}", file=sys.stderr)
+            state = "circuit_open" if isinstance(e, CircuitOpenError) else "error"
+            item, status = _empty_region(region), {"state": state, "error": str(e)}
+    status["duration_ms"] = round((time.monotonic() - start) * 1000)
+    item["status"] = status
+    return item
+
+
+def build_inventory(session: boto3.Session, regions: List[str], tracer: Optional[ScanTracer] = None,
+                    sharded_queues: bool = False, deadline: Optional[float] = None,
+                    hedge_after: Optional[float] = None) -> List[Dict[str, object]]:
+    """Build inventory for multiple regions in parallel.
+
+    When a `ScanTracer` is given, nested timing spans (region -> topics/queues/links
+    -> AWS calls) are recorded into it. `sharded_queues` lists queues with
+    concurrent QueueNamePrefix shards (see `list_queue_urls_sharded`).
+
+    Every region entry carries a `status` ({"state": "ok" | "error" |
+    "circuit_open" | "timeout", "duration_ms", "error"}); regions that did not
+    complete have empty resource lists. With `deadline` (seconds), the scan
+    returns when it expires and unfinished regions are reported as "timeout".
+    List calls are hedged after `hedge_after` seconds (see `resilience.hedged`).
+    """
+    from resilience import Deadline
+
+    tracer = tracer or NULL_TRACER
+    scan_deadline = Deadline(deadline)
+    start = time.monotonic()
     
     # Parallelize across regions
-    max_workers = min(len(regions), 10)  # Limit to avoid throttling
+    max_workers = max(1, min(len(regions), 10))  # Limit to avoid throttling
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    with tracer.span("build_inventory", regions=len(regions)):
+        futures = {executor.submit(_scan_region, session, region, tracer, sharded_queues, hedge_after, scan_deadline): region
+                   for region in regions}
+        try:
+            done, _ = wait(futures, timeout=scan_deadline.remaining())
+        finally:
+            # Regions still running are abandoned: their clients refuse any further attempt and their
+            # in-flight calls time out within the budget, so the workers end right after the deadline
+            executor.shutdown(wait=False, cancel_futures=True)
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(fetch_region_inventory, session, region): region for region in regions}
-        
+    results = {futures[future]: future.result() for future in done}
+    inventory: List[Dict[str, object]] = []
+    for region in dict.fromkeys(regions):
+        item = results.get(region)
+        if item is None:
+            item = _empty_region(region)
+            item["status"] = {"state": "timeout", "error": "scan deadline exceeded",
+                              "duration_ms": round((time.monotonic() - start) * 1000)}
+        if item["status"]["state"] == "timeout":  # type: ignore
+            print(f"Error fetching inventory for region {region}: scan deadline exceeded", file=sys.stderr)
+        inventory.append(item)
+    return inventory
+
+
+_region_cache = None
+
+
+def _regions_cache():
+    global _region_cache
+    if _region_cache is None:
+        from aws_runtime import TTLCache
+        _region_cache = TTLCache(64, REGION_DISCOVERY_TTL)
+    return _region_cache
+
+
+def candidate_regions(session: boto3.Session) -> List[str]:
+    """Regions where both SNS and SQS are offered, from botocore's endpoint data (no API call)."""
+    sqs_regions = set(session.get_available_regions("sqs"))
+    return [r for r in session.get_available_regions("sns") if r in sqs_regions]
+
+
+def _probe(client, operation: str) -> Optional[bool]:
+    """True if the region holds resources, False if empty, None if it is not enabled."""
+    from botocore.exceptions import ClientError  # type: ignore
+
+    try:
+        if operation == "list_topics":
+            return bool(client.list_topics().get("Topics"))
+        return bool(client.list_queues(MaxResults=1).get("QueueUrls"))
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in REGION_DISABLED_ERRORS:
+            return None
+        raise
+
+
+def discover_regions(session: boto3.Session, candidates: Optional[List[str]] = None,
+                     tracer: Optional[ScanTracer] = None, refresh: bool = False) -> List[str]:
+    """Non-empty regions among `candidates` (default: every region offering SNS and SQS).
+
+    Every region is probed concurrently with one ListTopics and one ListQueues
+    call. Empty and not-enabled regions are pruned; a region whose probe fails
+    for another reason is kept so that a scan does not silently skip it. The
+    result is cached per credentials for `REGION_DISCOVERY_TTL` seconds, unless
+    a probe failed.
+    """
+    tracer = tracer or NULL_TRACER
+    regions = list(candidates) if candidates is not None else candidate_regions(session)
+    credentials = session.get_credentials()
+    key = (getattr(credentials, "access_key", None), tuple(regions))
+    cache = _regions_cache()
+    if not refresh:
+        cached = cache.lookup(key)
+        if cached is not None:
+            return list(cached)
+
+    found: Dict[str, List[Optional[bool]]] = {region: [] for region in regions}
+    failed = False
+    with tracer.span("discover_regions", regions=len(regions)), \
+            ThreadPoolExecutor(max_workers=max(1, min(REGION_PROBE_WORKERS, 2 * len(regions)))) as executor:
+        futures = {}
+        for region in regions:
+            # Probes go through the scan clients, so the regions that are kept are scanned on warm connections
+            sns, sqs = region_clients(session, region)
+            futures[executor.submit(_probe, sns, "list_topics")] = region
+            futures[executor.submit(_probe, sqs, "list_queues")] = region
         for future in as_completed(futures):
             region = futures[future]
             try:
-                region_inventory = future.result()
-                inventory.append(region_inventory)
+                found[region].append(future.result())
             except Exception as e:
-                # Log error but continue with other regions
-                print(f"Error fetching inventory for region {region}: {e}", file=sys.stderr)
-    
-    return inventory
+                print(f"Error probing region {region}: {e}", file=sys.stderr)
+                found[region].append(True)
+                failed = True
 
+    non_empty = [region for region in regions if any(found[region])]
+    if not failed:
+        cache.put(key, tuple(non_empty))
+    return non_empty
 
-def to_mermaid(inventory: List[Dict[str, object]]) -> str:
+
+def to_mermaid(inventory: List[Dict[str, object]], edge_labels: Optional[Dict[tuple, str]] = None) -> str:
+    """Mermaid graph; `edge_labels` maps (topic ARN, queue ARN) to a label drawn on that edge."""
+    edge_labels = edge_labels or {}
     lines: List[str] = ["graph LR"]
     for item in inventory:
         account = item.get("accountId")
@@ -225,7 +708,17 @@ def to_mermaid(inventory: List[Dict[str, object]]) -> str:
             tid = topic_ids.get(from_arn, None)
             qid = queue_ids.get(to_arn, None)
             if tid and qid:
-                lines.append(f"    {tid} --> {qid}")
+                label = edge_labels.get((from_arn, to_arn))
+                if label:
+                    label = label.replace("|", "/").replace("\"", "'")
+                    lines.append(f"    {tid} -->|{label}| {qid}")
+                else:
+                    lines.append(f"    {tid} --> {qid}")
+        for l in item.get("dlq_links", []) or []:  # type: ignore
+            src = queue_ids.get(l.get("from_arn"))  # type: ignore
+            dlq = queue_ids.get(l.get("to_arn"))  # type: ignore
+            if src and dlq:
+                lines.append(f"    {src} -.->|DLQ| {dlq}")
         lines.append("  end")
 
     # Styles Linear-inspired: orange pour topics, gris neutre pour queues
@@ -240,18 +733,50 @@ def to_mermaid(inventory: List[Dict[str, object]]) -> str:
 def main() -> None:
     args = parse_args()
     session = get_session(args.profile, args.aws_access_key_id, args.aws_secret_access_key, args.aws_session_token)
-    inventory = build_inventory(session, args.region)
-
-    if args.format == "json":
-        output = json.dumps(inventory, indent=2)
+    tracer = ScanTracer() if args.trace else None
+    if args.all_regions:
+        args.region = discover_regions(session, tracer=tracer)
+        sys.stderr.write(f"Régions non vides: {', '.join(args.region) or '(aucune)'}\n")
+    if args.watch is not None:
+        from inventory_watch import watch
+        watch(session, args.region, args.watch, output=args.output, sharded_queues=args.sharded_queues)
+        return
+    inventory = build_inventory(session, args.region, tracer=tracer, sharded_queues=args.sharded_queues,
+                                deadline=args.deadline, hedge_after=args.hedge_after)
+    if tracer:
+        tracer.write(args.trace)
+    if args.snapshot_dir:
+        from inventory_diff import save_snapshot
+        sys.stderr.write(f"Snapshot: {save_snapshot(inventory, args.snapshot_dir)}\n")
+
+    from sql_export import to_sql_copy, to_sql_inserts, write_sqlite
+
+    if args.format == "bundle":
+        from export_bundle import write_bundle
+        write_bundle(inventory, args.output, args.bundle_formats)
+        sys.stderr.write(f"{args.output}: {', '.join(args.bundle_formats)}\n")
+    elif args.format == "sqlite":
+        counts = write_sqlite(inventory, args.output)
+        sys.stderr.write(", ".join(f"{table}: {count}" for table, count in counts.items()) + "\n")
     else:
-        output = to_mermaid(inventory)
+        if args.format == "json":
+            output = dumps(inventory, pretty=not args.compact).decode("utf-8")
+        elif args.format == "sql":
+            output = to_sql_inserts(inventory)
+        elif args.format == "sql-copy":
+            output = to_sql_copy(inventory)
+        else:
+            output = to_mermaid(inventory)
 
-    if args.output:
-        with open(args.output, "w", encoding="utf-8") as f:
-            f.write(output + ("\n" if not output.endswith("\n") else ""))
-    else:
-        sys.stdout.write(output + ("\n" if not output.endswith("\n") else ""))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(output + ("\n" if not output.endswith("\n") else ""))
+        else:
+            sys.stdout.write(output + ("\n" if not output.endswith("\n") else ""))
+
+    if args.timings:
+        from aws_metrics import REGISTRY
+        sys.stderr.write(REGISTRY.summary() + "\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON encoding time and bytes on the wire for synthetic inventories.
+
+Compares the stdlib encoder (what `jsonify` uses), orjson (if installed) and
+the resulting gzip / brotli sizes and compression times:
+
+    python benchmarks/bench_json.py --queues 1000 5000 20000 --output json-bench.json
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import json_response  # noqa: E402
+from aws_sns_sqs_map import build_inventory  # noqa: E402
+from benchmarks.fake_aws import FakeAccountSpec, FakeAwsAccount  # noqa: E402
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="JSON encode / compression benchmark")
+    parser.add_argument("--queues", type=int, nargs="+", default=[1000, 10000], help="Queues in the synthetic inventory (one run per value)")
+    parser.add_argument("--regions", type=int, default=2, help="Regions the queues are spread over")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path (default: stdout)")
+    return parser.parse_args(argv)
+
+
+def timed(fn: Callable[[], bytes], repeat: int):
+    durations = []
+    result = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations), result
+
+
+def bench_inventory(inventory, repeat: int) -> Dict[str, object]:
+    encoders: Dict[str, Callable[[], bytes]] = {
+        "stdlib": lambda: json.dumps(inventory, separators=(",", ":")).encode("utf-8"),
+        "stdlib_indent2": lambda: json.dumps(inventory, indent=2).encode("utf-8"),
+    }
+    if json_response.orjson is not None:
+        encoders["orjson"] = lambda: json_response.orjson.dumps(inventory)
+
+    result: Dict[str, object] = {"encode": {}, "wire": {}}
+    body = b""
+    for name, fn in encoders.items():
+        seconds, encoded = timed(fn, repeat)
+        result["encode"][name] = {"median_ms": seconds * 1000, "bytes": len(encoded)}  # type: ignore
+        if name == "stdlib":
+            body = encoded
+
+    result["wire"]["identity"] = {"bytes": len(body), "compress_ms": 0.0}  # type: ignore
+    seconds, compressed = timed(lambda: gzip.compress(body, compresslevel=json_response.GZIP_LEVEL), repeat)
+    result["wire"]["gzip"] = {"bytes": len(compressed), "compress_ms": seconds * 1000}  # type: ignore
+    if json_response.brotli is not None:
+        seconds, compressed = timed(lambda: json_response.brotli.compress(body, quality=json_response.BROTLI_QUALITY), repeat)
+        result["wire"]["br"] = {"bytes": len(compressed), "compress_ms": seconds * 1000}  # type: ignore
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    runs = []
+    for queues in args.queues:
+        per_region = max(queues // args.regions, 1)
+        account = FakeAwsAccount(FakeAccountSpec(
+            regions=args.regions, queues_per_region=per_region, topics_per_region=max(per_region // 4, 1), subscriptions_per_topic=3
+        ))
+        inventory = build_inventory(account.session(), account.regions)
+        result = bench_inventory(inventory, args.repeat)
+        result["queues"] = per_region * args.regions
+        runs.append(result)
+
+        encode = ", ".join(f"{k} {v['median_ms']:.1f} ms" for k, v in result["encode"].items())  # type: ignore
+        wire = ", ".join(f"{k} {v['bytes'] / 1024:.0f} KiB" for k, v in result["wire"].items())  # type: ignore
+        print(f"{result['queues']:>7} queues | encode: {encode} | wire: {wire}", file=sys.stderr)
+
+    output = json.dumps({"orjson": json_response.orjson is not None, "brotli": json_response.brotli is not None, "runs": runs}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
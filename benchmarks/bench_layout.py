@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark the layered layout and the Draw.io / JSON Canvas exporters.
+
+Builds a synthetic inventory of about `--nodes` topics + queues (1 topic for
+4 queues, 2 subscriptions per topic, a share of orphan queues) and times the
+layout alone and both exports:
+
+    python benchmarks/bench_layout.py --nodes 10000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from diagram_export import QUEUE_SIZE, TOPIC_SIZE, inventory_graph, to_canvas, to_drawio  # noqa: E402
+from layout import layered_layout  # noqa: E402
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Diagram layout benchmark")
+    parser.add_argument("--nodes", type=int, default=10000, help="Approximate number of topics + queues")
+    parser.add_argument("--subscriptions-per-topic", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path (default: stdout)")
+    return parser.parse_args(argv)
+
+
+def synthetic_inventory(nodes: int, subscriptions_per_topic: int, seed: int) -> List[Dict[str, object]]:
+    rng = random.Random(seed)
+    account = "123456789012"
+    topics = max(nodes // 5, 1)
+    queues = max(nodes - topics, 1)
+    topic_arns = [f"arn:aws:sns:us-east-1:{account}:topic-{i:05d}" for i in range(topics)]
+    queue_arns = [f"arn:aws:sqs:us-east-1:{account}:queue-{i:05d}" for i in range(queues)]
+    links = []
+    for i, arn in enumerate(topic_arns):
+        # Mostly local fan-out (services owning their queues) with some cross-links
+        for _ in range(subscriptions_per_topic):
+            j = (4 * i + rng.randrange(4)) % queues if rng.random() < 0.9 else rng.randrange(queues)
+            links.append({"from_arn": arn, "to_arn": queue_arns[j], "protocol": "sqs", "attributes": {}})
+    return [{
+        "region": "us-east-1",
+        "accountId": account,
+        "topics": [{"arn": arn, "name": arn.rsplit(":", 1)[-1]} for arn in topic_arns],
+        "queues": [{"arn": arn, "name": arn.rsplit(":", 1)[-1], "url": f"https://sqs/{arn.rsplit(':', 1)[-1]}"} for arn in queue_arns],
+        "links": links,
+    }]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    inventory = synthetic_inventory(args.nodes, args.subscriptions_per_topic, args.seed)
+    topics, queues, edges, _ = inventory_graph(inventory)
+    nodes = [(arn, *TOPIC_SIZE) for arn in topics] + [(arn, *QUEUE_SIZE) for arn in queues]
+
+    layout_s, positions = timed(lambda: layered_layout(nodes, edges, direction="TB"))
+    xs = [x for x, _ in positions.values()]
+    ys = [y for _, y in positions.values()]
+    results: Dict[str, object] = {
+        "nodes": len(nodes),
+        "edges": len(edges),
+        "layout_s": layout_s,
+        "bounding_box": [max(xs) - min(xs), max(ys) - min(ys)],
+    }
+    results["drawio_s"], content = timed(lambda: to_drawio(inventory))
+    results["drawio_bytes"] = len(content)
+    results["canvas_s"], _ = timed(lambda: to_canvas(inventory))
+
+    print("  ".join(f"{k} {v:.3f}" if isinstance(v, float) else f"{k} {v}" for k, v in results.items()), file=sys.stderr)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark SQL export generation and load time for large inventories.
+
+Compares the former one-INSERT-per-row script with the batched INSERT script
+and the direct SQLite load (both loaded into SQLite for timing):
+
+    python benchmarks/bench_sql.py --rows 100000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sql_export import TABLES, table_rows, to_sql_copy, to_sql_inserts, write_sqlite  # noqa: E402
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="SQL export benchmark")
+    parser.add_argument("--rows", type=int, default=100000, help="Approximate total rows (topics + queues + subscriptions)")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path (default: stdout)")
+    return parser.parse_args(argv)
+
+
+def synthetic_inventory(rows: int) -> List[Dict[str, object]]:
+    # Roughly 1 topic : 2 queues : 2 subscriptions
+    topics = max(rows // 5, 1)
+    queues = topics * 2
+    account = "123456789012"
+    return [{
+        "region": "us-east-1",
+        "accountId": account,
+        "topics": [{"arn": f"arn:aws:sns:us-east-1:{account}:topic-{i}", "name": f"topic-{i}"} for i in range(topics)],
+        "queues": [{"arn": f"arn:aws:sqs:us-east-1:{account}:queue-{i}", "name": f"queue-{i}",
+                    "url": f"https://sqs.us-east-1.amazonaws.com/{account}/queue-{i}"} for i in range(queues)],
+        "links": [{"from_arn": f"arn:aws:sns:us-east-1:{account}:topic-{i}", "to_arn": f"arn:aws:sqs:us-east-1:{account}:queue-{2 * i + k}",
+                   "protocol": "sqs", "attributes": {}} for i in range(topics) for k in range(2)],
+    }]
+
+
+def legacy_inserts(inventory: List[Dict[str, object]]) -> str:
+    """One INSERT per row, as produced by the previous /api/export/sql."""
+    rows = table_rows(inventory)
+    parts = [ddl for _, _, ddl in TABLES] + [""]
+    for name, _, _ in TABLES:
+        for row in rows[name]:
+            parts.append(f"INSERT INTO {name} VALUES (" + ", ".join(f"'{v}'" for v in row) + ");")
+    return "\n".join(parts)
+
+
+def load_script(script: str) -> float:
+    conn = sqlite3.connect(":memory:")
+    start = time.perf_counter()
+    conn.executescript("BEGIN;\n" + script + "\nCOMMIT;")
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    inventory = synthetic_inventory(args.rows)
+    results: Dict[str, Dict[str, float]] = {}
+
+    for name, fn in [("legacy_inserts", legacy_inserts), ("batched_inserts", to_sql_inserts), ("copy", to_sql_copy)]:
+        generate_s, script = timed(lambda: fn(inventory))
+        results[name] = {"generate_s": generate_s, "bytes": len(script)}
+        if name != "copy":
+            # COPY needs PostgreSQL; only generation is measured
+            results[name]["load_sqlite_s"] = load_script(script)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        total_s, counts = timed(lambda: write_sqlite(inventory, os.path.join(tmp, "inventory.sqlite")))
+    results["sqlite_file"] = {"total_s": total_s, "rows": sum(counts.values())}
+
+    for name, r in results.items():
+        print(f"{name:<16} " + "  ".join(f"{k} {v:.3f}" if isinstance(v, float) else f"{k} {v}" for k, v in r.items()), file=sys.stderr)
+    output = json.dumps({"rows": sum(counts.values()), "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
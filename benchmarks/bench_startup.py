@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: import time and time to first `/api/scan` response.
+
+Each run starts a fresh interpreter that imports the entry point, then posts
+two scans (cold, then warm) through the Flask test client. AWS is not
+contacted: a botocore `before-send` hook answers ListTopics / ListQueues with
+empty canned responses, so session creation, model loading, request
+serialization and response parsing all run for real.
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --entry vercel --idle-ms 100
+
+Entries: `app` (import app), `vercel` (api/index.py, with background model
+preload), `vercel-no-preload` (same with AWS_PRELOAD_MODELS=0).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRIES = ("app", "vercel", "vercel-no-preload")
+
+STUB_BODIES = {
+    "sns.ListTopics": (
+        b'<ListTopicsResponse xmlns="http://sns.amazonaws.com/doc/2010-03-31/"><ListTopicsResult><Topics/>'
+        b'</ListTopicsResult><ResponseMetadata><RequestId>bench</RequestId></ResponseMetadata></ListTopicsResponse>',
+        "text/xml",
+    ),
+    "sqs.ListQueues": (b'{"QueueUrls": []}', "application/x-amz-json-1.0"),
+}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Cold-start benchmark")
+    parser.add_argument("--entry", choices=ENTRIES + ("all",), default="all")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per entry")
+    parser.add_argument("--idle-ms", type=float, default=0.0, help="Delay between import and the first request")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path (default: stdout)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+class _Raw:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+def _stub_send(request, event_name: str, **kwargs):
+    from botocore.awsrequest import AWSResponse  # type: ignore
+
+    _, service, operation = event_name.split(".", 2)
+    body, content_type = STUB_BODIES.get(f"{service}.{operation}", (b"{}", "application/x-amz-json-1.0"))
+    return AWSResponse(request.url, 200, {"Content-Type": content_type, "x-amzn-RequestId": "bench"}, _Raw(body))
+
+
+def child(entry: str, idle_ms: float) -> Dict[str, float]:
+    start = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    if entry == "app":
+        import app as app_module
+    else:
+        import importlib.util
+        spec = importlib.util.spec_from_file_location("vercel_index", os.path.join(ROOT, "api", "index.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)  # type: ignore
+        app_module = sys.modules["app"]
+    import_s = time.perf_counter() - start
+
+    real_get_session = app_module.get_session
+
+    def stubbed_get_session(**kwargs):
+        session = real_get_session(**kwargs)
+        session.events.register("before-send.*.*", _stub_send, unique_id="bench-startup-stub")
+        return session
+
+    app_module.get_session = stubbed_get_session
+    if idle_ms:
+        time.sleep(idle_ms / 1000.0)
+
+    client = app_module.app.test_client()
+    body = {"regions": "us-east-1", "access_key": "AKIABENCH", "secret_key": "bench"}
+    timings = {"import_s": import_s}
+    for name in ("first_scan_s", "warm_scan_s"):
+        t0 = time.perf_counter()
+        response = client.post("/api/scan", json=body)
+        timings[name] = time.perf_counter() - t0
+        if response.status_code != 200:
+            raise SystemExit(f"/api/scan failed: {response.status_code} {response.data[:200]!r}")
+    timings["total_s"] = time.perf_counter() - start
+    return timings
+
+
+def run_entry(entry: str, runs: int, idle_ms: float) -> Dict[str, Dict[str, float]]:
+    env = dict(os.environ)
+    env.pop("VERCEL", None)
+    if entry == "vercel-no-preload":
+        env["AWS_PRELOAD_MODELS"] = "0"
+    samples: Dict[str, List[float]] = {}
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", "--entry", "app" if entry == "app" else "vercel",
+             "--idle-ms", str(idle_ms)],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        for key, value in json.loads(out.strip().splitlines()[-1]).items():
+            samples.setdefault(key, []).append(value)
+    return {key: {"median": statistics.median(v), "min": min(v), "max": max(v)} for key, v in samples.items()}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.child:
+        print(json.dumps(child(args.entry, args.idle_ms)))
+        return
+
+    entries = ENTRIES if args.entry == "all" else (args.entry,)
+    results = {entry: run_entry(entry, args.runs, args.idle_ms) for entry in entries}
+    for entry, metrics in results.items():
+        print(f"{entry:<18} " + "  ".join(f"{k} {v['median'] * 1000:.0f}ms" for k, v in metrics.items()), file=sys.stderr)
+    output = json.dumps({"runs": args.runs, "idle_ms": args.idle_ms, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
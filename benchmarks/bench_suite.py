@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite running against the fake AWS backend.
+
+Benchmarks `build_inventory`, every exporter and the `/api/stats` and
+`/api/monitor` endpoints on a synthetic account, then writes machine-readable
+results (JSON) that can be compared across commits:
+
+    python benchmarks/bench_suite.py --regions 2 --topics 200 --queues 500 --output before.json
+    git checkout other-branch
+    python benchmarks/bench_suite.py --regions 2 --topics 200 --queues 500 --compare before.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict
+from typing import Callable, Dict, List, Optional
+from unittest.mock import patch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fake_aws import FakeAccountSpec, FakeAwsAccount  # noqa: E402
+from aws_sns_sqs_map import build_inventory, to_mermaid  # noqa: E402
+from app import app  # noqa: E402
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline benchmarks against a synthetic SNS/SQS account")
+    parser.add_argument("--regions", type=int, default=2, help="Number of regions")
+    parser.add_argument("--topics", type=int, default=100, help="Topics per region")
+    parser.add_argument("--queues", type=int, default=200, help="Queues per region")
+    parser.add_argument("--subscriptions", type=int, default=2, help="SQS subscriptions per topic")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Injected latency per AWS call (ms)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Probability that a call is throttled (0-1)")
+    parser.add_argument("--monitor-queues", type=int, default=20, help="Queues polled by the /api/monitor benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark")
+    parser.add_argument("--only", action="append", default=None, help="Run only benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path (default: stdout)")
+    parser.add_argument("--compare", default=None, help="Previous results JSON to compare against")
+    return parser.parse_args(argv)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def run_case(name: str, fn: Callable[[], object], account: FakeAwsAccount, repeat: int) -> Dict[str, object]:
+    durations: List[float] = []
+    calls = throttles = 0
+    for _ in range(repeat):
+        account.reset_counters()
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+        calls = sum(account.calls.values())
+        throttles = sum(account.throttles.values())
+    return {
+        "name": name,
+        "repeat": repeat,
+        "min_s": min(durations),
+        "median_s": statistics.median(durations),
+        "mean_s": statistics.mean(durations),
+        "max_s": max(durations),
+        "aws_calls": calls,
+        "aws_throttles": throttles,
+    }
+
+
+def post_json(client, path: str, payload) -> object:
+    response = client.post(path, json=payload)
+    if response.status_code != 200:
+        raise RuntimeError(f"{path} returned {response.status_code}: {response.data[:200]!r}")
+    return response.data
+
+
+def build_cases(account: FakeAwsAccount, args: argparse.Namespace) -> Dict[str, Callable[[], object]]:
+    session = account.session()
+    client = app.test_client()
+    inventory = build_inventory(session, account.regions)
+    items = account.items()
+    monitor_items = [i for i in items if i["type"] == "queue"][: args.monitor_queues]
+    regions = ",".join(account.regions)
+
+    return {
+        "build_inventory": lambda: build_inventory(session, account.regions),
+        "api_scan": lambda: post_json(client, "/api/scan", {"regions": regions}),
+        "export_mermaid": lambda: to_mermaid(inventory),
+        "api_export_mermaid": lambda: post_json(client, "/api/export/mermaid", inventory),
+        "api_export_sql": lambda: post_json(client, "/api/export/sql", inventory),
+        "api_export_drawio": lambda: post_json(client, "/api/export/drawio", inventory),
+        "api_export_canvas": lambda: post_json(client, "/api/export/canvas", inventory),
+        "api_stats": lambda: post_json(client, "/api/stats", {"items": items}),
+        "api_monitor": lambda: post_json(client, "/api/monitor", {"items": monitor_items}),
+    }
+
+
+def compare(results: List[Dict[str, object]], baseline_path: str) -> str:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {r["name"]: r for r in json.load(f).get("results", [])}
+    lines = [f"{'benchmark':<22} {'baseline s':>11} {'current s':>11} {'change':>8}"]
+    for r in results:
+        base = baseline.get(r["name"])
+        if not base:
+            lines.append(f"{r['name']:<22} {'-':>11} {r['median_s']:>11.4f} {'new':>8}")
+            continue
+        change = (r["median_s"] - base["median_s"]) / base["median_s"] * 100 if base["median_s"] else 0.0  # type: ignore
+        lines.append(f"{r['name']:<22} {base['median_s']:>11.4f} {r['median_s']:>11.4f} {change:>+7.1f}%")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    spec = FakeAccountSpec(
+        regions=args.regions,
+        topics_per_region=args.topics,
+        queues_per_region=args.queues,
+        subscriptions_per_topic=args.subscriptions,
+        latency_ms=args.latency_ms,
+        throttle_rate=args.throttle_rate,
+    )
+    account = FakeAwsAccount(spec)
+
+    results: List[Dict[str, object]] = []
+    with patch("app.get_session", return_value=account.session()):
+        for name, fn in build_cases(account, args).items():
+            if args.only and not any(o in name for o in args.only):
+                continue
+            result = run_case(name, fn, account, args.repeat)
+            results.append(result)
+            print(f"{name:<22} median {result['median_s'] * 1000:9.2f} ms  calls {result['aws_calls']}", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "spec": asdict(spec),
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+    if args.compare:
+        sys.stderr.write(compare(results, args.compare) + "\n")
+
+
+if __name__ == "__main__":
+    main()
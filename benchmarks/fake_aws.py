@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+In-process fake SNS / SQS / CloudWatch backend for offline benchmarks.
+
+`FakeAwsAccount` generates a synthetic account (regions x topics x queues x
+subscriptions) and hands out `FakeSession` objects that quack like a
+`boto3.Session` for the calls made by `aws_sns_sqs_map` and `app`. Every call
+can be slowed down with a fixed per-call latency and fail with a throttling
+error at a given rate; throttled calls are retried with exponential backoff the
+way botocore's "standard" retry mode does, so throttling shows up as latency
+rather than as missing data.
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, Optional
+
+from botocore.exceptions import ClientError
+
+
+@dataclass
+class FakeAccountSpec:
+    regions: int = 1
+    topics_per_region: int = 50
+    queues_per_region: int = 100
+    subscriptions_per_topic: int = 2
+    messages_per_queue: int = 1
+    latency_ms: float = 0.0
+    throttle_rate: float = 0.0
+    max_attempts: int = 5
+    retry_base_ms: float = 5.0
+    long_poll_ms: float = 0.0
+    # The last `slow_regions` regions answer every call after slow_latency_ms (degraded region)
+    slow_regions: int = 0
+    slow_latency_ms: float = 0.0
+    # Every queue whose index is not a multiple of dlq_every redrives to the previous multiple (0 = no DLQs)
+    dlq_every: int = 0
+    seed: int = 42
+    account_id: str = "123456789012"
+
+
+REGION_NAMES = [
+    "us-east-1", "us-east-2", "us-west-1", "us-west-2", "eu-west-1", "eu-west-2",
+    "eu-west-3", "eu-central-1", "eu-north-1", "ap-south-1", "ap-northeast-1",
+    "ap-northeast-2", "ap-southeast-1", "ap-southeast-2", "ca-central-1", "sa-east-1",
+]
+
+
+class _RegionData:
+    def __init__(self, spec: FakeAccountSpec, region: str, rng: random.Random):
+        account = spec.account_id
+        self.region = region
+        self.topic_arns: List[str] = [
+            f"arn:aws:sns:{region}:{account}:topic-{i:05d}" for i in range(spec.topics_per_region)
+        ]
+        self.queues: Dict[str, Dict[str, str]] = {}
+        for i in range(spec.queues_per_region):
+            name = f"queue-{i:05d}"
+            self.queues[name] = {
+                "name": name,
+                "url": f"https://sqs.{region}.amazonaws.com/{account}/{name}",
+                "arn": f"arn:aws:sqs:{region}:{account}:{name}",
+            }
+            if spec.dlq_every and i % spec.dlq_every:
+                dlq = f"queue-{i - i % spec.dlq_every:05d}"
+                self.queues[name]["redrive"] = json.dumps(
+                    {"deadLetterTargetArn": f"arn:aws:sqs:{region}:{account}:{dlq}", "maxReceiveCount": 5})
+        self.queue_by_url = {q["url"]: q for q in self.queues.values()}
+        self.queue_names = sorted(self.queues)
+
+        self.account_id = account
+        queue_arns = [q["arn"] for q in self.queues.values()]
+        self.subscriptions: Dict[str, List[Dict[str, str]]] = {}
+        for topic_arn in self.topic_arns:
+            count = min(spec.subscriptions_per_topic, len(queue_arns))
+            targets = rng.sample(queue_arns, count) if count else []
+            self.subscriptions[topic_arn] = [
+                {
+                    "SubscriptionArn": f"{topic_arn}:{rng.getrandbits(64):016x}",
+                    "Owner": account,
+                    "Protocol": "sqs",
+                    "Endpoint": target,
+                    "TopicArn": topic_arn,
+                }
+                for target in targets
+            ]
+        self.subscription_by_arn = {
+            s["SubscriptionArn"]: s for subs in self.subscriptions.values() for s in subs
+        }
+
+    def add_queue(self, name: str) -> Dict[str, str]:
+        queue = {
+            "name": name,
+            "url": f"https://sqs.{self.region}.amazonaws.com/{self.account_id}/{name}",
+            "arn": f"arn:aws:sqs:{self.region}:{self.account_id}:{name}",
+        }
+        self.queues[name] = queue
+        self.queue_by_url[queue["url"]] = queue
+        bisect.insort(self.queue_names, name)
+        return queue
+
+
+class FakeAwsAccount:
+    """Synthetic AWS account shared by every fake client it creates."""
+
+    def __init__(self, spec: Optional[FakeAccountSpec] = None):
+        self.spec = spec or FakeAccountSpec()
+        rng = random.Random(self.spec.seed)
+        self.regions: List[str] = [
+            REGION_NAMES[i] if i < len(REGION_NAMES) else f"xx-fake-{i}" for i in range(self.spec.regions)
+        ]
+        self.data: Dict[str, _RegionData] = {r: _RegionData(self.spec, r, rng) for r in self.regions}
+        self.calls: Counter = Counter()
+        self.throttles: Counter = Counter()
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.spec.seed + 1)
+
+    def session(self) -> "FakeSession":
+        return FakeSession(self)
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.throttles.clear()
+
+    def region(self, region: Optional[str]) -> _RegionData:
+        data = self.data.get(region or "")
+        if data is None:
+            # Region not part of the synthetic account: behave like an empty region
+            data = _RegionData(FakeAccountSpec(topics_per_region=0, queues_per_region=0), region or "", random.Random(0))
+        return data
+
+    def items(self) -> List[Dict[str, str]]:
+        """Topics and queues in the format posted to /api/stats and /api/monitor."""
+        items: List[Dict[str, str]] = []
+        for region, data in self.data.items():
+            for arn in data.topic_arns:
+                items.append({"arn": arn, "name": arn.rsplit(":", 1)[-1], "region": region, "type": "topic"})
+            for q in data.queues.values():
+                items.append({"arn": q["arn"], "name": q["name"], "region": region, "type": "queue"})
+        return items
+
+    def call(self, service: str, operation: str, fn: Callable[[], dict], region: Optional[str] = None) -> dict:
+        """Run one fake API call with injected latency, throttling and retries."""
+        spec = self.spec
+        latency_ms = spec.latency_ms
+        if spec.slow_regions and region in self.regions[-spec.slow_regions:]:
+            latency_ms = spec.slow_latency_ms
+        for attempt in range(1, spec.max_attempts + 1):
+            if latency_ms:
+                time.sleep(latency_ms / 1000.0)
+            with self._lock:
+                self.calls[(service, operation)] += 1
+                throttled = spec.throttle_rate > 0 and self._rng.random() < spec.throttle_rate
+                if throttled:
+                    self.throttles[(service, operation)] += 1
+                jitter = self._rng.random()
+            if not throttled:
+                response = fn()
+                response.setdefault("ResponseMetadata", {"HTTPStatusCode": 200, "RetryAttempts": attempt - 1})
+                return response
+            if attempt < spec.max_attempts:
+                time.sleep(jitter * spec.retry_base_ms * (2 ** (attempt - 1)) / 1000.0)
+        raise ClientError({"Error": {"Code": "Throttling", "Message": "Rate exceeded"}}, operation)
+
+
+class FakeSession:
+    """Drop-in for `boto3.Session` backed by a `FakeAwsAccount`."""
+
+    def __init__(self, account: FakeAwsAccount):
+        self.account = account
+
+    def client(self, service_name: str, region_name: Optional[str] = None, config=None, **kwargs):
+        factories = {"sns": FakeSNSClient, "sqs": FakeSQSClient, "cloudwatch": FakeCloudWatchClient, "sts": FakeSTSClient}
+        if service_name not in factories:
+            raise ValueError(f"Fake backend does not implement service {service_name!r}")
+        return factories[service_name](self.account, region_name or "us-east-1")
+
+    def get_available_regions(self, service_name: str) -> List[str]:
+        # Every known region name: the ones beyond the account's regions behave like empty regions
+        return REGION_NAMES + [r for r in self.account.regions if r not in REGION_NAMES]
+
+    def get_credentials(self):
+        return SimpleNamespace(access_key=f"AKIAFAKE{self.account.spec.account_id}", secret_key="fake", token=None)
+
+
+class _FakePaginator:
+    def __init__(self, fetch_page: Callable[..., dict]):
+        self._fetch_page = fetch_page
+
+    def paginate(self, PaginationConfig: Optional[dict] = None, **kwargs) -> Iterator[dict]:
+        token: Optional[str] = None
+        page_size = (PaginationConfig or {}).get("PageSize")
+        if page_size:
+            kwargs["MaxResults"] = page_size
+        while True:
+            page = self._fetch_page(token, **kwargs)
+            yield page
+            token = page.get("NextToken")
+            if not token:
+                return
+
+
+def _slice(items: list, token: Optional[str], size: int):
+    start = int(token or 0)
+    end = start + size
+    return items[start:end], (str(end) if end < len(items) else None)
+
+
+class _FakeClient:
+    service = ""
+
+    def __init__(self, account: FakeAwsAccount, region: str):
+        self.account = account
+        self.region = region
+        self.data = account.region(region)
+        self.meta = SimpleNamespace(region_name=region, events=None)
+
+    def _call(self, operation: str, fn: Callable[[], dict]) -> dict:
+        return self.account.call(self.service, operation, fn, self.region)
+
+
+class FakeSNSClient(_FakeClient):
+    service = "sns"
+    page_size = 100
+
+    def get_paginator(self, name: str) -> _FakePaginator:
+        if name == "list_topics":
+            return _FakePaginator(lambda token, **kw: self.list_topics(NextToken=token))
+        if name == "list_subscriptions_by_topic":
+            return _FakePaginator(lambda token, TopicArn, **kw: self.list_subscriptions_by_topic(TopicArn=TopicArn, NextToken=token))
+        raise ValueError(f"Unknown SNS paginator {name!r}")
+
+    def list_topics(self, NextToken: Optional[str] = None) -> dict:
+        def run():
+            arns, token = _slice(self.data.topic_arns, NextToken, self.page_size)
+            page = {"Topics": [{"TopicArn": a} for a in arns]}
+            if token:
+                page["NextToken"] = token
+            return page
+        return self._call("ListTopics", run)
+
+    def get_subscription_attributes(self, SubscriptionArn: str) -> dict:
+        def run():
+            sub = self.data.subscription_by_arn.get(SubscriptionArn)
+            if sub is None:
+                raise ClientError({"Error": {"Code": "NotFound", "Message": "Subscription does not exist"}}, "GetSubscriptionAttributes")
+            # Deterministic per subscription: every other one is raw, every third one filters
+            index = int(SubscriptionArn.rsplit(":", 1)[-1], 16)
+            attrs = dict(sub, ConfirmationWasAuthenticated="true", PendingConfirmation="false",
+                         RawMessageDelivery="true" if index % 2 else "false")
+            if index % 3 == 0:
+                attrs["FilterPolicy"] = json.dumps({"event": ["created", "updated"]})
+                attrs["FilterPolicyScope"] = "MessageAttributes"
+            return {"Attributes": attrs}
+        return self._call("GetSubscriptionAttributes", run)
+
+    def list_subscriptions_by_topic(self, TopicArn: str, NextToken: Optional[str] = None) -> dict:
+        def run():
+            subs, token = _slice(self.data.subscriptions.get(TopicArn, []), NextToken, self.page_size)
+            page = {"Subscriptions": [dict(s) for s in subs]}
+            if token:
+                page["NextToken"] = token
+            return page
+        return self._call("ListSubscriptionsByTopic", run)
+
+
+class FakeSQSClient(_FakeClient):
+    service = "sqs"
+    page_size = 1000
+
+    def get_paginator(self, name: str) -> _FakePaginator:
+        if name == "list_queues":
+            return _FakePaginator(lambda token, **kw: self.list_queues(NextToken=token, **kw))
+        raise ValueError(f"Unknown SQS paginator {name!r}")
+
+    def list_queues(self, QueueNamePrefix: str = "", NextToken: Optional[str] = None, MaxResults: Optional[int] = None) -> dict:
+        def run():
+            all_names = self.data.queue_names
+            # Names are kept sorted: the prefix matches form one contiguous range
+            start = bisect.bisect_left(all_names, QueueNamePrefix)
+            end = bisect.bisect_left(all_names, QueueNamePrefix + "\U0010ffff") if QueueNamePrefix else len(all_names)
+            names = all_names[start:end]
+            if MaxResults is None and NextToken is None:
+                # Without MaxResults, SQS returns at most 1000 URLs and no token
+                page_names, token = names[:1000], None
+            else:
+                page_names, token = _slice(names, NextToken, min(MaxResults or self.page_size, self.page_size))
+            page: dict = {"QueueUrls": [self.data.queues[n]["url"] for n in page_names]}
+            if token:
+                page["NextToken"] = token
+            return page
+        return self._call("ListQueues", run)
+
+    def _queue(self, url: str, operation: str) -> Dict[str, str]:
+        queue = self.data.queue_by_url.get(url)
+        if queue is None:
+            raise ClientError({"Error": {"Code": "AWS.SimpleQueueService.NonExistentQueue", "Message": "Queue does not exist"}}, operation)
+        return queue
+
+    def get_queue_attributes(self, QueueUrl: str, AttributeNames: Optional[List[str]] = None) -> dict:
+        def run():
+            queue = self._queue(QueueUrl, "GetQueueAttributes")
+            attrs = {
+                "QueueArn": queue["arn"],
+                "ApproximateNumberOfMessages": str(self.account.spec.messages_per_queue),
+                "ApproximateNumberOfMessagesNotVisible": "0",
+                "CreatedTimestamp": "1700000000",
+                "DelaySeconds": "0",
+                "MaximumMessageSize": "262144",
+                "MessageRetentionPeriod": "345600",
+                "ReceiveMessageWaitTimeSeconds": "0",
+                "VisibilityTimeout": "30",
+            }
+            if "redrive" in queue:
+                attrs["RedrivePolicy"] = queue["redrive"]
+            names = AttributeNames or []
+            if "All" not in names:
+                attrs = {k: v for k, v in attrs.items() if k in names}
+            return {"Attributes": attrs}
+        return self._call("GetQueueAttributes", run)
+
+    def get_queue_url(self, QueueName: str, **kwargs) -> dict:
+        def run():
+            queue = self.data.queues.get(QueueName)
+            if queue is None:
+                raise ClientError({"Error": {"Code": "AWS.SimpleQueueService.NonExistentQueue", "Message": "Queue does not exist"}}, "GetQueueUrl")
+            return {"QueueUrl": queue["url"]}
+        return self._call("GetQueueUrl", run)
+
+    def receive_message(self, QueueUrl: str, MaxNumberOfMessages: int = 1, WaitTimeSeconds: int = 0, **kwargs) -> dict:
+        def run():
+            queue = self._queue(QueueUrl, "ReceiveMessage")
+            count = min(self.account.spec.messages_per_queue, MaxNumberOfMessages)
+            if not count:
+                if WaitTimeSeconds and self.account.spec.long_poll_ms:
+                    time.sleep(min(WaitTimeSeconds * 1000.0, self.account.spec.long_poll_ms) / 1000.0)
+                return {}
+            now_ms = int(time.time() * 1000)
+            messages = []
+            for i in range(count):
+                envelope = {
+                    "Type": "Notification",
+                    "MessageId": f"{queue['name']}-{i}",
+                    "TopicArn": self.data.topic_arns[0] if self.data.topic_arns else "",
+                    "Message": json.dumps({"index": i, "queue": queue["name"]}),
+                    "Timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime((now_ms - 250) / 1000.0)) + ".000Z",
+                }
+                messages.append({
+                    "MessageId": envelope["MessageId"],
+                    "ReceiptHandle": f"rh-{queue['name']}-{i}",
+                    "Body": json.dumps(envelope),
+                    "Attributes": {"SentTimestamp": str(now_ms - 200), "ApproximateReceiveCount": "1"},
+                })
+            return {"Messages": messages}
+        return self._call("ReceiveMessage", run)
+
+    def change_message_visibility(self, QueueUrl: str, ReceiptHandle: str, VisibilityTimeout: int) -> dict:
+        return self._call("ChangeMessageVisibility", lambda: {})
+
+
+class FakeCloudWatchClient(_FakeClient):
+    service = "cloudwatch"
+
+    def get_metric_statistics(self, Namespace: str, MetricName: str, Dimensions: list, StartTime, EndTime, Period: int, Statistics: list) -> dict:
+        def run():
+            days = max(int((EndTime - StartTime).total_seconds() // Period), 1)
+            return {"Label": MetricName, "Datapoints": [{"Timestamp": StartTime, "Sum": float(d % 7)} for d in range(days)]}
+        return self._call("GetMetricStatistics", run)
+
+
+class FakeSTSClient(_FakeClient):
+    service = "sts"
+
+    def get_caller_identity(self) -> dict:
+        account = self.account.spec.account_id
+        return self._call("GetCallerIdentity", lambda: {"Account": account, "Arn": f"arn:aws:iam::{account}:user/bench", "UserId": "bench"})
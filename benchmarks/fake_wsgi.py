@@ -0,0 +1,33 @@
+"""
+WSGI entry point serving `app` on top of the fake AWS backend.
+
+Lets the load test target a real multi-worker deployment without AWS access:
+
+    FAKE_AWS_LATENCY_MS=20 gunicorn -w 4 -b 127.0.0.1:8000 benchmarks.fake_wsgi:app
+    python benchmarks/loadtest.py --url http://127.0.0.1:8000 --clients 20
+
+The synthetic account is configured with FAKE_AWS_* environment variables and
+must match the load test options (--regions, --topics, --queues, ...).
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+from benchmarks.fake_aws import FakeAccountSpec, FakeAwsAccount  # noqa: E402
+
+account = FakeAwsAccount(FakeAccountSpec(
+    regions=int(os.environ.get("FAKE_AWS_REGIONS", "2")),
+    topics_per_region=int(os.environ.get("FAKE_AWS_TOPICS", "100")),
+    queues_per_region=int(os.environ.get("FAKE_AWS_QUEUES", "200")),
+    subscriptions_per_topic=int(os.environ.get("FAKE_AWS_SUBSCRIPTIONS", "2")),
+    messages_per_queue=int(os.environ.get("FAKE_AWS_MESSAGES_PER_QUEUE", "1")),
+    long_poll_ms=float(os.environ.get("FAKE_AWS_LONG_POLL_MS", "0")),
+    latency_ms=float(os.environ.get("FAKE_AWS_LATENCY_MS", "0")),
+    throttle_rate=float(os.environ.get("FAKE_AWS_THROTTLE_RATE", "0")),
+))
+
+# Every request gets a session on the synthetic account instead of real AWS
+app_module.get_session = lambda *args, **kwargs: account.session()
+app = app_module.app
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+HTTP load test for the Flask endpoints under concurrent dashboard clients.
+
+By default the Flask `app` is served in-process (threaded Werkzeug server) on
+top of the fake AWS backend. Each simulated client behaves like an open
+dashboard: one `/api/scan`, one `/api/stats`, then `/api/monitor` every
+`--monitor-interval` seconds (optionally re-scanning every `--rescan-every`
+monitor rounds). At the end, p50/p95/p99 latency, throughput and server memory
+are reported per endpoint:
+
+    python benchmarks/loadtest.py --clients 10 --duration 60 --latency-ms 20
+
+Use `--url` (and `--server-pid` for memory) to target an already running
+deployment instead, e.g. gunicorn with several workers serving
+`benchmarks.fake_wsgi:app` (the Flask app on the fake backend).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import resource
+import sys
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List, Optional
+from unittest.mock import patch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fake_aws import FakeAccountSpec, FakeAwsAccount  # noqa: E402
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Concurrent dashboard clients load test")
+    parser.add_argument("--clients", type=int, default=5, help="Simulated concurrent dashboard clients")
+    parser.add_argument("--duration", type=float, default=30.0, help="Test duration in seconds")
+    parser.add_argument("--monitor-interval", type=float, default=3.0, help="Seconds between monitor polls (UI uses 3s)")
+    parser.add_argument("--rescan-every", type=int, default=0, help="Re-scan after this many monitor rounds (0 = never)")
+    parser.add_argument("--monitor-queues", type=int, default=10, help="Queues selected in each client's monitor")
+    parser.add_argument("--regions", type=int, default=2, help="Number of regions in the synthetic account")
+    parser.add_argument("--topics", type=int, default=100, help="Topics per region")
+    parser.add_argument("--queues", type=int, default=200, help="Queues per region")
+    parser.add_argument("--subscriptions", type=int, default=2, help="SQS subscriptions per topic")
+    parser.add_argument("--messages-per-queue", type=int, default=1, help="Messages returned by each receive_message")
+    parser.add_argument("--long-poll-ms", type=float, default=0.0, help="Simulated long-poll wait on empty queues (ms)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Injected latency per AWS call (ms)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Probability that an AWS call is throttled")
+    parser.add_argument("--url", default=None, help="Target an already running server instead of an in-process one")
+    parser.add_argument("--server-pid", type=int, default=None, help="PID of the external server (for memory sampling)")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this path")
+    return parser.parse_args(argv)
+
+
+def rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """Current resident set size in MB (Linux /proc), falling back to peak RSS."""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        if pid:
+            return None
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in KB on Linux and in bytes on macOS
+        return maxrss / 1024 if sys.platform != "darwin" else maxrss / (1024 * 1024)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(int(math.ceil(pct / 100.0 * len(sorted_values))) - 1, 0)
+    return sorted_values[rank]
+
+
+class Recorder:
+    def __init__(self, server_pid: Optional[int]):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.memory: Dict[str, List[float]] = defaultdict(list)
+        self.server_pid = server_pid
+
+    def record(self, endpoint: str, latency: float, ok: bool) -> None:
+        memory = rss_mb(self.server_pid)
+        with self._lock:
+            self.latencies[endpoint].append(latency)
+            if not ok:
+                self.errors[endpoint] += 1
+            if memory is not None:
+                self.memory[endpoint].append(memory)
+
+    def report(self, elapsed: float) -> Dict[str, object]:
+        endpoints = {}
+        for endpoint, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            memory = self.memory.get(endpoint) or []
+            endpoints[endpoint] = {
+                "requests": len(values),
+                "errors": self.errors.get(endpoint, 0),
+                "throughput_rps": len(values) / elapsed if elapsed else 0.0,
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "max_ms": values[-1] * 1000,
+                "server_rss_max_mb": max(memory) if memory else None,
+                "server_rss_mean_mb": sum(memory) / len(memory) if memory else None,
+            }
+        total = sum(len(v) for v in self.latencies.values())
+        return {"elapsed_s": elapsed, "total_requests": total, "throughput_rps": total / elapsed if elapsed else 0.0, "endpoints": endpoints}
+
+
+def post(base_url: str, path: str, payload) -> bool:
+    request = urllib.request.Request(
+        base_url + path, data=json.dumps(payload).encode("utf-8"), headers={"Content-Type": "application/json"}, method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=120) as response:
+            response.read()
+            return 200 <= response.status < 300
+    except Exception:
+        return False
+
+
+def dashboard_client(base_url: str, regions: str, account: FakeAwsAccount, args: argparse.Namespace,
+                     recorder: Recorder, deadline: float, client_idx: int) -> None:
+    items = account.items()
+    queues = [i for i in items if i["type"] == "queue"]
+    # Each client watches a different slice of queues, like different users would
+    offset = (client_idx * args.monitor_queues) % max(len(queues), 1)
+    monitor_items = (queues[offset:] + queues[:offset])[: args.monitor_queues]
+
+    def timed(path: str, payload) -> None:
+        start = time.perf_counter()
+        ok = post(base_url, path, payload)
+        recorder.record(path, time.perf_counter() - start, ok)
+
+    timed("/api/scan", {"regions": regions})
+    timed("/api/stats", {"items": items})
+    rounds = 0
+    while time.monotonic() < deadline:
+        round_start = time.monotonic()
+        timed("/api/monitor", {"items": monitor_items})
+        rounds += 1
+        if args.rescan_every and rounds % args.rescan_every == 0:
+            timed("/api/scan", {"regions": regions})
+        # The UI uses setInterval: the next poll starts one interval after the previous one
+        time.sleep(max(args.monitor_interval - (time.monotonic() - round_start), 0.0))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    account = FakeAwsAccount(FakeAccountSpec(
+        regions=args.regions,
+        topics_per_region=args.topics,
+        queues_per_region=args.queues,
+        subscriptions_per_topic=args.subscriptions,
+        messages_per_queue=args.messages_per_queue,
+        long_poll_ms=args.long_poll_ms,
+        latency_ms=args.latency_ms,
+        throttle_rate=args.throttle_rate,
+    ))
+    regions = ",".join(account.regions)
+
+    server = None
+    patcher = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+        recorder = Recorder(args.server_pid)
+    else:
+        from werkzeug.serving import WSGIRequestHandler, make_server
+        from app import app
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        patcher = patch("app.get_session", return_value=account.session())
+        patcher.start()
+        server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        recorder = Recorder(None)
+
+    rss_before = rss_mb(args.server_pid if args.url else None)
+    start = time.monotonic()
+    deadline = start + args.duration
+    clients = [
+        threading.Thread(target=dashboard_client, args=(base_url, regions, account, args, recorder, deadline, idx), daemon=True)
+        for idx in range(args.clients)
+    ]
+    try:
+        for t in clients:
+            t.start()
+        for t in clients:
+            t.join()
+    finally:
+        if server is not None:
+            server.shutdown()
+        if patcher is not None:
+            patcher.stop()
+    elapsed = time.monotonic() - start
+
+    report = recorder.report(elapsed)
+    report["clients"] = args.clients
+    report["server_rss_start_mb"] = rss_before
+    report["aws_calls"] = sum(account.calls.values())
+
+    for endpoint, r in report["endpoints"].items():  # type: ignore
+        print(
+            f"{endpoint:<14} n={r['requests']:<5} err={r['errors']:<3} {r['throughput_rps']:7.2f} req/s  "
+            f"p50 {r['p50_ms']:8.1f}  p95 {r['p95_ms']:8.1f}  p99 {r['p99_ms']:8.1f} ms  "
+            f"rss max {r['server_rss_max_mb'] or 0:.1f} MB",
+            file=sys.stderr,
+        )
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+SNS -> SQS delivery latency measured from the messages seen by the monitor.
+
+For a message delivered by SNS (JSON envelope, i.e. not raw delivery), three
+delays are derived from its timestamps:
+
+- `sns_to_sqs`: SNS `Timestamp` (publish) -> SQS `SentTimestamp` (enqueue),
+- `queue_wait`: SQS `SentTimestamp` -> observation by the monitor,
+- `end_to_end`: SNS `Timestamp` -> observation.
+
+They are recorded per topic -> queue edge in `LatencyHistogram`s: log-linear
+buckets (HDR style, about 1.6 % relative error) stored sparsely, so memory is
+bounded whatever the number of samples and two histograms merge by adding
+their counts (e.g. across workers). The monitor re-reads messages without
+deleting them, so each (queue, message id) is recorded once.
+
+`LATENCIES` keeps one store per set of credentials (`ScopedLatencyStores`):
+a caller only reads the edges of the messages it monitored itself.
+"""
+from __future__ import annotations
+
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional, Tuple
+
+# 2**SUB_BUCKET_BITS linear sub-buckets per power of two
+SUB_BUCKET_BITS = 7
+# Latencies are clamped to one day (ms)
+MAX_LATENCY_MS = 86_400_000
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+METRICS = ("sns_to_sqs", "queue_wait", "end_to_end")
+MAX_EDGES = 10_000
+MAX_SEEN_MESSAGES = 100_000
+# Credential scopes with their own store (least recently used dropped first)
+MAX_SCOPES = 16
+
+Edge = Tuple[str, str]  # (topic ARN, queue ARN)
+
+
+def _bucket_index(value: int) -> int:
+    shift = max(0, value.bit_length() - SUB_BUCKET_BITS)
+    return (shift << SUB_BUCKET_BITS) + (value >> shift)
+
+
+def _bucket_bounds(index: int) -> Tuple[int, int]:
+    shift = index >> SUB_BUCKET_BITS
+    mantissa = index & ((1 << SUB_BUCKET_BITS) - 1)
+    return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Mergeable log-linear histogram of integer millisecond values."""
+
+    def __init__(self) -> None:
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.sum = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def record(self, value_ms: float, count: int = 1) -> None:
+        value = min(max(int(value_ms), 0), MAX_LATENCY_MS)
+        index = _bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)  # type: ignore
+        return self
+
+    def percentile(self, p: float) -> Optional[int]:
+        """Value at percentile `p` (0-100), within the bucket resolution; None when empty."""
+        if not self.total:
+            return None
+        rank = max(1, -(-self.total * p // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, high = _bucket_bounds(index)
+                return min(max((low + high) // 2, self.min), self.max)  # type: ignore
+        return self.max
+
+    def summary(self) -> Dict[str, object]:
+        result: Dict[str, object] = {"count": self.total, "min": self.min, "max": self.max,
+                                     "mean": round(self.sum / self.total, 1) if self.total else None}
+        for p in PERCENTILES:
+            result[f"p{p:g}"] = self.percentile(p)
+        return result
+
+    def to_dict(self) -> Dict[str, object]:
+        """Serializable form (`from_dict` round-trips; bucket indexes as strings for JSON)."""
+        return {"counts": {str(i): c for i, c in sorted(self.counts.items())}, "total": self.total,
+                "sum": self.sum, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "LatencyHistogram":
+        hist = cls()
+        hist.counts = {int(i): int(c) for i, c in (data.get("counts") or {}).items()}  # type: ignore
+        hist.total = int(data.get("total") or 0)  # type: ignore
+        hist.sum = int(data.get("sum") or 0)  # type: ignore
+        hist.min, hist.max = data.get("min"), data.get("max")  # type: ignore
+        return hist
+
+
+def _epoch_ms(timestamp: str) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp() * 1000.0
+    except (AttributeError, ValueError):
+        return None
+
+
+def parse_sns_envelope(body: str) -> Optional[Dict[str, object]]:
+    """The SNS notification envelope of an SQS message body, or None (raw delivery, other producers)."""
+    if not body or body.lstrip()[:1] != "{":
+        return None
+    try:
+        envelope = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(envelope, dict) or envelope.get("Type") != "Notification" or not envelope.get("TopicArn"):
+        return None
+    return envelope
+
+
+class DeliveryLatencyStore:
+    """Per-edge latency histograms, bounded in edges (LRU) and in remembered message ids."""
+
+    def __init__(self, max_edges: int = MAX_EDGES, max_seen: int = MAX_SEEN_MESSAGES):
+        self.max_edges = max_edges
+        self.max_seen = max_seen
+        self._lock = threading.Lock()
+        self._edges: "OrderedDict[Edge, Dict[str, LatencyHistogram]]" = OrderedDict()
+        self._seen: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+
+    def observe(self, queue_arn: str, message: Dict[str, object], observed_ms: float) -> Optional[Dict[str, object]]:
+        """Record one received SQS message; returns its topic ARN and delays, or None without SNS envelope."""
+        envelope = parse_sns_envelope(str(message.get("Body") or ""))
+        if envelope is None:
+            return None
+        published_ms = _epoch_ms(str(envelope.get("Timestamp") or ""))
+        sent = (message.get("Attributes") or {}).get("SentTimestamp")  # type: ignore
+        sent_ms = float(sent) if sent else None
+        delays: Dict[str, float] = {}
+        if published_ms is not None:
+            delays["end_to_end"] = max(0.0, observed_ms - published_ms)
+            if sent_ms is not None:
+                delays["sns_to_sqs"] = max(0.0, sent_ms - published_ms)
+        if sent_ms is not None:
+            delays["queue_wait"] = max(0.0, observed_ms - sent_ms)
+        edge = (str(envelope["TopicArn"]), queue_arn)
+        seen_key = (queue_arn, str(message.get("MessageId") or envelope.get("MessageId") or ""))
+        with self._lock:
+            if seen_key not in self._seen:
+                self._seen[seen_key] = None
+                if len(self._seen) > self.max_seen:
+                    self._seen.popitem(last=False)
+                histograms = self._touch(edge)
+                for metric, value in delays.items():
+                    histograms[metric].record(value)
+        return {"topic_arn": edge[0], "delays_ms": {k: round(v) for k, v in delays.items()}}
+
+    def _touch(self, edge: Edge) -> Dict[str, LatencyHistogram]:
+        # Caller holds the lock: histograms of `edge`, marked most recently used; evicts beyond max_edges
+        histograms = self._edges.get(edge)
+        if histograms is None:
+            histograms = self._edges[edge] = {metric: LatencyHistogram() for metric in METRICS}
+            if len(self._edges) > self.max_edges:
+                self._edges.popitem(last=False)
+        self._edges.move_to_end(edge)
+        return histograms
+
+    def merge(self, snapshot: Dict[str, object]) -> None:
+        """Add the histograms of another store's `snapshot(buckets=True)` (same `max_edges` bound)."""
+        for entry in snapshot.get("edges") or []:  # type: ignore
+            edge = (entry["from_arn"], entry["to_arn"])
+            with self._lock:
+                histograms = self._touch(edge)
+                for metric in METRICS:
+                    if isinstance((entry.get(metric) or {}).get("buckets"), dict):
+                        histograms[metric].merge(LatencyHistogram.from_dict(entry[metric]["buckets"]))
+
+    def histogram(self, topic_arn: str, queue_arn: str, metric: str = "end_to_end") -> Optional[LatencyHistogram]:
+        with self._lock:
+            histograms = self._edges.get((topic_arn, queue_arn))
+            return histograms[metric] if histograms else None
+
+    def snapshot(self, buckets: bool = False) -> Dict[str, object]:
+        """{"edges": [{"from_arn", "to_arn", <metric>: summary (+ "buckets" when asked)}]}."""
+        with self._lock:
+            edges = list(self._edges.items())
+            edges_out: List[Dict[str, object]] = []
+            for (topic_arn, queue_arn), histograms in edges:
+                entry: Dict[str, object] = {"from_arn": topic_arn, "to_arn": queue_arn}
+                for metric, hist in histograms.items():
+                    entry[metric] = hist.summary()
+                    if buckets:
+                        entry[metric]["buckets"] = hist.to_dict()  # type: ignore
+                edges_out.append(entry)
+        return {"percentiles": list(PERCENTILES), "edges": edges_out}
+
+    def edge_labels(self, metric: str = "end_to_end") -> Dict[Edge, str]:
+        """Short "p50 / p99" labels per edge with samples, for diagram overlays."""
+        labels: Dict[Edge, str] = {}
+        with self._lock:
+            for edge, histograms in self._edges.items():
+                hist = histograms[metric]
+                if hist.total:
+                    labels[edge] = f"p50 {_fmt_ms(hist.percentile(50))} / p99 {_fmt_ms(hist.percentile(99))}"
+        return labels
+
+    def reset(self) -> None:
+        with self._lock:
+            self._edges.clear()
+            self._seen.clear()
+
+
+def _fmt_ms(value: Optional[int]) -> str:
+    if value is None:
+        return "-"
+    return f"{value / 1000:.1f}s" if value >= 10_000 else f"{value}ms"
+
+
+class ScopedLatencyStores:
+    """One `DeliveryLatencyStore` per credential scope (`aws_runtime.credential_scope`), at most `max_scopes` (LRU)."""
+
+    def __init__(self, max_scopes: int = MAX_SCOPES, **store_options) -> None:
+        self.max_scopes = max_scopes
+        self.store_options = store_options
+        self._lock = threading.Lock()
+        self._stores: "OrderedDict[Hashable, DeliveryLatencyStore]" = OrderedDict()
+
+    def store(self, scope: Hashable) -> DeliveryLatencyStore:
+        """Store of `scope`, created on first use."""
+        with self._lock:
+            store = self._stores.get(scope)
+            if store is None:
+                store = self._stores[scope] = DeliveryLatencyStore(**self.store_options)
+                if len(self._stores) > self.max_scopes:
+                    self._stores.popitem(last=False)
+            self._stores.move_to_end(scope)
+            return store
+
+    def lookup(self, scope: Hashable) -> DeliveryLatencyStore:
+        """Store of `scope` for reading: an empty one (not kept) when nothing was recorded for it."""
+        with self._lock:
+            store = self._stores.get(scope)
+        return store if store is not None else DeliveryLatencyStore(**self.store_options)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stores.clear()
+
+
+# Default stores fed by /api/monitor
+LATENCIES = ScopedLatencyStores()
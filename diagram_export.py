@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Draw.io and JSON Canvas exports of an inventory.
+
+Both exporters build the same topic -> queue graph and place it with the
+shared layered layout (`layout.layered_layout`): Draw.io top to bottom
+(topics above their queues), JSON Canvas left to right. Queue -> dead-letter
+queue edges (from redrive policies) are drawn dashed, one layer further.
+"""
+from __future__ import annotations
+
+from html import escape
+from typing import Dict, List, Optional, Tuple
+
+from layout import layered_layout
+
+# (topics by ARN, queues by ARN, topic -> queue edges, queue -> dead-letter queue edges)
+Graph = Tuple[Dict[str, Dict[str, object]], Dict[str, Dict[str, object]], List[Tuple[str, str]],
+              List[Tuple[str, str]]]
+
+# Draw.io geometry and styles
+DRAWIO_ORIGIN = (40, 40)
+TOPIC_SIZE = (160, 60)
+QUEUE_SIZE = (120, 60)
+STYLE_TOPIC = "rounded=1;whiteSpace=wrap;html=1;fillColor=#dae8fc;strokeColor=#6c8ebf;fontStyle=1;"
+STYLE_QUEUE = "shape=cylinder3;whiteSpace=wrap;html=1;boundedLbl=1;backgroundOutline=1;size=15;fillColor=#ffe6cc;strokeColor=#d79b00;fontStyle=1;"
+STYLE_EDGE = "edgeStyle=orthogonalEdgeStyle;rounded=0;orthogonalLoop=1;jettySize=auto;html=1;"
+STYLE_DLQ_EDGE = STYLE_EDGE + "dashed=1;strokeColor=#b85450;fontColor=#b85450;"
+
+# JSON Canvas geometry
+CANVAS_ORIGIN = (100, 100)
+CANVAS_NODE_SIZE = (200, 80)
+CANVAS_DLQ_COLOR = "1"
+
+
+def inventory_graph(inventory: List[Dict[str, object]]) -> Graph:
+    """Topics and queues by ARN (with their region) and the topic -> queue and DLQ edges between known nodes."""
+    topics: Dict[str, Dict[str, object]] = {}
+    queues: Dict[str, Dict[str, object]] = {}
+    links: List[Tuple[str, str]] = []
+    redrives: List[Tuple[str, str]] = []
+    for item in inventory:
+        region = item.get("region", "")
+        for t in item.get("topics", []):  # type: ignore
+            topics.setdefault(t["arn"], dict(t, region=region))
+        for q in item.get("queues", []):  # type: ignore
+            queues.setdefault(q["arn"], dict(q, region=region))
+        for link in item.get("links", []):  # type: ignore
+            if link.get("from_arn") and link.get("to_arn"):
+                links.append((link["from_arn"], link["to_arn"]))
+        for link in item.get("dlq_links", []) or []:  # type: ignore
+            if link.get("from_arn") and link.get("to_arn"):
+                redrives.append((link["from_arn"], link["to_arn"]))
+    edges = [(src, dst) for src, dst in links if src in topics and dst in queues]
+    dlq_edges = [(src, dst) for src, dst in redrives if src in queues and dst in queues]
+    return topics, queues, edges, dlq_edges
+
+
+def to_drawio(inventory: List[Dict[str, object]], graph: Optional[Graph] = None) -> str:
+    """Draw.io (mxGraph) XML document; `graph` is an optional precomputed `inventory_graph(inventory)`."""
+    topics, queues, edges, dlq_edges = graph or inventory_graph(inventory)
+    nodes = [(arn, *TOPIC_SIZE) for arn in topics] + [(arn, *QUEUE_SIZE) for arn in queues]
+    positions = layered_layout(nodes, edges + dlq_edges, direction="TB", origin=DRAWIO_ORIGIN)
+
+    xml_parts = [
+        '<mxfile host="app.diagrams.net" modified="2023-01-01T00:00:00.000Z" agent="AWS-Manager" version="21.0.0" type="device">',
+        '  <diagram id="aws-diagram" name="AWS Resources">',
+        '    <mxGraphModel dx="1422" dy="798" grid="1" gridSize="10" guides="1" tooltips="1" connect="1" arrows="1" fold="1" page="1" pageScale="1" pageWidth="827" pageHeight="1169" math="0" shadow="0">',
+        '      <root>',
+        '        <mxCell id="0" />',
+        '        <mxCell id="1" parent="0" />'
+    ]
+    arn_to_id: Dict[str, int] = {}
+    current_id = 2
+    for arn, style, (w, h), resource in [(arn, STYLE_TOPIC, TOPIC_SIZE, t) for arn, t in topics.items()] + \
+                                        [(arn, STYLE_QUEUE, QUEUE_SIZE, q) for arn, q in queues.items()]:
+        x, y = positions[arn]
+        xml_parts.append(f'        <mxCell id="{current_id}" value="{escape(str(resource.get("name", "")))}" style="{style}" vertex="1" parent="1">')
+        xml_parts.append(f'          <mxGeometry x="{x:g}" y="{y:g}" width="{w}" height="{h}" as="geometry" />')
+        xml_parts.append('        </mxCell>')
+        arn_to_id[arn] = current_id
+        current_id += 1
+
+    for src, dst, value, style in [(src, dst, "", STYLE_EDGE) for src, dst in edges] + \
+                                  [(src, dst, "DLQ", STYLE_DLQ_EDGE) for src, dst in dlq_edges]:
+        xml_parts.append(f'        <mxCell id="{current_id}" value="{value}" style="{style}" edge="1" parent="1" source="{arn_to_id[src]}" target="{arn_to_id[dst]}">')
+        xml_parts.append('          <mxGeometry relative="1" as="geometry" />')
+        xml_parts.append('        </mxCell>')
+        current_id += 1
+
+    xml_parts.append('      </root>')
+    xml_parts.append('    </mxGraphModel>')
+    xml_parts.append('  </diagram>')
+    xml_parts.append('</mxfile>')
+    return "\n".join(xml_parts)
+
+
+def to_canvas(inventory: List[Dict[str, object]], graph: Optional[Graph] = None) -> Dict[str, object]:
+    """JSON Canvas document (compatible with Obsidian): {"nodes": [...], "edges": [...]}."""
+    topics, queues, edges, dlq_edges = graph or inventory_graph(inventory)
+    width, height = CANVAS_NODE_SIZE
+    nodes_in = [(arn, width, height) for arn in topics] + [(arn, width, height) for arn in queues]
+    positions = layered_layout(nodes_in, edges + dlq_edges, direction="LR", origin=CANVAS_ORIGIN, node_gap=40, layer_gap=200)
+
+    nodes = []
+    arn_to_node_id: Dict[str, str] = {}
+    for arn, label, color, resource in [(arn, "Topic", "1", t) for arn, t in topics.items()] + \
+                                       [(arn, "Queue", "2", q) for arn, q in queues.items()]:
+        node_id = f"node_{len(nodes) + 1}"
+        arn_to_node_id[arn] = node_id
+        x, y = positions[arn]
+        nodes.append({
+            "id": node_id,
+            "type": "text",
+            "x": int(x),
+            "y": int(y),
+            "width": width,
+            "height": height,
+            "text": f"**{resource.get('name', '')}**\n*{label}*\n{resource['region']}",
+            "color": color
+        })
+
+    canvas_edges = [{
+        "id": f"edge_{i}",
+        "fromNode": arn_to_node_id[src],
+        "fromSide": "right",
+        "toNode": arn_to_node_id[dst],
+        "toSide": "left"
+    } for i, (src, dst) in enumerate(edges, 1)]
+    canvas_edges += [{
+        "id": f"edge_{i}",
+        "fromNode": arn_to_node_id[src],
+        "fromSide": "right",
+        "toNode": arn_to_node_id[dst],
+        "toSide": "left",
+        "label": "DLQ",
+        "color": CANVAS_DLQ_COLOR
+    } for i, (src, dst) in enumerate(dlq_edges, len(edges) + 1)]
+    return {"nodes": nodes, "edges": canvas_edges}
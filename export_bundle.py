@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+One-pass multi-format export bundle (zip archive).
+
+The inventory is indexed once (the topic/queue graph shared by the diagram
+exporters, the table rows shared by the SQL exporters), then every requested
+format is rendered on a thread pool. Each file is added to the zip as soon as
+it is ready, and the archive is produced incrementally, so an HTTP response
+can stream it while the other formats are still rendering.
+"""
+from __future__ import annotations
+
+import io
+import os
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from diagram_export import inventory_graph, to_canvas, to_drawio
+from json_response import dumps
+from sql_export import table_rows, to_sql_copy, to_sql_inserts, write_sqlite
+
+# format -> file name inside the archive
+BUNDLE_FILES: Dict[str, str] = {
+    "json": "inventory.json",
+    "mermaid": "inventory.mmd",
+    "sql": "inventory.sql",
+    "sql-copy": "inventory.pg.sql",
+    "sqlite": "inventory.sqlite",
+    "drawio": "inventory.drawio",
+    "canvas": "inventory.canvas",
+}
+DEFAULT_FORMATS: Tuple[str, ...] = ("json", "mermaid", "sql", "drawio", "canvas")
+MAX_WORKERS = 4
+
+
+class _Shared:
+    """Indexes built at most once per bundle, on first use, whichever worker needs them first."""
+
+    def __init__(self, inventory: List[Dict[str, object]]):
+        self.inventory = inventory
+        self._lock = threading.Lock()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._values: Dict[str, object] = {}
+
+    def get(self, name: str, build: Callable[[], object]):
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        # One lock per index: building the graph does not wait for the SQL rows
+        with lock:
+            if name not in self._values:
+                self._values[name] = build()
+        return self._values[name]
+
+    def graph(self):
+        return self.get("graph", lambda: inventory_graph(self.inventory))
+
+    def rows(self):
+        return self.get("rows", lambda: table_rows(self.inventory))
+
+
+def _sqlite_bytes(inventory: List[Dict[str, object]], rows) -> bytes:
+    fd, path = tempfile.mkstemp(suffix=".sqlite")
+    os.close(fd)
+    try:
+        write_sqlite(inventory, path, rows=rows)
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+def _render(fmt: str, shared: _Shared) -> bytes:
+    inventory = shared.inventory
+    if fmt == "json":
+        return dumps(inventory, pretty=True)
+    if fmt == "mermaid":
+        from aws_sns_sqs_map import to_mermaid
+        return to_mermaid(inventory).encode("utf-8")
+    if fmt == "sql":
+        return to_sql_inserts(inventory, rows=shared.rows()).encode("utf-8")
+    if fmt == "sql-copy":
+        return to_sql_copy(inventory, rows=shared.rows()).encode("utf-8")
+    if fmt == "sqlite":
+        return _sqlite_bytes(inventory, shared.rows())
+    if fmt == "drawio":
+        return to_drawio(inventory, graph=shared.graph()).encode("utf-8")
+    if fmt == "canvas":
+        return dumps(to_canvas(inventory, graph=shared.graph()), pretty=True)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def parse_formats(value: Optional[str]) -> List[str]:
+    """Comma-separated format list (default formats when empty); raises ValueError on unknown names."""
+    formats = [f.strip() for f in (value or "").split(",") if f.strip()] or list(DEFAULT_FORMATS)
+    unknown = [f for f in formats if f not in BUNDLE_FILES]
+    if unknown:
+        raise ValueError(f"Unknown export format(s): {', '.join(unknown)}; expected {', '.join(BUNDLE_FILES)}")
+    return list(dict.fromkeys(formats))
+
+
+class _ChunkSink(io.RawIOBase):
+    """Non-seekable write target collecting the zip bytes between two yields."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def iter_bundle(inventory: List[Dict[str, object]], formats: Iterable[str] = DEFAULT_FORMATS,
+                max_workers: int = MAX_WORKERS) -> Iterator[bytes]:
+    """Yield the zip archive in chunks as formats finish rendering.
+
+    A format that fails is left out of the archive and reported in ERRORS.txt.
+    """
+    formats = list(formats)
+    shared = _Shared(inventory)
+    sink = _ChunkSink()
+    errors: List[str] = []
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(formats)))) as executor:
+            futures = {executor.submit(_render, fmt, shared): fmt for fmt in formats}
+            for future in as_completed(futures):
+                fmt = futures[future]
+                try:
+                    data = future.result()
+                except Exception as e:
+                    errors.append(f"{fmt}: {e}")
+                    continue
+                archive.writestr(BUNDLE_FILES[fmt], data)
+                yield sink.take()
+        if errors:
+            archive.writestr("ERRORS.txt", "\n".join(errors) + "\n")
+    yield sink.take()
+
+
+def write_bundle(inventory: List[Dict[str, object]], path: str, formats: Iterable[str] = DEFAULT_FORMATS,
+                 max_workers: int = MAX_WORKERS) -> None:
+    with open(path, "wb") as f:
+        for chunk in iter_bundle(inventory, formats, max_workers):
+            f.write(chunk)
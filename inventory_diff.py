@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Diff two inventories: added, removed and changed topics, queues and subscriptions.
+
+Every resource is reduced to a key (kind + ARN, or topic/queue/subscription ARN
+for subscriptions) and a short hash of its content, so comparing two
+inventories is a single O(n) pass over hashed indexes. The change set can be
+rendered as JSON or as a Mermaid graph highlighting what changed.
+
+Streaming mode (`diff_files(..., stream=True)`) never holds both inventories:
+it keeps only the hash index of the old one and reads the files region by
+region. The old file is read twice (index, then details of removed/changed
+resources).
+
+Regions whose scan did not complete (`status.state` other than "ok", e.g. a
+timeout) are left out on both sides: their resources are unknown, not removed.
+
+    python inventory_diff.py yesterday.json today.json --format mermaid
+    python inventory_diff.py --snapshot-dir snapshots/ --stream
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+Key = Tuple[str, ...]
+
+KINDS = ("topics", "queues", "subscriptions")
+
+
+def _digest(record: Dict[str, object]) -> bytes:
+    return hashlib.blake2b(json.dumps(record, sort_keys=True, separators=(",", ":")).encode("utf-8"), digest_size=8).digest()
+
+
+def iter_resources(regions: Iterable[Dict[str, object]]) -> Iterator[Tuple[str, Key, Dict[str, object]]]:
+    """Yield (kind, key, record) for every topic, queue and SQS subscription."""
+    for item in regions:
+        region = item.get("region")
+        for t in item.get("topics", []) or []:  # type: ignore
+            yield "topics", ("topics", t["arn"]), dict(t, region=region)
+        for q in item.get("queues", []) or []:  # type: ignore
+            yield "queues", ("queues", q["arn"]), dict(q, region=region)
+        for l in item.get("links", []) or []:  # type: ignore
+            sub_arn = (l.get("attributes") or {}).get("subscriptionArn") or ""
+            yield "subscriptions", ("subscriptions", l["from_arn"], l["to_arn"], sub_arn), dict(l, region=region)
+
+
+def _collect_incomplete(regions: Iterable[Dict[str, object]], incomplete: Set[object]) -> Iterator[Dict[str, object]]:
+    """Pass regions through, collecting the ones whose scan did not complete into `incomplete`."""
+    for item in regions:
+        if ((item.get("status") or {}).get("state") or "ok") != "ok":  # type: ignore
+            incomplete.add(item.get("region"))
+        yield item
+
+
+def build_index(regions: Iterable[Dict[str, object]]) -> Dict[Key, bytes]:
+    return {key: _digest(record) for _, key, record in iter_resources(regions)}
+
+
+def _empty_changes() -> Dict[str, object]:
+    return {section: {kind: [] for kind in KINDS} for section in ("added", "removed", "changed")}
+
+
+def _finish(changes: Dict[str, object]) -> Dict[str, object]:
+    changes["summary"] = {
+        section: {kind: len(changes[section][kind]) for kind in KINDS}  # type: ignore
+        for section in ("added", "removed", "changed")
+    }
+    return changes
+
+
+def diff_inventories(old: List[Dict[str, object]], new: List[Dict[str, object]]) -> Dict[str, object]:
+    """Change set between two in-memory inventories."""
+    incomplete: Set[object] = set()
+    old_records = {key: (kind, record, _digest(record))
+                   for kind, key, record in iter_resources(_collect_incomplete(old, incomplete))}
+    changes = _empty_changes()
+    seen: Set[Key] = set()
+    for kind, key, record in iter_resources(_collect_incomplete(new, incomplete)):
+        seen.add(key)
+        previous = old_records.get(key)
+        if previous is None:
+            if record["region"] not in incomplete:
+                changes["added"][kind].append(record)  # type: ignore
+        elif previous[2] != _digest(record):
+            changes["changed"][kind].append({"old": previous[1], "new": record})  # type: ignore
+    for key, (kind, record, _) in old_records.items():
+        if key not in seen and record["region"] not in incomplete:
+            changes["removed"][kind].append(record)  # type: ignore
+    return _finish(changes)
+
+
+def iter_json_array(path: str, chunk_size: int = 1 << 20) -> Iterator[Dict[str, object]]:
+    """Yield the elements of a top-level JSON array one at a time."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf, pos, eof = "", 0, False
+
+        def read_more() -> None:
+            nonlocal buf, pos, eof
+            # Grow reads with the pending element so re-parsing stays linear overall
+            chunk = f.read(max(chunk_size, len(buf) - pos))
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+
+        def skip(chars: str) -> bool:
+            """Skip `chars`; False when the end of the file is reached."""
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in chars:
+                    pos += 1
+                if pos < len(buf):
+                    return True
+                if eof:
+                    return False
+                read_more()
+
+        if not skip(" \t\r\n") or buf[pos] != "[":
+            raise ValueError(f"{path}: expected a JSON array of regions")
+        pos += 1
+        while True:
+            if not skip(" \t\r\n,"):
+                raise ValueError(f"{path}: unterminated JSON array")
+            if buf[pos] == "]":
+                return
+            try:
+                element, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                read_more()
+                continue
+            yield element
+            pos = end
+
+
+def diff_files(old_path: str, new_path: str, stream: bool = False) -> Dict[str, object]:
+    """Diff two JSON inventory files; `stream` bounds memory to one hash index."""
+    if not stream:
+        with open(old_path, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        with open(new_path, "r", encoding="utf-8") as f:
+            new = json.load(f)
+        return diff_inventories(old, new)
+
+    old_incomplete: Set[object] = set()
+    old_index = build_index(_collect_incomplete(iter_json_array(old_path), old_incomplete))
+    changes = _empty_changes()
+    seen: Set[Key] = set()
+    changed_new: Dict[Key, Dict[str, object]] = {}
+    new_incomplete: Set[object] = set()
+    for kind, key, record in iter_resources(_collect_incomplete(iter_json_array(new_path), new_incomplete)):
+        seen.add(key)
+        previous = old_index.get(key)
+        if previous is None:
+            if record["region"] not in old_incomplete:
+                changes["added"][kind].append(record)  # type: ignore
+        elif previous != _digest(record):
+            changed_new[key] = record
+
+    # Second pass over the old file for the details of removed and changed resources
+    removed_keys = old_index.keys() - seen
+    del old_index, seen
+    removed: Dict[Key, Tuple[str, Dict[str, object]]] = {}
+    changed_old: Dict[Key, Dict[str, object]] = {}
+    for kind, key, record in iter_resources(iter_json_array(old_path)):
+        if key in removed_keys:
+            if record["region"] not in new_incomplete:
+                removed[key] = (kind, record)
+        elif key in changed_new:
+            changed_old[key] = record
+    # Same ordering and last-wins semantics as diff_inventories
+    for key, (kind, record) in removed.items():
+        changes["removed"][kind].append(record)  # type: ignore
+    for key, record in changed_new.items():
+        changes["changed"][key[0]].append({"old": changed_old[key], "new": record})  # type: ignore
+    return _finish(changes)
+
+
+def diff_to_mermaid(changes: Dict[str, object]) -> str:
+    """Mermaid graph of the change set: added in green, removed in red, changed in amber."""
+    lines: List[str] = ["graph LR"]
+    node_ids: Dict[str, str] = {}
+    node_lines: List[str] = []
+    edge_lines: List[str] = []
+    edge_styles: List[str] = []
+
+    def node(arn: str, name: Optional[str], kind: str, css: str) -> str:
+        if arn in node_ids:
+            return node_ids[arn]
+        nid = f"N{len(node_ids) + 1}"
+        node_ids[arn] = nid
+        label = (name or arn.split(":")[-1]).replace("\"", "'")
+        if kind == "topics":
+            node_lines.append(f"  {nid}[Topic: {label}]:::{css}")
+        else:
+            node_lines.append(f"  {nid}(Queue: {label}):::{css}")
+        return nid
+
+    for section, css in (("added", "added"), ("removed", "removed"), ("changed", "changed")):
+        for kind in ("topics", "queues"):
+            for entry in changes[section][kind]:  # type: ignore
+                record = entry["new"] if section == "changed" else entry
+                node(record["arn"], record.get("name"), kind, css)
+
+    for section, style in (("added", "stroke:#2DA44E,stroke-width:2px"), ("removed", "stroke:#CF222E,stroke-width:2px,stroke-dasharray:4"),
+                           ("changed", "stroke:#D4A72C,stroke-width:2px")):
+        for entry in changes[section]["subscriptions"]:  # type: ignore
+            link = entry["new"] if section == "changed" else entry
+            # Endpoints that did not change themselves are drawn as context
+            src = node(link["from_arn"], None, "topics", "context")
+            dst = node(link["to_arn"], None, "queues", "context")
+            edge_lines.append(f"  {src} -- {section} --> {dst}")
+            edge_styles.append(f"linkStyle {len(edge_lines) - 1} {style};")
+
+    lines.extend(node_lines)
+    lines.extend(edge_lines)
+    lines.extend(edge_styles)
+    lines.append("classDef added fill:#2DA44E,stroke:#2DA44E,color:#ffffff;")
+    lines.append("classDef removed fill:#CF222E,stroke:#CF222E,color:#ffffff;")
+    lines.append("classDef changed fill:#D4A72C,stroke:#D4A72C,color:#ffffff;")
+    lines.append("classDef context fill:#9B9B9B,stroke:#9B9B9B,color:#ffffff;")
+    return "\n".join(lines)
+
+
+def save_snapshot(inventory: List[Dict[str, object]], snapshot_dir: str) -> str:
+    """Write an inventory snapshot named after the current UTC time; returns its path."""
+    os.makedirs(snapshot_dir, exist_ok=True)
+    path = os.path.join(snapshot_dir, time.strftime("inventory-%Y%m%dT%H%M%SZ.json", time.gmtime()))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(inventory, f, separators=(",", ":"))
+    return path
+
+
+def latest_snapshots(snapshot_dir: str, count: int = 2) -> List[str]:
+    """Paths of the `count` most recent snapshots, oldest first."""
+    return sorted(glob.glob(os.path.join(snapshot_dir, "inventory-*.json")))[-count:]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Comparer deux inventaires SNS/SQS")
+    parser.add_argument("old", nargs="?", help="Inventaire de référence (JSON)")
+    parser.add_argument("new", nargs="?", help="Nouvel inventaire (JSON)")
+    parser.add_argument("--snapshot-dir", default=None, help="Comparer les deux derniers snapshots de ce dossier")
+    parser.add_argument("--stream", action="store_true", help="Mode streaming (mémoire bornée pour les très gros inventaires)")
+    parser.add_argument("--format", choices=["json", "mermaid"], default="json", help="Format de sortie")
+    parser.add_argument("--output", default=None, help="Chemin de fichier de sortie (sinon stdout)")
+    args = parser.parse_args()
+    if args.snapshot_dir:
+        snapshots = latest_snapshots(args.snapshot_dir)
+        if len(snapshots) < 2:
+            parser.error(f"au moins deux snapshots sont nécessaires dans {args.snapshot_dir}")
+        args.old, args.new = snapshots
+    elif not (args.old and args.new):
+        parser.error("indiquer OLD et NEW, ou --snapshot-dir")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    changes = diff_files(args.old, args.new, stream=args.stream)
+    if args.format == "mermaid":
+        output = diff_to_mermaid(changes)
+    else:
+        output = json.dumps(changes, indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Embedded SQLite index of scan results for server-side search and pagination.
+
+Each indexed inventory gets a scan id. Topics and queues are stored with
+name/ARN/region indexes, a precomputed subscription count (so orphan queues
+are a simple filter) and an FTS5 table for substring name search (trigram
+tokenizer when available, LIKE otherwise). The inventory itself is kept too,
+for clients that page through the index and only fetch it whole on demand
+(exports, diagrams). Only the most recent scans are kept. The database is a
+file, so several worker processes can share it.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from json_response import dumps
+
+DEFAULT_INDEX_PATH = os.path.join(tempfile.gettempdir(), "aws-sns-sqs-inventory.sqlite")
+MAX_SCANS = 10
+MAX_PAGE_SIZE = 1000
+
+SORT_COLUMNS = {"name", "region", "arn", "subscriptions"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    scan_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    regions TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS topics (
+    scan_id TEXT NOT NULL,
+    arn TEXT NOT NULL,
+    name TEXT NOT NULL,
+    region TEXT,
+    account_id TEXT,
+    subscriptions INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (scan_id, arn)
+);
+CREATE TABLE IF NOT EXISTS queues (
+    scan_id TEXT NOT NULL,
+    arn TEXT NOT NULL,
+    name TEXT NOT NULL,
+    url TEXT,
+    region TEXT,
+    account_id TEXT,
+    subscriptions INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (scan_id, arn)
+);
+CREATE TABLE IF NOT EXISTS inventories (
+    scan_id TEXT PRIMARY KEY,
+    body BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS links (
+    scan_id TEXT NOT NULL,
+    from_arn TEXT NOT NULL,
+    to_arn TEXT NOT NULL,
+    region TEXT,
+    subscription_arn TEXT
+);
+CREATE INDEX IF NOT EXISTS topics_name ON topics (scan_id, name);
+CREATE INDEX IF NOT EXISTS topics_region_name ON topics (scan_id, region, name);
+CREATE INDEX IF NOT EXISTS queues_name ON queues (scan_id, name);
+CREATE INDEX IF NOT EXISTS queues_region_name ON queues (scan_id, region, name);
+CREATE INDEX IF NOT EXISTS queues_orphans ON queues (scan_id, subscriptions, name);
+CREATE INDEX IF NOT EXISTS links_from ON links (scan_id, from_arn);
+CREATE INDEX IF NOT EXISTS links_to ON links (scan_id, to_arn);
+"""
+
+
+class InventoryIndex:
+    """SQLite-backed inventory index (one connection per thread)."""
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, max_scans: int = MAX_SCANS):
+        self.path = path
+        self.max_scans = max_scans
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        self.fts_tokenizer = self._create_fts(conn)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _create_fts(conn: sqlite3.Connection) -> Optional[str]:
+        """Create the FTS table with the best tokenizer available; None if FTS5 is missing."""
+        existing = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'names_fts'").fetchone()
+        if existing:
+            return "trigram" if "trigram" in existing[0] else "unicode61"
+        for tokenizer in ("trigram", "unicode61"):
+            try:
+                conn.execute(
+                    "CREATE VIRTUAL TABLE names_fts USING fts5("
+                    f"name, kind UNINDEXED, scan_id UNINDEXED, arn UNINDEXED, tokenize = '{tokenizer}')"
+                )
+                return tokenizer
+            except sqlite3.OperationalError:
+                continue
+        return None
+
+    def add(self, inventory: List[Dict[str, object]]) -> str:
+        """Index an inventory and return its scan id. Older scans are pruned."""
+        scan_id = uuid.uuid4().hex
+        topics: Dict[str, list] = {}
+        queues: Dict[str, list] = {}
+        links: List[Tuple] = []
+        for item in inventory:
+            region = item.get("region")
+            account = item.get("accountId")
+            for t in item.get("topics", []):  # type: ignore
+                topics[t["arn"]] = [scan_id, t["arn"], t.get("name", ""), region, account, 0]
+            for q in item.get("queues", []):  # type: ignore
+                queues[q["arn"]] = [scan_id, q["arn"], q.get("name", ""), q.get("url"), region, account, 0]
+            for l in item.get("links", []):  # type: ignore
+                attributes = l.get("attributes") or {}
+                links.append((scan_id, l["from_arn"], l["to_arn"], region, attributes.get("subscriptionArn")))
+        for _, from_arn, to_arn, _, _ in links:
+            if from_arn in topics:
+                topics[from_arn][-1] += 1
+            if to_arn in queues:
+                queues[to_arn][-1] += 1
+
+        regions = ",".join(sorted({str(item.get("region")) for item in inventory}))
+        conn = self._conn()
+        with self._write_lock, conn:
+            conn.execute("INSERT INTO scans VALUES (?, ?, ?)", (scan_id, time.time(), regions))
+            conn.execute("INSERT INTO inventories VALUES (?, ?)", (scan_id, dumps(inventory)))
+            conn.executemany("INSERT OR REPLACE INTO topics VALUES (?, ?, ?, ?, ?, ?)", topics.values())
+            conn.executemany("INSERT OR REPLACE INTO queues VALUES (?, ?, ?, ?, ?, ?, ?)", queues.values())
+            conn.executemany("INSERT INTO links VALUES (?, ?, ?, ?, ?)", links)
+            if self.fts_tokenizer:
+                conn.executemany("INSERT INTO names_fts VALUES (?, 'topic', ?, ?)", ((t[2], scan_id, t[1]) for t in topics.values()))
+                conn.executemany("INSERT INTO names_fts VALUES (?, 'queue', ?, ?)", ((q[2], scan_id, q[1]) for q in queues.values()))
+            self._prune(conn)
+        return scan_id
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        old = [r[0] for r in conn.execute(
+            "SELECT scan_id FROM scans ORDER BY created_at DESC LIMIT -1 OFFSET ?", (self.max_scans,))]
+        for scan_id in old:
+            for table in ("topics", "queues", "links", "inventories", "scans"):
+                conn.execute(f"DELETE FROM {table} WHERE scan_id = ?", (scan_id,))
+            if self.fts_tokenizer:
+                conn.execute("DELETE FROM names_fts WHERE scan_id = ?", (scan_id,))
+
+    def summary(self, scan_id: str) -> Optional[Dict[str, object]]:
+        conn = self._conn()
+        scan = conn.execute("SELECT * FROM scans WHERE scan_id = ?", (scan_id,)).fetchone()
+        if scan is None:
+            return None
+        count = lambda sql: conn.execute(sql, (scan_id,)).fetchone()[0]  # noqa: E731
+        return {
+            "scan_id": scan_id,
+            "created_at": scan["created_at"],
+            "regions": [r for r in scan["regions"].split(",") if r],
+            "topics": count("SELECT COUNT(*) FROM topics WHERE scan_id = ?"),
+            "queues": count("SELECT COUNT(*) FROM queues WHERE scan_id = ?"),
+            "links": count("SELECT COUNT(*) FROM links WHERE scan_id = ?"),
+            "orphan_queues": count("SELECT COUNT(*) FROM queues WHERE scan_id = ? AND subscriptions = 0"),
+        }
+
+    def inventory(self, scan_id: str) -> Optional[List[Dict[str, object]]]:
+        """The inventory indexed as `scan_id`, as given to `add`."""
+        row = self._conn().execute("SELECT body FROM inventories WHERE scan_id = ?", (scan_id,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def query(self, scan_id: str, kind: str, region: Optional[str] = None, prefix: Optional[str] = None,
+              search: Optional[str] = None, orphans: bool = False, sort: str = "name", order: str = "asc",
+              limit: int = 100, offset: int = 0) -> Dict[str, object]:
+        """Filtered, sorted page of topics or queues: {"total", "items", "limit", "offset"}."""
+        if kind not in ("topics", "queues"):
+            raise ValueError(f"Unknown resource kind: {kind}")
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort by {sort!r}; expected one of {sorted(SORT_COLUMNS)}")
+        direction = "DESC" if order.lower() == "desc" else "ASC"
+        limit = max(min(int(limit), MAX_PAGE_SIZE), 1)
+        offset = max(int(offset), 0)
+
+        where = ["r.scan_id = ?"]
+        params: List[object] = [scan_id]
+        if region:
+            where.append("r.region = ?")
+            params.append(region)
+        if prefix:
+            # Range scan on the (scan_id, name) index instead of LIKE
+            where.append("r.name >= ? AND r.name < ?")
+            params.extend([prefix, prefix + "\U0010ffff"])
+        if orphans and kind == "queues":
+            where.append("r.subscriptions = 0")
+        if search:
+            if (self.fts_tokenizer == "trigram" and len(search) >= 3) or self.fts_tokenizer == "unicode61":
+                where.append("r.arn IN (SELECT arn FROM names_fts WHERE names_fts MATCH ? AND scan_id = ? AND kind = ?)")
+                params.extend(['"' + search.replace('"', '""') + '"', scan_id, kind[:-1]])
+            else:
+                # Trigrams need 3 characters; short searches fall back to LIKE
+                where.append("r.name LIKE ? ESCAPE '\\'")
+                params.append("%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+
+        conn = self._conn()
+        clause = " AND ".join(where)
+        total = conn.execute(f"SELECT COUNT(*) FROM {kind} r WHERE {clause}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT * FROM {kind} r WHERE {clause} ORDER BY r.{sort} {direction}, r.arn LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        ).fetchall()
+        items = [{k: row[k] for k in row.keys() if k != "scan_id"} for row in rows]
+        return {"total": total, "limit": limit, "offset": offset, "items": items}
+
+    def links(self, scan_id: str, topic_arn: Optional[str] = None, queue_arn: Optional[str] = None,
+              limit: int = 100, offset: int = 0) -> Dict[str, object]:
+        where = ["scan_id = ?"]
+        params: List[object] = [scan_id]
+        if topic_arn:
+            where.append("from_arn = ?")
+            params.append(topic_arn)
+        if queue_arn:
+            where.append("to_arn = ?")
+            params.append(queue_arn)
+        limit = max(min(int(limit), MAX_PAGE_SIZE), 1)
+        offset = max(int(offset), 0)
+        clause = " AND ".join(where)
+        conn = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM links WHERE {clause}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT from_arn, to_arn, region, subscription_arn FROM links WHERE {clause} "
+            "ORDER BY from_arn, to_arn LIMIT ? OFFSET ?", params + [limit, offset]
+        ).fetchall()
+        return {"total": total, "limit": limit, "offset": offset, "items": [dict(r) for r in rows]}
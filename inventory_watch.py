@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Watch mode: re-scan regions on a schedule and emit only what changed.
+
+Each region keeps its own warm SNS/SQS clients and is scanned once per
+interval, at an offset of `interval / len(regions)` from the previous region,
+so API calls are spread over the whole interval instead of bursting at the
+top of it. After the first (baseline) scan of a region, every later scan is
+diffed against the previous one with `inventory_diff` and each difference is
+written as one NDJSON event:
+
+    {"ts": ..., "event": "baseline", "region": "eu-west-1", "counts": {...}}
+    {"ts": ..., "event": "added", "kind": "queues", "region": "eu-west-1", "resource": {...}}
+    {"ts": ..., "event": "removed", "kind": "topics", "region": "eu-west-1", "resource": {...}}
+    {"ts": ..., "event": "changed", "kind": "queues", "region": "eu-west-1", "old": {...}, "new": {...}}
+    {"ts": ..., "event": "error", "region": "eu-west-1", "error": "..."}
+
+A queue that is still listed but whose attributes could not be read keeps its
+previous record, so a transient error does not show up as removed then added.
+
+Only the latest inventory of each region is kept, so memory stays bounded by
+the size of the account however long the watcher runs.
+"""
+from __future__ import annotations
+
+import heapq
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, TextIO
+
+from aws_sns_sqs_map import fetch_region_inventory, region_clients
+from inventory_diff import KINDS, diff_inventories
+from json_response import dumps
+
+
+def change_events(changes: Dict[str, object], region: str, ts: float) -> Iterator[Dict[str, object]]:
+    """Flatten a change set into one event per added, removed or changed resource."""
+    for section in ("added", "removed", "changed"):
+        for kind in KINDS:
+            for entry in changes[section][kind]:  # type: ignore
+                event: Dict[str, object] = {"ts": ts, "event": section, "kind": kind, "region": region}
+                if section == "changed":
+                    event["old"], event["new"] = entry["old"], entry["new"]
+                else:
+                    event["resource"] = entry
+                yield event
+
+
+def _counts(region_inventory: Dict[str, object]) -> Dict[str, int]:
+    return {
+        "topics": len(region_inventory.get("topics") or []),  # type: ignore
+        "queues": len(region_inventory.get("queues") or []),  # type: ignore
+        "subscriptions": len(region_inventory.get("links") or []),  # type: ignore
+    }
+
+
+class InventoryWatcher:
+    """Scheduled per-region re-scans emitting change events."""
+
+    def __init__(self, session, regions: List[str], interval: float, emit: Callable[[Dict[str, object]], None],
+                 sharded_queues: bool = False, clock: Callable[[], float] = time.monotonic):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.session = session
+        self.regions = list(regions)
+        self.interval = interval
+        self.emit = emit
+        self.sharded_queues = sharded_queues
+        self.clock = clock
+        self.stop_event = threading.Event()
+        self._clients: Dict[str, tuple] = {}
+        self._previous: Dict[str, Dict[str, object]] = {}
+
+    def scan_region(self, region: str) -> None:
+        """Scan one region and emit its baseline or its changes since the last scan."""
+        clients = self._clients.get(region)
+        if clients is None:
+            clients = self._clients[region] = region_clients(self.session, region)
+        unreadable: List[str] = []
+        try:
+            current = fetch_region_inventory(self.session, region, sharded_queues=self.sharded_queues, clients=clients,
+                                             unreadable_queues=unreadable)
+        except Exception as e:
+            # Keep the previous inventory: the next successful scan reports the changes
+            self.emit({"ts": time.time(), "event": "error", "region": region, "error": str(e)})
+            return
+        previous = self._previous.get(region)
+        if previous is not None and unreadable:
+            known = {q["url"]: q for q in previous.get("queues") or []}  # type: ignore
+            current["queues"].extend(known[url] for url in unreadable if url in known)  # type: ignore
+        self._previous[region] = current
+        if previous is None:
+            self.emit({"ts": time.time(), "event": "baseline", "region": region, "counts": _counts(current)})
+            return
+        ts = time.time()
+        for event in change_events(diff_inventories([previous], [current]), region, ts):
+            self.emit(event)
+
+    def run(self, max_scans: Optional[int] = None) -> None:
+        """Scan until `stop()` is called (or `max_scans` region scans have run)."""
+        start = self.clock()
+        step = self.interval / max(len(self.regions), 1)
+        schedule = [(start + i * step, i, region) for i, region in enumerate(self.regions)]
+        heapq.heapify(schedule)
+        scans = 0
+        while schedule and not self.stop_event.is_set():
+            due, i, region = heapq.heappop(schedule)
+            delay = due - self.clock()
+            if delay > 0 and self.stop_event.wait(delay):
+                break
+            self.scan_region(region)
+            scans += 1
+            if max_scans is not None and scans >= max_scans:
+                break
+            # A slow scan pushes this region back instead of queueing catch-up scans
+            heapq.heappush(schedule, (max(due + self.interval, self.clock()), i, region))
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+
+def ndjson_writer(stream: TextIO) -> Callable[[Dict[str, object]], None]:
+    """Emit callback writing one compact JSON object per line, flushed immediately."""
+    def emit(event: Dict[str, object]) -> None:
+        stream.write(dumps(event).decode("utf-8") + "\n")
+        stream.flush()
+    return emit
+
+
+def watch(session, regions: List[str], interval: float, output: Optional[str] = None, sharded_queues: bool = False) -> None:
+    """Run the watcher until interrupted, appending events to `output` (or stdout)."""
+    stream = open(output, "a", encoding="utf-8") if output else sys.stdout
+    watcher = InventoryWatcher(session, regions, interval, ndjson_writer(stream), sharded_queues=sharded_queues)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if output:
+            stream.close()
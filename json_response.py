@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Fast JSON encoding and compressed JSON responses.
+
+`dumps()` uses orjson when it is installed and falls back to the stdlib `json`
+module otherwise. `json_response()` builds a Flask response from it and
+negotiates brotli (if the optional `brotli` package is installed) or gzip with
+the client's Accept-Encoding header, for payloads above a size threshold.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from typing import Optional
+
+# Both are optional - only used when available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Payloads smaller than this are sent uncompressed (compression would not pay off)
+COMPRESSION_THRESHOLD = int(os.environ.get("JSON_COMPRESSION_THRESHOLD", "1024"))
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def dumps(obj, pretty: bool = False) -> bytes:
+    """Serialize `obj` to UTF-8 JSON bytes, compact unless `pretty` is set."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            # e.g. integers above 64 bits: let the stdlib handle it
+            pass
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=str).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def choose_encoding(accept_encodings, size: int, threshold: Optional[int] = None) -> Optional[str]:
+    """Pick "br", "gzip" or None from a werkzeug Accept-Encoding header object."""
+    if size < (COMPRESSION_THRESHOLD if threshold is None else threshold):
+        return None
+    if brotli is not None and accept_encodings.quality("br") > 0:
+        return "br"
+    if accept_encodings.quality("gzip") > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def json_response(payload, status: int = 200, threshold: Optional[int] = None):
+    """Drop-in replacement for `jsonify` with fast encoding and compression."""
+    from flask import Response, request
+
+    body = dumps(payload)
+    encoding = choose_encoding(request.accept_encodings, len(body), threshold)
+    response = Response(compress(body, encoding) if encoding else body, status=status, mimetype="application/json")
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
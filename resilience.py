@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Bounding scan latency when a region is degraded.
+
+- Circuit breakers per (service, region), fed by botocore event hooks
+  (`guard_session`), in one registry per set of credentials: after repeated failed calls (5xx, throttling, connection
+  errors once retries are exhausted) the breaker opens and further calls fail
+  fast with `CircuitOpenError` instead of waiting through their own retries.
+  After `reset_timeout` one trial call is let through (half-open).
+- `Deadline`: time budget of a scan, checked between scan phases and, with
+  `bind_deadline`, before every attempt of a client's calls (retries included).
+- `hedged(fn, delay)`: for idempotent list calls, starts a second identical
+  attempt when the first has not answered after `delay` seconds and keeps
+  whichever answers first.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+from aws_metrics import THROTTLE_ERROR_CODES
+
+T = TypeVar("T")
+
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_TIMEOUT = 30.0
+HEDGE_WORKERS = 64
+
+# Errors that say nothing about the health of the endpoint
+_CLIENT_ERROR_MAX_STATUS = 499
+
+_UNIQUE_PREFIX = "resilience"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose breaker is open."""
+
+    def __init__(self, service: str, region: str):
+        super().__init__(f"Circuit open for {service} in {region}")
+        self.service = service
+        self.region = region
+
+
+class DeadlineExceeded(Exception):
+    """The scan ran out of time."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker (closed -> open -> half-open -> closed)."""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_timeout: float = BREAKER_RESET_TIMEOUT,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go through now; in half-open state only one trial call at a time."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = HALF_OPEN
+            if self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def release_trial(self) -> None:
+        """Neutral outcome (e.g. a call aborted by the caller): frees the half-open trial slot."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = self.clock()
+            self._trial_running = False
+
+
+class BreakerRegistry:
+    """One breaker per (service, region), created on first use."""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_timeout: float = BREAKER_RESET_TIMEOUT,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+    def get(self, service: str, region: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get((service, region))
+            if breaker is None:
+                breaker = self._breakers[(service, region)] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout, self.clock)
+            return breaker
+
+    def states(self) -> Dict[Tuple[str, str], str]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {key: breaker.state for key, breaker in breakers.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._breakers.clear()
+
+
+# Default registry of sessions guarded without their own; `get_session` gives each set of
+# credentials its own registry so that one account's failures do not open breakers for others
+BREAKERS = BreakerRegistry()
+
+
+def _service_name(model) -> str:
+    return model.service_model.service_id.hyphenize()
+
+
+def guard_session(session, breakers: Optional[BreakerRegistry] = None):
+    """
+    Register circuit breaker hooks on a boto3 session.
+
+    Clients created from the session afterwards inherit the hooks; registering
+    twice is harmless (unique ids).
+    """
+    breakers = breakers or BREAKERS
+    events = session.events
+    suffix = f"{_UNIQUE_PREFIX}-{id(breakers)}"
+
+    def before_call(model, context, **kwargs):
+        service, region = _service_name(model), context.get("client_region") or "global"
+        if not breakers.get(service, region).allow():
+            raise CircuitOpenError(service, region)
+
+    def after_call(http_response, parsed, model, context, **kwargs):
+        breaker = breakers.get(_service_name(model), context.get("client_region") or "global")
+        if getattr(http_response, "status_code", 200) > _CLIENT_ERROR_MAX_STATUS or \
+                ((parsed or {}).get("Error") or {}).get("Code") in THROTTLE_ERROR_CODES:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    def after_call_error(exception, context, event_name=None, **kwargs):
+        # event_name: after-call-error.<service>.<operation>
+        parts = (event_name or "").split(".")
+        service = parts[1] if len(parts) > 2 else "unknown"
+        breaker = breakers.get(service, context.get("client_region") or "global")
+        if isinstance(exception, DeadlineExceeded):
+            # Aborted by the scan's own time budget: says nothing about the endpoint
+            breaker.release_trial()
+        else:
+            breaker.record_failure()
+
+    events.register("before-call.*.*", before_call, unique_id=f"{suffix}-before-call")
+    events.register("after-call.*.*", after_call, unique_id=f"{suffix}-after-call")
+    events.register("after-call-error.*.*", after_call_error, unique_id=f"{suffix}-after-call-error")
+    return session
+
+
+class Deadline:
+    """Absolute time budget; `None` seconds means no deadline."""
+
+    def __init__(self, seconds: Optional[float], clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.expires_at = None if seconds is None else clock() + seconds
+
+    def remaining(self) -> Optional[float]:
+        return None if self.expires_at is None else max(0.0, self.expires_at - self.clock())
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and self.clock() >= self.expires_at
+
+    def check(self) -> None:
+        if self.expired():
+            raise DeadlineExceeded("scan deadline exceeded")
+
+
+NO_DEADLINE = Deadline(None)
+
+
+def bind_deadline(client, deadline: Deadline):
+    """Make every attempt of `client`'s calls fail with `DeadlineExceeded` once `deadline` has expired.
+
+    The check runs before each HTTP attempt, so retries stop too, and after a
+    failed attempt, so no retry back-off is slept once the deadline is gone.
+    Meant for clients created for one scan (the hooks are never removed).
+    """
+    events = getattr(getattr(client, "meta", None), "events", None)
+    if events is None or deadline.expires_at is None:
+        return client
+
+    def before_send(**kwargs):
+        deadline.check()
+
+    def needs_retry(response=None, caught_exception=None, **kwargs):
+        failed = caught_exception is not None or (response is not None and response[0].status_code >= 400)
+        if failed:
+            deadline.check()
+
+    events.register_first("before-send.*.*", before_send, unique_id=f"deadline-{id(deadline)}")
+    events.register_first("needs-retry.*.*", needs_retry, unique_id=f"deadline-{id(deadline)}-retry")
+    return client
+
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_lock = threading.Lock()
+
+
+def _hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_executor
+    if _hedge_executor is None:
+        with _hedge_lock:
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="hedge")
+    return _hedge_executor
+
+
+def hedged(fn: Callable[[], T], delay: Optional[float]) -> T:
+    """`fn()`, with a second attempt started if the first takes longer than `delay` seconds.
+
+    Only for idempotent calls. The first attempt to succeed wins; if both fail,
+    the last error is raised. With `delay=None`, `fn` is simply called.
+    """
+    if delay is None:
+        return fn()
+    pool = _hedge_pool()
+    first = pool.submit(fn)
+    try:
+        return first.result(timeout=delay)
+    except FutureTimeout:
+        pass
+    pending = {first, pool.submit(fn)}
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                for other in pending:
+                    other.cancel()
+                return future.result()
+            error = future.exception()
+    raise error  # type: ignore
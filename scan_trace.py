@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Nested timing spans for inventory scans, exported as Chrome trace-event JSON.
+
+A `ScanTracer` records "complete" events (ph="X") for scan stages (region,
+topics, queues, links, subscription chains) and for every AWS call made by
+instrumented clients. The output of `to_chrome_trace()` can be opened in
+chrome://tracing, Perfetto or speedscope.
+
+Call hooks are registered under ids (and a request context key) specific to
+the tracer, and `uninstrument_client` removes them once the scan is done, so
+clients that outlive a scan do not keep feeding its tracer.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+_START_KEY = "scan_trace_start"
+
+
+class ScanTracer:
+    """Thread-safe collector of timing spans."""
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._events: List[Dict[str, object]] = []
+        self._threads: Dict[int, str] = {}
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._start_key = f"{_START_KEY}-{id(self)}"
+        self._unique = f"scan-trace-{id(self)}"
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._origin) * 1_000_000
+
+    def add_span(self, name: str, cat: str, start_us: float, end_us: float, args: Optional[Dict[str, object]] = None) -> None:
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": round(start_us, 3),
+            "dur": round(max(end_us - start_us, 0.0), 3),
+            "pid": self._pid,
+            "tid": thread.ident,
+            "args": args or {},
+        }
+        with self._lock:
+            self._events.append(event)
+            self._threads.setdefault(thread.ident, thread.name)
+
+    @contextmanager
+    def span(self, name: str, cat: str = "scan", **args) -> Iterator[None]:
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            self.add_span(name, cat, start, self._now_us(), args)
+
+    def instrument_client(self, client) -> None:
+        """Record one span per AWS call (each paginator page is one call)."""
+        events = getattr(getattr(client, "meta", None), "events", None)
+        if events is None:
+            return
+
+        start_key = self._start_key
+
+        def before_call(context, **kwargs):
+            context[start_key] = self._now_us()
+
+        def after_call(model, context, parsed=None, **kwargs):
+            start = context.pop(start_key, None)
+            if start is None:
+                return
+            args: Dict[str, object] = {"region": context.get("client_region")}
+            if parsed and parsed.get("Error"):
+                args["error"] = parsed["Error"].get("Code")
+            service = model.service_model.service_id.hyphenize()
+            self.add_span(f"{service}.{model.name}", "aws-call", start, self._now_us(), args)
+
+        def after_call_error(context, exception=None, event_name=None, **kwargs):
+            start = context.pop(start_key, None)
+            if start is None:
+                return
+            # event_name: after-call-error.<service>.<operation>
+            name = ".".join((event_name or "").split(".")[1:]) or "aws-call"
+            args = {"region": context.get("client_region"), "error": str(exception)}
+            self.add_span(name, "aws-call", start, self._now_us(), args)
+
+        events.register("before-call.*.*", before_call, unique_id=f"{self._unique}-before-call")
+        events.register("after-call.*.*", after_call, unique_id=f"{self._unique}-after-call")
+        events.register("after-call-error.*.*", after_call_error, unique_id=f"{self._unique}-after-call-error")
+
+    def uninstrument_client(self, client) -> None:
+        """Remove the hooks added by `instrument_client` (no-op if there are none)."""
+        events = getattr(getattr(client, "meta", None), "events", None)
+        if events is None:
+            return
+        for event in ("before-call", "after-call", "after-call-error"):
+            events.unregister(f"{event}.*.*", unique_id=f"{self._unique}-{event}")
+
+    def to_chrome_trace(self) -> Dict[str, object]:
+        with self._lock:
+            events = sorted(self._events, key=lambda e: e["ts"])  # type: ignore
+            threads = dict(self._threads)
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        metadata.append({"name": "process_name", "ph": "M", "pid": self._pid, "tid": 0, "args": {"name": "aws-sns-sqs-scan"}})
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+class _NullTracer:
+    """No-op tracer used when tracing is disabled."""
+
+    enabled = False
+
+    @contextmanager
+    def span(self, name: str, cat: str = "scan", **args) -> Iterator[None]:
+        yield
+
+    def instrument_client(self, client) -> None:
+        pass
+
+    def uninstrument_client(self, client) -> None:
+        pass
+
+
+NULL_TRACER = _NullTracer()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Cache backends for state that several requests (and worker processes) share:
+inventory snapshots, CloudWatch stats and queue URL maps.
+
+- `MemoryCache`: in-process LRU with a TTL per entry.
+- `SQLiteCache`: a local SQLite file (WAL) shared by every worker process on
+  the host; values are stored as JSON.
+
+Both offer `get_or_compute(key, compute, ttl)` with single-flight locking:
+concurrent callers of the same key wait for one computation instead of each
+calling AWS. `SQLiteCache` extends this across processes with a lease row per
+key, renewed while the computation runs; a lease expires after
+`lease_timeout` so a crashed worker does not block the key. The leader also
+publishes its outcome for `OUTCOME_TTL` seconds when it is not cached (error,
+`None` or rejected result), so the processes that waited on it return it
+instead of recomputing in turn. `None` results are never cached.
+
+`get_cache()` returns the process-wide backend selected by `CACHE_BACKEND`
+("memory", the default, or "sqlite" with the file at `CACHE_PATH`).
+"""
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from json_response import dumps
+
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "aws-sns-sqs-cache.sqlite")
+MEMORY_CACHE_SIZE = 4096
+LEASE_TIMEOUT = 120.0
+LEASE_POLL_INTERVAL = 0.05
+# How long processes that waited on a computation can read its uncached outcome
+OUTCOME_TTL = 10.0
+# Expired rows are purged every PURGE_EVERY writes
+PURGE_EVERY = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outcomes (
+    key TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    value BLOB,
+    error TEXT,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (key, owner)
+);
+CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires_at);
+"""
+
+_MISSING = object()
+
+
+class ComputeError(Exception):
+    """Raised in the processes that waited on a computation that failed in another process."""
+
+
+class CacheBackend(ABC):
+    """get / set / delete with a TTL per entry, plus single-flight `get_or_compute`."""
+
+    def __init__(self) -> None:
+        self._inflight_lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+
+    @abstractmethod
+    def get(self, key: str, default=None):
+        """Value of `key`, or `default` when missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value, ttl: float) -> None:
+        """Store `value` for `ttl` seconds."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def get_or_compute(self, key: str, compute: Callable[[], object], ttl: float,
+                       should_cache: Optional[Callable[[object], bool]] = None):
+        """Cached value for `key`, else `compute()` run by a single caller at a time.
+
+        The result is stored unless it is None or `should_cache(result)` is false.
+        Errors propagate to every caller waiting on that computation.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            value = self._compute_once(key, compute, ttl, should_cache)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def _compute_once(self, key: str, compute: Callable[[], object], ttl: float,
+                      should_cache: Optional[Callable[[object], bool]]):
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = compute()
+        if value is not None and (should_cache is None or should_cache(value)):
+            self.set(key, value, ttl)
+        return value
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU; values are kept as is (callers must not mutate them)."""
+
+    def __init__(self, maxsize: int = MEMORY_CACHE_SIZE, clock: Callable[[], float] = time.monotonic):
+        super().__init__()
+        self.maxsize = maxsize
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, object]]" = OrderedDict()
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if self.clock() >= entry[0]:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(CacheBackend):
+    """Cache in a local SQLite file shared by processes (one connection per thread)."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, lease_timeout: float = LEASE_TIMEOUT,
+                 poll_interval: float = LEASE_POLL_INTERVAL):
+        super().__init__()
+        self.path = path
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        # Write counter shared by request threads (next() on itertools.count is atomic)
+        self._writes = itertools.count(1)
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit: every statement is its own transaction unless BEGIN is explicit
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, default=None):
+        row = self._conn().execute("SELECT value FROM cache WHERE key = ? AND expires_at > ?",
+                                   (key, time.time())).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def set(self, key: str, value, ttl: float) -> None:
+        conn = self._conn()
+        now = time.time()
+        conn.execute("INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                     (key, dumps(value), now + ttl))
+        if next(self._writes) % PURGE_EVERY == 0:
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+            conn.execute("DELETE FROM outcomes WHERE expires_at <= ?", (now,))
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM cache")
+        conn.execute("DELETE FROM leases")
+        conn.execute("DELETE FROM outcomes")
+
+    def _acquire(self, key: str, owner: str) -> bool:
+        now = time.time()
+        cursor = self._conn().execute(
+            "INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at <= ?",
+            (key, owner, now + self.lease_timeout, now))
+        return cursor.rowcount == 1
+
+    def _lease_owner(self, key: str) -> Optional[str]:
+        row = self._conn().execute("SELECT owner FROM leases WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _renew(self, key: str, owner: str) -> bool:
+        cursor = self._conn().execute("UPDATE leases SET expires_at = ? WHERE key = ? AND owner = ?",
+                                      (time.time() + self.lease_timeout, key, owner))
+        return cursor.rowcount == 1
+
+    def _release(self, key: str, owner: str) -> None:
+        self._conn().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+
+    def _keep_lease(self, key: str, owner: str, done: threading.Event) -> None:
+        # Renew well before expiry, for as long as the computation runs
+        while not done.wait(self.lease_timeout / 3):
+            if not self._renew(key, owner):
+                return
+
+    def _publish(self, key: str, owner: str, value=None, error: Optional[BaseException] = None) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO outcomes (key, owner, value, error, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (key, owner, None if error is not None else dumps(value),
+             None if error is None else f"{type(error).__name__}: {error}", time.time() + OUTCOME_TTL))
+
+    def _outcome(self, key: str, owner: str):
+        row = self._conn().execute("SELECT value, error FROM outcomes WHERE key = ? AND owner = ? AND expires_at > ?",
+                                   (key, owner, time.time())).fetchone()
+        if row is None:
+            return _MISSING
+        if row[1] is not None:
+            raise ComputeError(row[1])
+        return json.loads(row[0])
+
+    def _compute_once(self, key: str, compute: Callable[[], object], ttl: float,
+                      should_cache: Optional[Callable[[object], bool]]):
+        # One lease owner per computation, so waiters can tell its outcome from earlier ones
+        owner = uuid.uuid4().hex
+        leader: Optional[str] = None
+        # Another process may hold the lease: wait for its value or outcome, or take over once the lease is free
+        while True:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            if leader is not None:
+                value = self._outcome(key, leader)
+                if value is not _MISSING:
+                    return value
+            if self._acquire(key, owner):
+                break
+            leader = self._lease_owner(key) or leader
+            time.sleep(self.poll_interval)
+        done = threading.Event()
+        threading.Thread(target=self._keep_lease, args=(key, owner, done), name="cache-lease", daemon=True).start()
+        try:
+            # The previous leader may have stored the value just before we took over
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            value = compute()
+            if value is not None and (should_cache is None or should_cache(value)):
+                self.set(key, value, ttl)
+            else:
+                self._publish(key, owner, value)
+            return value
+        except Exception as e:
+            self._publish(key, owner, error=e)
+            raise
+        finally:
+            done.set()
+            self._release(key, owner)
+
+
+_cache: Optional[CacheBackend] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> CacheBackend:
+    """The process-wide cache backend (`CACHE_BACKEND` = memory | sqlite, `CACHE_PATH`)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                backend = os.environ.get("CACHE_BACKEND", "memory")
+                if backend == "sqlite":
+                    _cache = SQLiteCache(os.environ.get("CACHE_PATH", DEFAULT_CACHE_PATH))
+                elif backend == "memory":
+                    _cache = MemoryCache()
+                else:
+                    raise ValueError(f"Unknown CACHE_BACKEND: {backend!r} (expected memory or sqlite)")
+    return _cache
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Bulk-oriented SQL export of an inventory.
+
+Three outputs share the same schema:
+- `to_sql_inserts()`: DDL + batched multi-row INSERT statements (portable SQL)
+- `to_sql_copy()`: DDL + PostgreSQL `COPY ... FROM stdin` blocks in CSV format
+- `write_sqlite()`: a ready-to-query SQLite database file, loaded with
+  `executemany` inside a single transaction
+"""
+from __future__ import annotations
+
+import csv
+import io
+import os
+import sqlite3
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+TABLES: List[Tuple[str, Tuple[str, ...], str]] = [
+    ("sns_topic", ("arn", "name", "region"),
+     "CREATE TABLE sns_topic (arn VARCHAR(2048) PRIMARY KEY, name VARCHAR(255), region VARCHAR(64));"),
+    ("sqs_queue", ("arn", "name", "url", "region"),
+     "CREATE TABLE sqs_queue (arn VARCHAR(2048) PRIMARY KEY, name VARCHAR(255), url VARCHAR(2048), region VARCHAR(64));"),
+    ("subscription", ("topic_arn", "queue_arn", "region"),
+     "CREATE TABLE subscription (topic_arn VARCHAR(2048), queue_arn VARCHAR(2048), region VARCHAR(64), PRIMARY KEY (topic_arn, queue_arn));"),
+]
+
+DEFAULT_BATCH_SIZE = 500
+
+Row = Tuple[Optional[str], ...]
+
+
+def table_rows(inventory: List[Dict[str, object]]) -> Dict[str, List[Row]]:
+    """Rows per table, deduplicated on each table's primary key."""
+    rows: Dict[str, List[Row]] = {name: [] for name, _, _ in TABLES}
+    seen_topics, seen_queues, seen_links = set(), set(), set()
+    for item in inventory:
+        region = item.get("region", "")
+        for t in item.get("topics", []):  # type: ignore
+            if t["arn"] not in seen_topics:
+                seen_topics.add(t["arn"])
+                rows["sns_topic"].append((t["arn"], t.get("name"), region))
+        for q in item.get("queues", []):  # type: ignore
+            if q["arn"] not in seen_queues:
+                seen_queues.add(q["arn"])
+                rows["sqs_queue"].append((q["arn"], q.get("name"), q.get("url"), region))
+        for l in item.get("links", []):  # type: ignore
+            key = (l["from_arn"], l["to_arn"])
+            # A topic can hold several subscriptions to the same queue (e.g. different filter policies)
+            if key not in seen_links:
+                seen_links.add(key)
+                rows["subscription"].append((l["from_arn"], l["to_arn"], region))
+    return rows
+
+
+def sql_literal(value) -> str:
+    if value is None:
+        return "NULL"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _batches(rows: Sequence[Row], size: int) -> Iterator[Sequence[Row]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def to_sql_inserts(inventory: List[Dict[str, object]], batch_size: int = DEFAULT_BATCH_SIZE,
+                   rows: Optional[Dict[str, List[Row]]] = None) -> str:
+    """DDL followed by multi-row INSERTs of at most `batch_size` rows each.
+
+    `rows` is an optional precomputed `table_rows(inventory)`.
+    """
+    rows = rows if rows is not None else table_rows(inventory)
+    parts = [ddl for _, _, ddl in TABLES] + [""]
+    for name, columns, _ in TABLES:
+        for batch in _batches(rows[name], max(batch_size, 1)):
+            values = ",\n".join("(" + ", ".join(sql_literal(v) for v in row) + ")" for row in batch)
+            parts.append(f"INSERT INTO {name} ({', '.join(columns)}) VALUES\n{values};")
+    return "\n".join(parts)
+
+
+def to_sql_copy(inventory: List[Dict[str, object]], rows: Optional[Dict[str, List[Row]]] = None) -> str:
+    """DDL followed by PostgreSQL COPY blocks (CSV), for use with psql."""
+    rows = rows if rows is not None else table_rows(inventory)
+    parts = [ddl for _, _, ddl in TABLES] + [""]
+    for name, columns, _ in TABLES:
+        if not rows[name]:
+            continue
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        writer.writerows(rows[name])
+        parts.append(f"COPY {name} ({', '.join(columns)}) FROM stdin WITH (FORMAT csv);")
+        parts.append(buf.getvalue() + "\\.")
+    return "\n".join(parts)
+
+
+def write_sqlite(inventory: List[Dict[str, object]], path: str, rows: Optional[Dict[str, List[Row]]] = None) -> Dict[str, int]:
+    """Write the inventory into a new SQLite database file. Returns row counts."""
+    rows = rows if rows is not None else table_rows(inventory)
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    try:
+        # Fresh file written in one go: no need for a rollback journal
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        with conn:
+            for name, columns, ddl in TABLES:
+                conn.execute(ddl)
+                placeholders = ", ".join("?" for _ in columns)
+                conn.executemany(f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({placeholders})", rows[name])
+    finally:
+        conn.close()
+    return {name: len(table) for name, table in rows.items()}
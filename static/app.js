@@ -34,7 +34,7 @@ document.addEventListener('DOMContentLoaded', () => {
     window.addEventListener('react-diagram-loaded', () => {
         console.log('React diagram components loaded');
         // Update diagram lists if we have data
-        if (currentInventory.topics.length > 0 || currentInventory.queues.length > 0) {
+        if (currentScan) {
             updateDiagramLists();
         }
     });
@@ -71,6 +71,10 @@ document.addEventListener('DOMContentLoaded', () => {
 });
 
 // State
+// Scans are indexed server-side: the lists page through /api/inventory/<scan_id>/<kind>,
+// the whole inventory is only downloaded for the diagram, exports and statistics (ensureInventory)
+let currentScan = null; // summary: {scan_id, topics, queues, links, orphan_queues}
+let inventoryLoad = null;
 let currentInventory = {
     topics: [],
     queues: [],
@@ -78,6 +82,16 @@ let currentInventory = {
     stats: {} // arn -> stats object
 };
 
+const PAGE_SIZE = 24;
+const REALTIME_PAGE_SIZE = 100;
+const listState = {
+    queues: { offset: 0, q: '', request: 0 },
+    topics: { offset: 0, q: '', request: 0 },
+    realtime: { offset: 0, q: '', request: 0 }
+};
+// Queues picked for monitoring, kept across pages and searches: arn -> {arn, name, region}
+const realtimeSelection = new Map();
+
 // UI Helpers
 function setStatus(msg, type = 'normal') {
     const el = document.getElementById('status-bar');
@@ -281,46 +295,43 @@ async function scanResources() {
         body: JSON.stringify(data)
     }).catch(e => console.error('Failed to save credentials:', e));
 
-    // Perform scan in background
+    // Perform scan in background; the server indexes it and only returns its summary
     fetch('/api/scan', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(data)
+        body: JSON.stringify({ ...data, index: true })
     })
     .then(res => res.json())
-    .then(inventory => {
+    .then(summary => {
         // Remove scanning notification
         if (scanningNotification && scanningNotification.parentElement) {
             scanningNotification.remove();
         }
 
-        if (inventory.error) {
-            setStatus(`Scan failed: ${inventory.error}`, 'error');
-            showNotification(`Échec du scan: ${inventory.error}`, 'error');
+        if (summary.error) {
+            setStatus(`Scan failed: ${summary.error}`, 'error');
+            showNotification(`Échec du scan: ${summary.error}`, 'error');
         } else {
-            // Flatten inventory
-            currentInventory.topics = [];
-            currentInventory.queues = [];
-            currentInventory.links = [];
-            window.rawInventory = inventory; // Store raw for export
-
-            inventory.forEach(regionItem => {
-                const r = regionItem.region;
-                regionItem.topics.forEach(t => currentInventory.topics.push({ ...t, region: r }));
-                regionItem.queues.forEach(q => currentInventory.queues.push({ ...q, region: r }));
-                regionItem.links.forEach(l => currentInventory.links.push({ ...l, region: r }));
-            });
+            currentScan = summary;
+            inventoryLoad = null;
+            window.rawInventory = null;
+            currentInventory = { topics: [], queues: [], links: [], stats: {} };
+            realtimeSelection.clear();
+            Object.values(listState).forEach(state => { state.offset = 0; });
 
             updateTables();
             updateRegionIndicator(data.regions);
-            const successMsg = `Scan terminé: ${currentInventory.topics.length} topics et ${currentInventory.queues.length} queues trouvés.`;
+            const successMsg = `Scan terminé: ${summary.topics} topics et ${summary.queues} queues trouvés.`;
             setStatus(successMsg, 'success');
             showNotification(successMsg, 'success');
             
-            // Force update diagram lists after scan (with delay to ensure React is ready)
-            setTimeout(() => {
-                updateDiagramLists();
-            }, 300);
+            // The diagram needs the whole inventory: load it now only if the diagram is on screen
+            const pipelineSection = document.getElementById('pipeline');
+            if (pipelineSection && isOnScreen(pipelineSection)) {
+                setTimeout(() => {
+                    updateDiagramLists();
+                }, 300);
+            }
         }
     })
     .catch(e => {
@@ -339,15 +350,101 @@ async function scanResources() {
     });
 }
 
+function isOnScreen(element) {
+    const rect = element.getBoundingClientRect();
+    return rect.top < window.innerHeight && rect.bottom > 0;
+}
+
+async function ensureInventory() {
+    // Whole inventory of the current scan, downloaded once and only when a feature needs it
+    if (!currentScan) return currentInventory;
+    if (!inventoryLoad) {
+        const scanId = currentScan.scan_id;
+        inventoryLoad = fetch(`/api/inventory/${scanId}/raw`)
+            .then(res => res.json())
+            .then(inventory => {
+                if (inventory.error) throw new Error(inventory.error);
+                if (!currentScan || currentScan.scan_id !== scanId) return currentInventory;
+                window.rawInventory = inventory; // Store raw for export
+                currentInventory.topics = [];
+                currentInventory.queues = [];
+                currentInventory.links = [];
+                inventory.forEach(regionItem => {
+                    const r = regionItem.region;
+                    regionItem.topics.forEach(t => currentInventory.topics.push({ ...t, region: r }));
+                    regionItem.queues.forEach(q => currentInventory.queues.push({ ...q, region: r }));
+                    regionItem.links.forEach(l => currentInventory.links.push({ ...l, region: r }));
+                });
+                return currentInventory;
+            })
+            .catch(e => {
+                inventoryLoad = null;
+                throw e;
+            });
+    }
+    return inventoryLoad;
+}
+
+async function fetchPage(kind, state, limit, extra = {}) {
+    // One page of /api/inventory/<scan_id>/<kind>; null when a newer request for the same list was made
+    const request = ++state.request;
+    const params = new URLSearchParams({ limit: limit, offset: state.offset, ...extra });
+    if (state.q) params.set('q', state.q);
+    const res = await fetch(`/api/inventory/${currentScan.scan_id}/${kind}?${params}`);
+    const page = await res.json();
+    if (page.error) throw new Error(page.error);
+    return request === state.request ? page : null;
+}
+
+function renderPager(name, page) {
+    const pager = document.getElementById(`${name}-pager`);
+    if (!pager) return;
+    if (!page || page.total <= page.limit) {
+        pager.innerHTML = '';
+        return;
+    }
+    const end = Math.min(page.offset + page.items.length, page.total);
+    const button = 'text-xs px-3 py-1 rounded border border-white/10 bg-white/5 hover:bg-white/10 transition-colors disabled:opacity-30';
+    pager.innerHTML = `
+        <button class="${button}" onclick="changePage('${name}', -1)" ${page.offset === 0 ? 'disabled' : ''}>Previous</button>
+        <span class="text-xs text-gray-400 font-mono">${page.offset + 1}–${end} / ${page.total}</span>
+        <button class="${button}" onclick="changePage('${name}', 1)" ${end >= page.total ? 'disabled' : ''}>Next</button>
+    `;
+}
+
+function refreshList(name) {
+    if (name === 'queues') updateQueuesList();
+    else if (name === 'topics') updateTopicsList();
+    else updateRealtimeQueueList();
+}
+
+function changePage(name, direction) {
+    const state = listState[name];
+    const size = name === 'realtime' ? REALTIME_PAGE_SIZE : PAGE_SIZE;
+    state.offset = Math.max(0, state.offset + direction * size);
+    refreshList(name);
+}
+
+let searchTimers = {};
+function searchList(name, inputId) {
+    // Server-side name search, debounced while typing
+    clearTimeout(searchTimers[name]);
+    searchTimers[name] = setTimeout(() => {
+        listState[name].q = (document.getElementById(inputId).value || '').trim();
+        listState[name].offset = 0;
+        refreshList(name);
+    }, 250);
+}
+
 function updateTables() {
     // Update Counts
     const countTopics = document.getElementById('count-topics');
     const countQueues = document.getElementById('count-queues');
     const countLinks = document.getElementById('count-links');
     
-    if (countTopics) countTopics.textContent = currentInventory.topics.length;
-    if (countQueues) countQueues.textContent = currentInventory.queues.length;
-    if (countLinks) countLinks.textContent = currentInventory.links.length;
+    if (countTopics) countTopics.textContent = currentScan ? currentScan.topics : 0;
+    if (countQueues) countQueues.textContent = currentScan ? currentScan.queues : 0;
+    if (countLinks) countLinks.textContent = currentScan ? currentScan.links : 0;
 
     // Update Dashboard Grid with Statistics
     updateDashboardGrid();
@@ -359,14 +456,13 @@ function updateTables() {
     updateTopicsList();
 
     updateRealtimeQueueList();
-    updateDiagramLists();
 }
 
 function updateDashboardGrid() {
     const grid = document.getElementById('dashboard-grid');
     if (!grid) return;
 
-    if (currentInventory.queues.length === 0 && currentInventory.topics.length === 0) {
+    if (!currentScan || (currentScan.queues === 0 && currentScan.topics === 0)) {
         grid.innerHTML = `
             <div class="glass-panel spotlight-card rounded-xl p-6 text-center col-span-full">
                 <div class="text-gray-400 text-sm mb-2">Scan resources to view statistics</div>
@@ -375,19 +471,11 @@ function updateDashboardGrid() {
         return;
     }
 
-    // Calculate statistics
-    const subscribedQueueArns = new Set(currentInventory.links.map(l => l.to_arn));
-    const orphanCount = currentInventory.queues.filter(q => !subscribedQueueArns.has(q.arn)).length;
-    
-    // Get total stats
+    // Get total stats (queues carry sent / received, topics published)
     let totalSent = 0, totalReceived = 0, totalPublished = 0;
-    currentInventory.queues.forEach(q => {
-        const s = currentInventory.stats[q.arn] || {};
+    Object.values(currentInventory.stats).forEach(s => {
         totalSent += s.numberofmessagessent_28d || 0;
         totalReceived += s.numberofmessagesreceived_28d || 0;
-    });
-    currentInventory.topics.forEach(t => {
-        const s = currentInventory.stats[t.arn] || {};
         totalPublished += s.published_28d || 0;
     });
 
@@ -398,11 +486,11 @@ function updateDashboardGrid() {
                     <i data-lucide="layers" class="w-5 h-5 text-accent"></i>
                 </div>
                 <div>
-                    <div class="text-2xl font-display font-semibold text-white">${currentInventory.queues.length}</div>
+                    <div class="text-2xl font-display font-semibold text-white">${currentScan.queues}</div>
                     <div class="text-xs text-gray-400 font-mono">Queues</div>
                 </div>
             </div>
-            <div class="text-xs text-gray-500">Orphan: ${orphanCount}</div>
+            <div class="text-xs text-gray-500">Orphan: ${currentScan.orphan_queues}</div>
         </div>
         <div class="glass-panel spotlight-card rounded-xl p-6">
             <div class="flex items-center gap-3 mb-4">
@@ -410,7 +498,7 @@ function updateDashboardGrid() {
                     <i data-lucide="radio" class="w-5 h-5 text-blue-400"></i>
                 </div>
                 <div>
-                    <div class="text-2xl font-display font-semibold text-white">${currentInventory.topics.length}</div>
+                    <div class="text-2xl font-display font-semibold text-white">${currentScan.topics}</div>
                     <div class="text-xs text-gray-400 font-mono">Topics</div>
                 </div>
             </div>
@@ -422,7 +510,7 @@ function updateDashboardGrid() {
                     <i data-lucide="link" class="w-5 h-5 text-green-400"></i>
                 </div>
                 <div>
-                    <div class="text-2xl font-display font-semibold text-white">${currentInventory.links.length}</div>
+                    <div class="text-2xl font-display font-semibold text-white">${currentScan.links}</div>
                     <div class="text-xs text-gray-400 font-mono">Subscriptions</div>
                 </div>
             </div>
@@ -444,22 +532,35 @@ function updateDashboardGrid() {
     lucide.createIcons();
 }
 
-function updateQueuesList() {
+async function updateQueuesList() {
     const list = document.getElementById('queues-list');
     if (!list) return;
 
-    if (currentInventory.queues.length === 0) {
+    if (!currentScan || currentScan.queues === 0) {
         list.innerHTML = '<div class="col-span-full text-center text-gray-400 text-sm py-8">No queues found. Scan resources first.</div>';
+        renderPager('queues', null);
         return;
     }
 
-    const subscribedQueueArns = new Set(currentInventory.links.map(l => l.to_arn));
+    let page;
+    try {
+        page = await fetchPage('queues', listState.queues, PAGE_SIZE);
+    } catch (e) {
+        list.innerHTML = `<div class="col-span-full text-center text-red-400 text-sm py-8">${escapeHtml(String(e))}</div>`;
+        return;
+    }
+    if (!page) return;
+    renderPager('queues', page);
+    if (page.items.length === 0) {
+        list.innerHTML = '<div class="col-span-full text-center text-gray-400 text-sm py-8">No matching queues.</div>';
+        return;
+    }
 
-    list.innerHTML = currentInventory.queues.map(q => {
+    list.innerHTML = page.items.map(q => {
         const s = currentInventory.stats[q.arn] || {};
         const sent = s.numberofmessagessent_28d !== undefined ? s.numberofmessagessent_28d.toLocaleString() : '-';
         const recv = s.numberofmessagesreceived_28d !== undefined ? s.numberofmessagesreceived_28d.toLocaleString() : '-';
-        const isOrphan = !subscribedQueueArns.has(q.arn);
+        const isOrphan = q.subscriptions === 0;
         
         return `
             <div class="glass-panel spotlight-card rounded-xl p-6">
@@ -495,26 +596,39 @@ function updateQueuesList() {
     lucide.createIcons();
 }
 
-function updateTopicsList() {
+async function updateTopicsList() {
     const list = document.getElementById('topics-list');
     if (!list) return;
 
-    if (currentInventory.topics.length === 0) {
+    if (!currentScan || currentScan.topics === 0) {
         list.innerHTML = '<div class="col-span-full text-center text-gray-400 text-sm py-8">No topics found. Scan resources first.</div>';
+        renderPager('topics', null);
         return;
     }
 
-    // Group links by topic
+    let page;
     const topicToQueues = {};
-    currentInventory.links.forEach(l => {
-        if (!topicToQueues[l.from_arn]) {
-            topicToQueues[l.from_arn] = [];
-        }
-        const queueName = l.to_arn ? l.to_arn.split(':').pop() : 'Unknown';
-        topicToQueues[l.from_arn].push(queueName);
-    });
+    try {
+        page = await fetchPage('topics', listState.topics, PAGE_SIZE);
+        if (!page) return;
+        // First subscribed queues of the topics on this page (the card shows three)
+        await Promise.all(page.items.filter(t => t.subscriptions > 0).map(async t => {
+            const params = new URLSearchParams({ topic_arn: t.arn, limit: 3 });
+            const res = await fetch(`/api/inventory/${currentScan.scan_id}/links?${params}`);
+            const links = await res.json();
+            topicToQueues[t.arn] = (links.items || []).map(l => l.to_arn ? l.to_arn.split(':').pop() : 'Unknown');
+        }));
+    } catch (e) {
+        list.innerHTML = `<div class="col-span-full text-center text-red-400 text-sm py-8">${escapeHtml(String(e))}</div>`;
+        return;
+    }
+    renderPager('topics', page);
+    if (page.items.length === 0) {
+        list.innerHTML = '<div class="col-span-full text-center text-gray-400 text-sm py-8">No matching topics.</div>';
+        return;
+    }
 
-    list.innerHTML = currentInventory.topics.map(t => {
+    list.innerHTML = page.items.map(t => {
         const s = currentInventory.stats[t.arn] || {};
         const published = s.published_28d !== undefined ? s.published_28d.toLocaleString() : '-';
         const queues = topicToQueues[t.arn] || [];
@@ -537,14 +651,14 @@ function updateTopicsList() {
                         <span>Published (28d):</span>
                         <span class="text-white">${published}</span>
                     </div>
-                    ${queues.length > 0 ? `
+                    ${t.subscriptions > 0 ? `
                         <div class="pt-2 border-t border-white/10">
                             <div class="text-gray-400 mb-1">Subscribed Queues:</div>
                             <div class="flex flex-wrap gap-1">
                                 ${queues.slice(0, 3).map(q => `
                                     <span class="px-2 py-0.5 rounded bg-white/5 text-gray-300 border border-white/10 text-[10px]">${q}</span>
                                 `).join('')}
-                                ${queues.length > 3 ? `<span class="px-2 py-0.5 rounded bg-white/5 text-gray-300 border border-white/10 text-[10px]">+${queues.length - 3}</span>` : ''}
+                                ${t.subscriptions > 3 ? `<span class="px-2 py-0.5 rounded bg-white/5 text-gray-300 border border-white/10 text-[10px]">+${t.subscriptions - 3}</span>` : ''}
                             </div>
                         </div>
                     ` : '<div class="pt-2 border-t border-white/10 text-gray-500 text-[10px]">No subscriptions</div>'}
@@ -556,7 +670,17 @@ function updateTopicsList() {
     lucide.createIcons();
 }
 
-function updateDiagramLists() {
+async function updateDiagramLists() {
+    // The diagram selection and filtering work on the whole inventory
+    if (currentScan) {
+        try {
+            await ensureInventory();
+        } catch (e) {
+            setStatus(`Inventory load failed: ${e}`, 'error');
+            return;
+        }
+    }
+
     console.log('updateDiagramLists called', {
         topicsCount: currentInventory.topics.length,
         queuesCount: currentInventory.queues.length,
@@ -788,17 +912,28 @@ function updateDiagramFromSelection() {
     updateDiagram(filteredInventory);
 }
 
-function updateRealtimeQueueList() {
+async function updateRealtimeQueueList() {
     const container = document.getElementById('realtime-queue-list');
     if (!container) return;
 
-    if (currentInventory.queues.length === 0) {
+    if (!currentScan || currentScan.queues === 0) {
         container.innerHTML = '<div class="text-xs text-gray-500">Scan resources first to see available queues</div>';
+        renderPager('realtime', null);
+        return;
+    }
+
+    let page;
+    try {
+        page = await fetchPage('queues', listState.realtime, REALTIME_PAGE_SIZE);
+    } catch (e) {
+        container.innerHTML = `<div class="text-xs text-red-400">${escapeHtml(String(e))}</div>`;
         return;
     }
+    if (!page) return;
+    renderPager('realtime', page);
 
     container.innerHTML = '';
-    currentInventory.queues.forEach(queue => {
+    page.items.forEach(queue => {
         const label = document.createElement('label');
         label.className = 'flex items-center gap-2 px-2 py-1.5 rounded hover:bg-white/5 cursor-pointer transition-colors text-sm text-gray-300';
         label.title = queue.url || queue.name;
@@ -807,8 +942,10 @@ function updateRealtimeQueueList() {
         checkbox.type = 'checkbox';
         checkbox.value = queue.arn;
         checkbox.dataset.name = queue.name;
+        checkbox.dataset.region = queue.region;
         checkbox.className = 'h-4 w-4 rounded border-white/20 bg-white/5 text-accent focus:ring-accent focus:ring-offset-0';
-        checkbox.checked = false; // not selected by default
+        checkbox.checked = realtimeSelection.has(queue.arn); // not selected by default
+        checkbox.addEventListener('change', () => setRealtimeSelected(checkbox));
 
         const span = document.createElement('span');
         span.className = 'text-sm';
@@ -820,6 +957,14 @@ function updateRealtimeQueueList() {
     });
 }
 
+function setRealtimeSelected(checkbox) {
+    if (checkbox.checked) {
+        realtimeSelection.set(checkbox.value, { arn: checkbox.value, name: checkbox.dataset.name, region: checkbox.dataset.region });
+    } else {
+        realtimeSelection.delete(checkbox.value);
+    }
+}
+
 function selectAllTopics() {
     document.querySelectorAll('#realtime-topic-list input[type="checkbox"]').forEach(cb => cb.checked = true);
 }
@@ -829,31 +974,24 @@ function deselectAllTopics() {
 }
 
 function selectAllQueues() {
-    document.querySelectorAll('#realtime-queue-list input[type="checkbox"]').forEach(cb => cb.checked = true);
+    // Selects the queues listed on the current page
+    document.querySelectorAll('#realtime-queue-list input[type="checkbox"]').forEach(cb => {
+        cb.checked = true;
+        setRealtimeSelected(cb);
+    });
 }
 
 function deselectAllQueues() {
     document.querySelectorAll('#realtime-queue-list input[type="checkbox"]').forEach(cb => cb.checked = false);
+    realtimeSelection.clear();
 }
 
 function filterQueues() {
-    const q = document.getElementById('realtime-queue-filter');
-    const term = (q.value || '').toLowerCase().trim();
-    const container = document.getElementById('realtime-queue-list');
-    if (!container) return;
-    Array.from(container.children).forEach(label => {
-        const text = (label.textContent || '').toLowerCase();
-        if (!term || text.includes(term)) {
-            label.style.display = '';
-        } else {
-            label.style.display = 'none';
-        }
-    });
+    searchList('realtime', 'realtime-queue-filter');
 }
 
 function getSelectedQueues() {
-    const checkboxes = document.querySelectorAll('#realtime-queue-list input[type="checkbox"]:checked');
-    return Array.from(checkboxes).map(cb => cb.value);
+    return Array.from(realtimeSelection.keys());
 }
 
 function getSelectedTopics() {
@@ -863,10 +1001,17 @@ function getSelectedTopics() {
 
 async function updateDiagram(inventoryList) {
     try {
-        const res = await fetch('/api/export/mermaid', {
+        // Latency labels only cover the messages monitored with these credentials
+        const res = await fetch('/api/export/mermaid?latency=1', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(inventoryList)
+            body: JSON.stringify({
+                inventory: inventoryList,
+                access_key: document.getElementById('access_key').value,
+                secret_key: document.getElementById('secret_key').value,
+                session_token: document.getElementById('session_token').value,
+                profile: document.getElementById('profile').value
+            })
         });
         const data = await res.json();
 
@@ -940,10 +1085,16 @@ async function updateDiagram(inventoryList) {
 }
 
 async function exportData(format) {
-    if (currentInventory.topics.length === 0 && currentInventory.queues.length === 0) {
+    if (!currentScan) {
         alert("No data to export. Please scan first.");
         return;
     }
+    try {
+        await ensureInventory();
+    } catch (e) {
+        alert(`Export failed: ${e}`);
+        return;
+    }
 
     // Get filtered inventory from diagram selection, or use full inventory if nothing selected
     const filteredInventory = getFilteredInventoryFromDiagramSelection();
@@ -1011,12 +1162,18 @@ async function exportData(format) {
 }
 
 async function fetchStatistics() {
-    if (currentInventory.topics.length === 0 && currentInventory.queues.length === 0) {
+    if (!currentScan) {
         setStatus("Scan resources first.", "error");
         return;
     }
 
     setStatus('Fetching CloudWatch metrics (last 28 days)...');
+    try {
+        await ensureInventory();
+    } catch (e) {
+        setStatus(`Stats error: ${e}`, 'error');
+        return;
+    }
 
     // Prepare items list
     const items = [];
@@ -1119,7 +1276,7 @@ async function fetchRealtimeMessages() {
     try {
 
     // Check if we have scanned resources
-    if (currentInventory.topics.length === 0 && currentInventory.queues.length === 0) {
+    if (!currentScan) {
         log.innerHTML = `
             <div class="text-center py-8 text-gray-400">
                 Please scan resources first before monitoring
@@ -1145,10 +1302,8 @@ async function fetchRealtimeMessages() {
     const items = [];
 
     // Only monitor queues explicitly selected
-    currentInventory.queues.forEach(q => {
-        if (selectedQueueArns.includes(q.arn)) {
-            items.push({ arn: q.arn, name: q.name, region: q.region, type: 'queue' });
-        }
+    realtimeSelection.forEach(q => {
+        items.push({ arn: q.arn, name: q.name, region: q.region, type: 'queue' });
     });
 
     const data = {
@@ -1185,6 +1340,8 @@ async function fetchRealtimeMessages() {
             messages.forEach(msg => {
                 const timestamp = new Date(msg.timestamp).toLocaleTimeString();
                 const msgId = msg.message_id ? `<span class="text-xs ml-2 text-gray-400">ID: ${msg.message_id.substring(0, 8)}...</span>` : '';
+                const delays = msg.delays_ms || {};
+                const latency = msg.topic_arn ? `<span class="text-xs ml-2 text-gray-400">SNS→SQS ${delays.sns_to_sqs ?? '-'}ms · total ${delays.end_to_end ?? '-'}ms</span>` : '';
                 const bodyHtml = msg.body ? `<div class="mt-2 text-xs font-mono p-2 rounded bg-black/30 text-gray-300 border border-white/10">${escapeHtml(msg.body)}</div>` : '';
                 
                 // Color code based on type
@@ -1216,6 +1373,7 @@ async function fetchRealtimeMessages() {
                                     <span class="text-xs px-2 py-0.5 rounded font-semibold border ${typeColorClass}">${msg.type.toUpperCase()}</span>
                                     <span class="text-xs text-gray-400">${msg.region}</span>
                                     ${msgId}
+                                    ${latency}
                                 </div>
                                 <div class="text-xs mt-0.5 text-gray-400">${timestamp}</div>
                             </div>
@@ -0,0 +1,59 @@
+"""Test doubles shared by the test modules: a settable clock and locally answered AWS requests."""
+import boto3
+from botocore.awsrequest import AWSResponse
+
+JSON = "application/x-amz-json-1.0"
+XML = "text/xml"
+
+EMPTY_TOPICS = (b'<ListTopicsResponse xmlns="http://sns.amazonaws.com/doc/2010-03-31/">'
+                b'<ListTopicsResult><Topics/></ListTopicsResult></ListTopicsResponse>')
+EMPTY_QUEUES = b'{"QueueUrls": []}'
+INTERNAL_ERROR = b'{"__type": "InternalError", "message": "boom"}'
+SNS_INTERNAL_ERROR = b"<ErrorResponse><Error><Type>Receiver</Type><Code>InternalError</Code></Error></ErrorResponse>"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RawBody:
+    """Stands for the urllib3 response botocore reads the body from."""
+
+    def __init__(self, body):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+def aws_response(request, status, body, content_type=JSON):
+    return AWSResponse(request.url, status, {"Content-Type": content_type}, RawBody(body))
+
+
+def is_sns(request):
+    return "sns." in request.url
+
+
+def empty_listing(request):
+    """200 with no topics (SNS, XML) or no queues (SQS, JSON)."""
+    if is_sns(request):
+        return aws_response(request, 200, EMPTY_TOPICS, XML)
+    return aws_response(request, 200, EMPTY_QUEUES)
+
+
+def internal_error(request):
+    """500 InternalError in the protocol of the service."""
+    if is_sns(request):
+        return aws_response(request, 500, SNS_INTERNAL_ERROR, XML)
+    return aws_response(request, 500, INTERNAL_ERROR)
+
+
+def stub_session(send, session=None):
+    """`session` (by default a boto3 session with test keys) whose HTTP requests are answered by `send(request)`."""
+    session = session or boto3.Session(aws_access_key_id="AKIATEST", aws_secret_access_key="x")
+    session.events.register("before-send.*.*", lambda request, **kwargs: send(request))
+    return session
@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import boto3
+from botocore.config import Config
+from botocore.stub import Stubber
+
+from aws_stubs import aws_response, stub_session
+from aws_metrics import CallMetrics, instrument_session
+from app import app
+
+
+class TestAwsMetrics(unittest.TestCase):
+    def make_client(self, registry, service="sqs"):
+        session = boto3.Session(aws_access_key_id="test", aws_secret_access_key="test", region_name="eu-west-1")
+        instrument_session(session, registry)
+        # Registering twice must not double count
+        instrument_session(session, registry)
+        return session.client(service)
+
+    def test_records_calls_per_operation_and_region(self):
+        registry = CallMetrics()
+        sqs = self.make_client(registry)
+        with Stubber(sqs) as stubber:
+            stubber.add_response("list_queues", {"QueueUrls": []})
+            stubber.add_response("list_queues", {"QueueUrls": []})
+            sqs.list_queues()
+            sqs.list_queues()
+
+        snap = registry.snapshot()
+        self.assertEqual(list(snap), [("sqs", "ListQueues", "eu-west-1")])
+        self.assertEqual(snap[("sqs", "ListQueues", "eu-west-1")]["calls"], 2)
+        self.assertEqual(snap[("sqs", "ListQueues", "eu-west-1")]["errors"], 0)
+
+    def test_records_errors(self):
+        registry = CallMetrics()
+        sns = self.make_client(registry, "sns")
+        with Stubber(sns) as stubber:
+            stubber.add_client_error("list_topics", service_error_code="Throttling", http_status_code=400)
+            with self.assertRaises(Exception):
+                sns.list_topics()
+
+        stats = registry.snapshot()[("sns", "ListTopics", "eu-west-1")]
+        self.assertEqual(stats["calls"], 1)
+        self.assertEqual(stats["errors"], 1)
+
+    def test_counts_throttled_attempts_and_retries(self):
+        bodies = [b'{"__type": "ThrottlingException", "message": "Rate exceeded"}', b'{"QueueUrls": []}']
+
+        def send(request):
+            body = bodies.pop(0)
+            return aws_response(request, 400 if b"Throttling" in body else 200, body)
+
+        registry = CallMetrics()
+        session = boto3.Session(aws_access_key_id="test", aws_secret_access_key="test", region_name="eu-west-1")
+        stub_session(send, instrument_session(session, registry))
+        sqs = session.client("sqs", config=Config(retries={"total_max_attempts": 3, "mode": "standard"}))
+        sqs.list_queues()
+
+        stats = registry.snapshot()[("sqs", "ListQueues", "eu-west-1")]
+        self.assertEqual(stats["calls"], 1)
+        self.assertEqual(stats["errors"], 0)
+        self.assertEqual(stats["retries"], 1)
+        self.assertEqual(stats["throttles"], 1)
+
+    def test_prometheus_histogram_is_cumulative(self):
+        registry = CallMetrics()
+        registry.record_call("sqs", "GetQueueAttributes", "us-east-1", 0.003, retries=2)
+        registry.record_call("sqs", "GetQueueAttributes", "us-east-1", 0.2)
+        registry.record_throttle("sqs", "GetQueueAttributes", "us-east-1")
+        text = registry.render_prometheus()
+
+        labels = 'service="sqs",operation="GetQueueAttributes",region="us-east-1"'
+        self.assertIn(f"aws_api_calls_total{{{labels}}} 2", text)
+        self.assertIn(f"aws_api_retries_total{{{labels}}} 2", text)
+        self.assertIn(f"aws_api_throttles_total{{{labels}}} 1", text)
+        self.assertIn(f'aws_api_call_duration_seconds_bucket{{{labels},le="0.005"}} 1', text)
+        self.assertIn(f'aws_api_call_duration_seconds_bucket{{{labels},le="0.25"}} 2', text)
+        self.assertIn(f'aws_api_call_duration_seconds_bucket{{{labels},le="+Inf"}} 2', text)
+
+    def test_metrics_endpoint(self):
+        response = app.test_client().get('/api/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.mimetype.startswith("text/plain"))
+        self.assertIn(b"# TYPE aws_api_calls_total counter", response.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
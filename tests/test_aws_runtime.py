@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+import subprocess
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aws_runtime
+from aws_runtime import SessionCache, cached_client, shared_loader
+from aws_sns_sqs_map import get_session
+
+
+class TestSessionCache(unittest.TestCase):
+    def test_lru_and_ttl(self):
+        cache = SessionCache(maxsize=2, ttl=60)
+        a = cache.get("a", object)
+        self.assertIs(cache.get("a", object), a)
+        cache.get("b", object)
+        cache.get("c", object)
+        self.assertIsNot(cache.get("a", object), a)
+
+        expired = SessionCache(ttl=0)
+        self.assertIsNot(expired.get("a", object), expired.get("a", object))
+
+    def test_key_does_not_hold_secrets(self):
+        key = SessionCache.key(None, "AKIA", "secret", "token")
+        self.assertNotIn("secret", repr(key))
+        self.assertNotEqual(key, SessionCache.key(None, "AKIA", "other", "token"))
+
+
+class TestWarmState(unittest.TestCase):
+    def setUp(self):
+        aws_runtime.SESSIONS.clear()
+
+    def test_sessions_and_clients_are_reused(self):
+        session = get_session(None, "AKIATEST", "secret", None)
+        self.assertIs(get_session(None, "AKIATEST", "secret", None), session)
+        other = get_session(None, "AKIATEST", "rotated", None)
+        self.assertIsNot(other, session)
+
+        client = cached_client(session, "sqs", "eu-west-1")
+        self.assertIs(cached_client(session, "sqs", "eu-west-1"), client)
+        self.assertIsNot(cached_client(session, "sqs", "us-east-1"), client)
+
+    def test_sessions_share_one_loader(self):
+        first = get_session(None, "AKIATEST", "one", None)
+        second = get_session(None, "AKIATEST", "two", None)
+        loader = shared_loader()
+        self.assertIs(first._session.get_component("data_loader"), loader)
+        self.assertIs(second._session.get_component("data_loader"), loader)
+        # boto3 appends its data path on every Session(); it must not accumulate
+        self.assertEqual(len(loader.search_paths), len(set(loader.search_paths)))
+
+
+
+class TestColdStart(unittest.TestCase):
+    def test_app_import_leaves_route_modules_unloaded(self):
+        lazy = ["sql_export", "inventory_index", "inventory_diff", "diagram_export", "export_bundle", "shared_cache",
+                "resilience", "delivery_latency"]
+        code = f"import sys, app; print(' '.join(m for m in {lazy!r} if m in sys.modules))"
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,238 @@
+import unittest
+import sys
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aws_sns_sqs_map
+from aws_sns_sqs_map import build_inventory, discover_regions, list_queue_urls_sharded, to_mermaid
+from aws_stubs import empty_listing, internal_error, is_sns, stub_session
+from benchmarks.fake_aws import REGION_NAMES, FakeAccountSpec, FakeAwsAccount
+from diagram_export import to_canvas, to_drawio
+from resilience import BreakerRegistry, Deadline, guard_session
+
+
+class TestQueueListing(unittest.TestCase):
+    def make_account(self, queues):
+        return FakeAwsAccount(FakeAccountSpec(topics_per_region=1, queues_per_region=queues, subscriptions_per_topic=0))
+
+    def test_paginated_listing_goes_past_first_1000_queues(self):
+        account = self.make_account(2500)
+        inventory = build_inventory(account.session(), account.regions)
+        self.assertEqual(len(inventory[0]["queues"]), 2500)
+
+    def test_sharded_listing_matches_full_listing(self):
+        account = self.make_account(2500)
+        data = account.data["us-east-1"]
+        # Queue named exactly like a dense prefix, a FIFO queue and another first letter
+        for name in ["queue-0", "queue-00001.fifo", "zeta"]:
+            data.add_queue(name)
+        sqs = account.session().client("sqs", region_name="us-east-1")
+
+        urls = list_queue_urls_sharded(sqs, max_workers=4)
+
+        self.assertEqual(len(urls), len(set(urls)))
+        self.assertEqual(sorted(urls), sorted(q["url"] for q in data.queues.values()))
+
+    def test_sharded_listing_single_call_for_small_accounts(self):
+        account = self.make_account(20)
+        sqs = account.session().client("sqs", region_name="us-east-1")
+        self.assertEqual(len(list_queue_urls_sharded(sqs)), 20)
+        self.assertEqual(account.calls[("sqs", "ListQueues")], 1)
+
+    def test_build_inventory_sharded(self):
+        account = self.make_account(1500)
+        inventory = build_inventory(account.session(), account.regions, sharded_queues=True)
+        self.assertEqual(len(inventory[0]["queues"]), 1500)
+
+
+class TestResourceAttributes(unittest.TestCase):
+    def setUp(self):
+        aws_sns_sqs_map._subscription_cache().clear()
+        self.account = FakeAwsAccount(FakeAccountSpec(topics_per_region=10, queues_per_region=12,
+                                                      subscriptions_per_topic=2, dlq_every=4))
+
+    def test_queue_attributes_in_one_call(self):
+        item = build_inventory(self.account.session(), self.account.regions)[0]
+
+        self.assertEqual(self.account.calls[("sqs", "GetQueueAttributes")], 12)
+        attributes = {q["name"]: q["attributes"] for q in item["queues"]}
+        self.assertEqual(attributes["queue-00001"]["VisibilityTimeout"], "30")
+        self.assertEqual(attributes["queue-00001"]["MessageRetentionPeriod"], "345600")
+        self.assertIn("RedrivePolicy", attributes["queue-00001"])
+        self.assertNotIn("RedrivePolicy", attributes["queue-00000"])
+        # Message counters would make every scan differ
+        self.assertFalse(any(k.startswith("Approximate") for a in attributes.values() for k in a))
+
+    def test_dlq_links(self):
+        item = build_inventory(self.account.session(), self.account.regions)[0]
+
+        dlq = {(l["from_arn"].rsplit(":", 1)[-1], l["to_arn"].rsplit(":", 1)[-1]) for l in item["dlq_links"]}
+        self.assertEqual(len(dlq), 9)
+        self.assertIn(("queue-00005", "queue-00004"), dlq)
+        self.assertTrue(all(l["protocol"] == "redrive" and l["attributes"]["maxReceiveCount"] == "5"
+                            for l in item["dlq_links"]))
+
+        self.assertEqual(to_mermaid([item]).count("-.->|DLQ|"), 9)
+        self.assertEqual(to_drawio([item]).count('value="DLQ"'), 9)
+        self.assertEqual(sum(e.get("label") == "DLQ" for e in to_canvas([item])["edges"]), 9)
+
+    def test_subscription_attributes_are_cached(self):
+        item = build_inventory(self.account.session(), self.account.regions)[0]
+
+        self.assertEqual(self.account.calls[("sns", "GetSubscriptionAttributes")], 20)
+        for link in item["links"]:
+            self.assertIn(link["attributes"]["RawMessageDelivery"], ("true", "false"))
+            self.assertNotIn("Endpoint", link["attributes"])
+        self.assertTrue(any("FilterPolicy" in l["attributes"] for l in item["links"]))
+
+        self.account.reset_counters()
+        again = build_inventory(self.account.session(), self.account.regions)[0]
+        self.assertEqual(self.account.calls[("sns", "GetSubscriptionAttributes")], 0)
+        self.assertEqual(again["links"], item["links"])
+
+    def test_subscription_attributes_cache_is_per_credentials(self):
+        build_inventory(self.account.session(), self.account.regions)
+        self.account.reset_counters()
+
+        # Same account and subscription ARNs, other credentials: nothing is served from the first scan
+        other = self.account.session()
+        other.get_credentials = lambda: SimpleNamespace(access_key="AKIAOTHER", secret_key="other", token=None)
+        build_inventory(other, self.account.regions)
+        self.assertEqual(self.account.calls[("sns", "GetSubscriptionAttributes")], 20)
+
+
+class TestRegionDiscovery(unittest.TestCase):
+    def setUp(self):
+        aws_sns_sqs_map._regions_cache().clear()
+        self.account = FakeAwsAccount(FakeAccountSpec(regions=3, topics_per_region=2, queues_per_region=2))
+
+    def test_empty_regions_are_pruned(self):
+        # Queues only: still a region worth scanning
+        self.account.data["us-west-1"].topic_arns.clear()
+
+        regions = discover_regions(self.account.session())
+
+        self.assertEqual(regions, self.account.regions)
+        # One ListTopics and one ListQueues per candidate region
+        self.assertEqual(self.account.calls[("sns", "ListTopics")], len(REGION_NAMES))
+        self.assertEqual(self.account.calls[("sqs", "ListQueues")], len(REGION_NAMES))
+
+    def test_non_empty_regions_are_cached(self):
+        session = self.account.session()
+        regions = discover_regions(session)
+        self.account.reset_counters()
+
+        self.assertEqual(discover_regions(session), regions)
+        self.assertEqual(sum(self.account.calls.values()), 0)
+        self.assertEqual(discover_regions(session, refresh=True), regions)
+        self.assertEqual(self.account.calls[("sns", "ListTopics")], len(REGION_NAMES))
+
+
+class TestHedgedListing(unittest.TestCase):
+    def test_each_page_is_hedged_on_its_own(self):
+        class SlowFirstAttemptSns:
+            """Three pages; the first request of each page is slow, its duplicate is fast."""
+
+            def __init__(self):
+                self.calls = []
+                self.lock = threading.Lock()
+
+            def list_topics(self, NextToken=None):
+                with self.lock:
+                    first = NextToken not in self.calls
+                    self.calls.append(NextToken)
+                if first:
+                    time.sleep(0.3)
+                page = int(NextToken or 0)
+                result = {"Topics": [{"TopicArn": f"arn:aws:sns:us-east-1:123:t{page}"}]}
+                if page < 2:
+                    result["NextToken"] = str(page + 1)
+                return result
+
+        sns = SlowFirstAttemptSns()
+        start = time.monotonic()
+        topics = aws_sns_sqs_map.list_topics(sns, hedge_after=0.05)
+        self.assertEqual([t.name for t in topics], ["t0", "t1", "t2"])
+        self.assertLess(time.monotonic() - start, 0.6)
+        # Two attempts per page, never a restart from the first page
+        self.assertEqual(sorted(sns.calls, key=str), sorted([None, None, "1", "1", "2", "2"], key=str))
+
+
+class TestScanDeadline(unittest.TestCase):
+    def test_degraded_region_does_not_hold_the_scan(self):
+        account = FakeAwsAccount(FakeAccountSpec(regions=2, topics_per_region=3, queues_per_region=3,
+                                                 slow_regions=1, slow_latency_ms=400))
+        start = time.monotonic()
+        inventory = build_inventory(account.session(), account.regions, deadline=0.2)
+        elapsed = time.monotonic() - start
+
+        self.assertLess(elapsed, 0.35)
+        fast, slow = inventory
+        self.assertEqual(fast["status"]["state"], "ok")
+        self.assertEqual(len(fast["queues"]), 3)
+        self.assertEqual(slow["region"], account.regions[1])
+        self.assertEqual(slow["status"]["state"], "timeout")
+        self.assertEqual(slow["queues"], [])
+
+    def test_no_call_is_attempted_after_the_deadline(self):
+        senders = set()
+        lock = threading.Lock()
+
+        def send(request):
+            with lock:
+                senders.add(threading.current_thread())
+            # A degraded endpoint: slow, then a retryable error
+            time.sleep(0.3)
+            return internal_error(request)
+
+        session = guard_session(stub_session(send), BreakerRegistry())
+        start = time.monotonic()
+        item = build_inventory(session, ["eu-west-1"], deadline=0.2)[0]
+        self.assertLess(time.monotonic() - start, 0.35)
+        self.assertEqual(item["status"]["state"], "timeout")
+
+        # The abandoned calls are not retried: their workers end with the attempt in flight
+        for thread in list(senders):
+            thread.join(timeout=1.0)
+            self.assertFalse(thread.is_alive())
+
+    def test_transient_error_is_retried_within_the_deadline(self):
+        failures = {"sqs": 1}
+
+        def send(request):
+            if not is_sns(request) and failures["sqs"]:
+                failures["sqs"] -= 1
+                return internal_error(request)
+            return empty_listing(request)
+
+        session = guard_session(stub_session(send), BreakerRegistry())
+        item = build_inventory(session, ["eu-west-1"], deadline=10)[0]
+        self.assertEqual(item["status"]["state"], "ok")
+        self.assertEqual(failures["sqs"], 0)
+
+    def test_client_budget_follows_the_deadline(self):
+        config = aws_sns_sqs_map._scan_config(Deadline(1.0))
+        self.assertLessEqual(config.connect_timeout, 1.0)
+        self.assertLessEqual(config.read_timeout, 1.0)
+        # Transient errors are still retried while time is left
+        self.assertEqual(config.retries["total_max_attempts"], aws_sns_sqs_map.SCAN_MAX_ATTEMPTS)
+
+        config = aws_sns_sqs_map._scan_config()
+        self.assertEqual(config.read_timeout, aws_sns_sqs_map.SCAN_READ_TIMEOUT)
+        self.assertEqual(config.retries["total_max_attempts"], aws_sns_sqs_map.SCAN_MAX_ATTEMPTS)
+
+    def test_failed_region_status(self):
+        account = FakeAwsAccount(FakeAccountSpec(regions=1, topics_per_region=2, queues_per_region=2,
+                                                 throttle_rate=1.0, max_attempts=1))
+        item = build_inventory(account.session(), account.regions)[0]
+        self.assertEqual(item["status"]["state"], "error")
+        self.assertIn("Rate exceeded", item["status"]["error"])
+
+
+if __name__ == '__main__':
+    unittest.main()
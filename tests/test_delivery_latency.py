@@ -0,0 +1,129 @@
+import unittest
+import sys
+import os
+import json
+import random
+from unittest.mock import patch
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from benchmarks.fake_aws import FakeAccountSpec, FakeAwsAccount
+from delivery_latency import (LATENCIES, DeliveryLatencyStore, LatencyHistogram, ScopedLatencyStores,
+                              parse_sns_envelope)
+
+TOPIC = "arn:aws:sns:us-east-1:123:orders"
+QUEUE = "arn:aws:sqs:us-east-1:123:billing"
+
+
+def sqs_message(message_id, published, sent_ms):
+    envelope = {"Type": "Notification", "MessageId": message_id, "TopicArn": TOPIC, "Message": "{}", "Timestamp": published}
+    return {"MessageId": message_id, "Body": json.dumps(envelope), "Attributes": {"SentTimestamp": str(sent_ms)}}
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles_within_resolution(self):
+        rng = random.Random(1)
+        values = sorted(int(rng.lognormvariate(5, 1.5)) for _ in range(20000))
+        hist = LatencyHistogram()
+        for v in values:
+            hist.record(v)
+        for p in (50, 90, 99):
+            exact = values[int(len(values) * p / 100) - 1]
+            self.assertAlmostEqual(hist.percentile(p), exact, delta=max(2, exact * 0.02))
+        # Bounded: a few hundred buckets for 20k samples spread over 5 decades
+        self.assertLess(len(hist.counts), 1000)
+
+    def test_merge_and_round_trip(self):
+        a, b, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for v in range(0, 5000, 7):
+            (a if v % 2 else b).record(v)
+            both.record(v)
+        merged = LatencyHistogram.from_dict(json.loads(json.dumps(a.to_dict()))).merge(b)
+        self.assertEqual(merged.summary(), both.summary())
+
+
+class TestDeliveryLatencyStore(unittest.TestCase):
+    def test_envelope(self):
+        self.assertIsNone(parse_sns_envelope("plain text"))
+        self.assertIsNone(parse_sns_envelope('{"Type": "SubscriptionConfirmation", "TopicArn": "x"}'))
+        self.assertEqual(parse_sns_envelope(sqs_message("m", "2024-01-01T00:00:00.000Z", 0)["Body"])["TopicArn"], TOPIC)
+
+    def test_messages_are_recorded_once(self):
+        store = DeliveryLatencyStore()
+        # Published at 1704067200000 ms, enqueued 30 ms later, observed 1 s later
+        message = sqs_message("m1", "2024-01-01T00:00:00.000Z", 1704067200030)
+        delivery = store.observe(QUEUE, message, 1704067201000)
+        self.assertEqual(delivery, {"topic_arn": TOPIC, "delays_ms": {"end_to_end": 1000, "sns_to_sqs": 30, "queue_wait": 970}})
+        store.observe(QUEUE, message, 1704067205000)  # re-read by the next poll
+
+        edge = store.snapshot()["edges"][0]
+        self.assertEqual((edge["from_arn"], edge["to_arn"]), (TOPIC, QUEUE))
+        self.assertEqual(edge["sns_to_sqs"]["count"], 1)
+        self.assertEqual(edge["sns_to_sqs"]["p50"], 30)
+        self.assertEqual(store.edge_labels(), {(TOPIC, QUEUE): "p50 1000ms / p99 1000ms"})
+
+        other = DeliveryLatencyStore()
+        other.merge(store.snapshot(buckets=True))
+        other.merge(store.snapshot(buckets=True))
+        self.assertEqual(other.histogram(TOPIC, QUEUE).total, 2)
+
+    def test_merge_keeps_the_edge_bound(self):
+        worker = DeliveryLatencyStore()
+        for i in range(5):
+            worker.observe(f"{QUEUE}-{i}", sqs_message(f"m{i}", "2024-01-01T00:00:00.000Z", 1704067200030), 1704067201000)
+        store = DeliveryLatencyStore(max_edges=3)
+        store.merge(worker.snapshot(buckets=True))
+        self.assertEqual([e["to_arn"] for e in store.snapshot()["edges"]], [f"{QUEUE}-{i}" for i in (2, 3, 4)])
+
+    def test_stores_are_per_scope(self):
+        stores = ScopedLatencyStores(max_scopes=2)
+        stores.store("a").observe(QUEUE, sqs_message("m1", "2024-01-01T00:00:00.000Z", 1704067200030), 1704067201000)
+        self.assertEqual(len(stores.lookup("a").snapshot()["edges"]), 1)
+        self.assertEqual(stores.lookup("b").snapshot()["edges"], [])
+        # Reading an unknown scope keeps nothing; the least recently used scope goes beyond max_scopes
+        stores.store("b")
+        stores.store("c")
+        self.assertEqual(stores.lookup("a").snapshot()["edges"], [])
+
+
+class TestLatencyEndpoints(unittest.TestCase):
+    def setUp(self):
+        LATENCIES.reset()
+        self.app = app.test_client()
+        self.account = FakeAwsAccount(FakeAccountSpec(topics_per_region=1, queues_per_region=2, subscriptions_per_topic=2))
+
+    def test_monitor_feeds_histograms_and_diagram(self):
+        items = [dict(i, region="us-east-1") for i in self.account.items()]
+        with patch("app.get_session", return_value=self.account.session()):
+            events = self.app.post("/api/monitor", json={"items": items}).get_json()
+            self.assertTrue(all("delays_ms" in e for e in events))
+
+            snapshot = self.app.post("/api/latency", json={}).get_json()
+            self.assertEqual(len(snapshot["edges"]), 2)
+            self.assertEqual(snapshot["edges"][0]["end_to_end"]["count"], 1)
+
+            from aws_sns_sqs_map import build_inventory
+            inventory = build_inventory(self.account.session(), self.account.regions)
+            content = self.app.post("/api/export/mermaid?latency=1", json={"inventory": inventory}).get_json()["content"]
+            self.assertEqual(content.count("-->|p50 "), 2)
+        self.assertNotIn("-->|", self.app.post("/api/export/mermaid", json=inventory).get_json()["content"])
+
+    def test_latencies_are_per_credentials(self):
+        items = [dict(i, region="us-east-1") for i in self.account.items()]
+        with patch("app.get_session", return_value=self.account.session()):
+            self.app.post("/api/monitor", json={"items": items})
+
+        other = FakeAwsAccount(FakeAccountSpec(topics_per_region=1, queues_per_region=2, account_id="210987654321"))
+        with patch("app.get_session", return_value=other.session()):
+            self.assertEqual(self.app.post("/api/latency", json={}).get_json()["edges"], [])
+            # Even with the monitored account's ARNs in the posted inventory
+            from aws_sns_sqs_map import build_inventory
+            inventory = build_inventory(self.account.session(), self.account.regions)
+            content = self.app.post("/api/export/mermaid?latency=1", json={"inventory": inventory}).get_json()["content"]
+            self.assertNotIn("p50", content)
+
+
+if __name__ == '__main__':
+    unittest.main()
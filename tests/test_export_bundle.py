@@ -0,0 +1,74 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import io
+import json
+import sqlite3
+import tempfile
+import zipfile
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import export_bundle
+from export_bundle import iter_bundle, parse_formats, write_bundle
+from app import app
+
+INVENTORY = [{
+    "region": "us-east-1",
+    "topics": [{"arn": "arn:aws:sns:us-east-1:123:topic1", "name": "topic1"}],
+    "queues": [{"arn": "arn:aws:sqs:us-east-1:123:queue1", "name": "queue1", "url": "http://queue1"}],
+    "links": [{"from_arn": "arn:aws:sns:us-east-1:123:topic1", "to_arn": "arn:aws:sqs:us-east-1:123:queue1"}]
+}]
+
+
+class TestExportBundle(unittest.TestCase):
+    def test_all_formats(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bundle.zip")
+            write_bundle(INVENTORY, path, list(export_bundle.BUNDLE_FILES))
+            with zipfile.ZipFile(path) as archive:
+                self.assertEqual(sorted(archive.namelist()), sorted(export_bundle.BUNDLE_FILES.values()))
+                self.assertIn("-->", archive.read("inventory.mmd").decode())
+                self.assertIn('value="topic1"', archive.read("inventory.drawio").decode())
+                self.assertEqual(len(json.loads(archive.read("inventory.canvas"))["nodes"]), 2)
+                self.assertEqual(json.loads(archive.read("inventory.json")), INVENTORY)
+                db = os.path.join(tmp, "inventory.sqlite")
+                with open(db, "wb") as f:
+                    f.write(archive.read("inventory.sqlite"))
+                conn = sqlite3.connect(db)
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM subscription").fetchone()[0], 1)
+                conn.close()
+
+    def test_indexes_are_built_once(self):
+        with patch.object(export_bundle, "table_rows", wraps=export_bundle.table_rows) as rows, \
+                patch.object(export_bundle, "inventory_graph", wraps=export_bundle.inventory_graph) as graph:
+            b"".join(iter_bundle(INVENTORY, ["sql", "sql-copy", "sqlite", "drawio", "canvas"]))
+        self.assertEqual((rows.call_count, graph.call_count), (1, 1))
+
+    def test_failed_format_is_reported(self):
+        with patch.object(export_bundle, "to_drawio", side_effect=RuntimeError("boom")):
+            data = b"".join(iter_bundle(INVENTORY, ["mermaid", "drawio"]))
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            self.assertEqual(sorted(archive.namelist()), ["ERRORS.txt", "inventory.mmd"])
+            self.assertIn("drawio: boom", archive.read("ERRORS.txt").decode())
+
+    def test_parse_formats(self):
+        self.assertEqual(parse_formats(None), list(export_bundle.DEFAULT_FORMATS))
+        self.assertEqual(parse_formats("sql, mermaid,sql"), ["sql", "mermaid"])
+        with self.assertRaises(ValueError):
+            parse_formats("pdf")
+
+    def test_endpoint(self):
+        client = app.test_client()
+        response = client.post('/api/export/bundle?formats=mermaid,canvas', json=INVENTORY)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/zip")
+        with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+            self.assertEqual(sorted(archive.namelist()), ["inventory.canvas", "inventory.mmd"])
+        self.assertEqual(client.post('/api/export/bundle?formats=pdf', json=INVENTORY).status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+import sys
+import os
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aws_sns_sqs_map import build_inventory
+from benchmarks.fake_aws import FakeAccountSpec, FakeAwsAccount
+
+
+class TestFakeAws(unittest.TestCase):
+    def test_build_inventory_on_synthetic_account(self):
+        account = FakeAwsAccount(FakeAccountSpec(regions=2, topics_per_region=150, queues_per_region=30, subscriptions_per_topic=3))
+        inventory = build_inventory(account.session(), account.regions)
+
+        self.assertEqual(sorted(i["region"] for i in inventory), sorted(account.regions))
+        for item in inventory:
+            self.assertEqual(item["accountId"], "123456789012")
+            self.assertEqual(len(item["topics"]), 150)  # two list_topics pages
+            self.assertEqual(len(item["queues"]), 30)
+            self.assertEqual(len(item["links"]), 150 * 3)
+
+    def test_throttled_calls_are_retried(self):
+        account = FakeAwsAccount(FakeAccountSpec(topics_per_region=5, queues_per_region=5, throttle_rate=0.3,
+                                                 max_attempts=50, retry_base_ms=0))
+        inventory = build_inventory(account.session(), account.regions)
+
+        self.assertEqual(len(inventory[0]["queues"]), 5)
+        self.assertGreater(sum(account.throttles.values()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+import copy
+import json
+import tempfile
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory_diff import diff_files, diff_inventories, diff_to_mermaid, latest_snapshots, save_snapshot
+from app import app
+
+OLD = [{
+    "region": "us-east-1",
+    "topics": [
+        {"arn": "arn:aws:sns:us-east-1:123:orders", "name": "orders"},
+        {"arn": "arn:aws:sns:us-east-1:123:legacy", "name": "legacy"},
+    ],
+    "queues": [
+        {"arn": "arn:aws:sqs:us-east-1:123:billing", "name": "billing", "url": "http://billing"},
+        {"arn": "arn:aws:sqs:us-east-1:123:audit", "name": "audit", "url": "http://audit"},
+    ],
+    "links": [
+        {"from_arn": "arn:aws:sns:us-east-1:123:orders", "to_arn": "arn:aws:sqs:us-east-1:123:billing", "protocol": "sqs",
+         "attributes": {"subscriptionArn": "arn:aws:sns:us-east-1:123:orders:1"}},
+    ],
+}]
+
+
+def new_inventory():
+    new = copy.deepcopy(OLD)
+    region = new[0]
+    region["topics"] = [t for t in region["topics"] if t["name"] != "legacy"]
+    region["topics"].append({"arn": "arn:aws:sns:us-east-1:123:payments", "name": "payments"})
+    region["queues"][1]["url"] = "http://audit-v2"
+    region["links"].append({"from_arn": "arn:aws:sns:us-east-1:123:payments", "to_arn": "arn:aws:sqs:us-east-1:123:audit",
+                            "protocol": "sqs", "attributes": {"subscriptionArn": "arn:aws:sns:us-east-1:123:payments:1"}})
+    return new
+
+
+class TestInventoryDiff(unittest.TestCase):
+    def test_change_set(self):
+        changes = diff_inventories(OLD, new_inventory())
+        self.assertEqual(changes["summary"], {
+            "added": {"topics": 1, "queues": 0, "subscriptions": 1},
+            "removed": {"topics": 1, "queues": 0, "subscriptions": 0},
+            "changed": {"topics": 0, "queues": 1, "subscriptions": 0},
+        })
+        self.assertEqual(changes["added"]["topics"][0]["name"], "payments")
+        self.assertEqual(changes["removed"]["topics"][0]["name"], "legacy")
+        change = changes["changed"]["queues"][0]
+        self.assertEqual((change["old"]["url"], change["new"]["url"]), ("http://audit", "http://audit-v2"))
+        self.assertEqual(diff_inventories(OLD, copy.deepcopy(OLD))["summary"]["changed"]["queues"], 0)
+
+    def test_streaming_matches_in_memory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            old_path = os.path.join(tmp, "old.json")
+            new_path = os.path.join(tmp, "new.json")
+            with open(old_path, "w") as f:
+                json.dump(OLD * 3, f, indent=2)
+            with open(new_path, "w") as f:
+                json.dump(new_inventory(), f)
+            self.assertEqual(diff_files(old_path, new_path, stream=True), diff_files(old_path, new_path))
+
+    def test_incomplete_regions_are_not_diffed(self):
+        timed_out = [{"region": "us-east-1", "topics": [], "queues": [], "links": [],
+                      "status": {"state": "timeout", "error": "scan deadline exceeded"}}]
+        for old, new in ((OLD, timed_out), (timed_out, OLD)):
+            self.assertEqual(sum(sum(kinds.values()) for kinds in diff_inventories(old, new)["summary"].values()), 0)
+            with tempfile.TemporaryDirectory() as tmp:
+                paths = [os.path.join(tmp, "old.json"), os.path.join(tmp, "new.json")]
+                for path, inventory in zip(paths, (old, new)):
+                    with open(path, "w") as f:
+                        json.dump(inventory, f)
+                self.assertEqual(diff_files(*paths, stream=True), diff_inventories(old, new))
+
+    def test_snapshots(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = save_snapshot(OLD, tmp)
+            self.assertEqual(latest_snapshots(tmp), [path])
+            with open(path) as f:
+                self.assertEqual(json.load(f), OLD)
+
+    def test_mermaid(self):
+        content = diff_to_mermaid(diff_inventories(OLD, new_inventory()))
+        self.assertIn("[Topic: payments]:::added", content)
+        self.assertIn("[Topic: legacy]:::removed", content)
+        self.assertIn("(Queue: audit):::changed", content)
+        self.assertIn("-- added -->", content)
+
+    def test_endpoint(self):
+        client = app.test_client()
+        response = client.post('/api/diff', json={"old": OLD, "new": new_inventory()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)["summary"]["added"]["topics"], 1)
+
+        response = client.post('/api/diff', json={"old": OLD, "new": new_inventory(), "format": "mermaid"})
+        self.assertIn("classDef added", json.loads(response.data)["content"])
+
+        self.assertEqual(client.post('/api/diff', json={"old": OLD}).status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import json
+import tempfile
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from inventory_index import InventoryIndex
+
+INVENTORY = [
+    {
+        "region": "us-east-1",
+        "accountId": "123",
+        "topics": [{"arn": f"arn:aws:sns:us-east-1:123:orders-{i}", "name": f"orders-{i}"} for i in range(3)],
+        "queues": [
+            {"arn": "arn:aws:sqs:us-east-1:123:billing-events", "name": "billing-events", "url": "http://billing-events"},
+            {"arn": "arn:aws:sqs:us-east-1:123:orders-events-dlq", "name": "orders-events-dlq", "url": "http://orders-events-dlq"},
+            {"arn": "arn:aws:sqs:us-east-1:123:orders-events", "name": "orders-events", "url": "http://orders-events"},
+        ],
+        "links": [
+            {"from_arn": "arn:aws:sns:us-east-1:123:orders-0", "to_arn": "arn:aws:sqs:us-east-1:123:orders-events"},
+            {"from_arn": "arn:aws:sns:us-east-1:123:orders-1", "to_arn": "arn:aws:sqs:us-east-1:123:orders-events"},
+        ],
+    },
+    {
+        "region": "eu-west-1",
+        "accountId": "123",
+        "topics": [{"arn": "arn:aws:sns:eu-west-1:123:orders-eu", "name": "orders-eu"}],
+        "queues": [],
+        "links": [],
+    },
+]
+
+
+class TestInventoryIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = InventoryIndex(os.path.join(self.tmp.name, "index.sqlite"), max_scans=2)
+        self.scan_id = self.index.add(INVENTORY)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def names(self, page):
+        return [item["name"] for item in page["items"]]
+
+    def test_summary(self):
+        summary = self.index.summary(self.scan_id)
+        self.assertEqual(summary["regions"], ["eu-west-1", "us-east-1"])
+        self.assertEqual((summary["topics"], summary["queues"], summary["links"], summary["orphan_queues"]), (4, 3, 2, 2))
+
+    def test_filters_sort_and_pagination(self):
+        page = self.index.query(self.scan_id, "topics", region="us-east-1", sort="name", order="desc", limit=2, offset=0)
+        self.assertEqual(page["total"], 3)
+        self.assertEqual(self.names(page), ["orders-2", "orders-1"])
+        page = self.index.query(self.scan_id, "topics", region="us-east-1", sort="name", order="desc", limit=2, offset=2)
+        self.assertEqual(self.names(page), ["orders-0"])
+
+        self.assertEqual(self.names(self.index.query(self.scan_id, "queues", prefix="orders-")), ["orders-events", "orders-events-dlq"])
+        self.assertEqual(self.names(self.index.query(self.scan_id, "queues", orphans=True)), ["billing-events", "orders-events-dlq"])
+
+        top = self.index.query(self.scan_id, "queues", sort="subscriptions", order="desc", limit=1)["items"][0]
+        self.assertEqual((top["name"], top["subscriptions"]), ("orders-events", 2))
+
+        with self.assertRaises(ValueError):
+            self.index.query(self.scan_id, "queues", sort="name; DROP TABLE queues")
+
+    def test_name_search(self):
+        self.assertEqual(self.names(self.index.query(self.scan_id, "queues", search="events-d")), ["orders-events-dlq"])
+        # Short searches (below trigram size) still work
+        self.assertEqual(self.names(self.index.query(self.scan_id, "topics", search="eu")), ["orders-eu"])
+
+    def test_old_scans_are_pruned(self):
+        second = self.index.add(INVENTORY)
+        third = self.index.add(INVENTORY)
+        self.assertIsNone(self.index.summary(self.scan_id))
+        self.assertIsNone(self.index.inventory(self.scan_id))
+        self.assertIsNotNone(self.index.summary(second))
+        self.assertEqual(self.index.query(third, "topics")["total"], 4)
+
+    def test_endpoints(self):
+        with patch.object(app_module, "_inventory_index", self.index):
+            client = app_module.app.test_client()
+            summary = json.loads(client.post('/api/inventory', json=INVENTORY).data)
+            scan_id = summary["scan_id"]
+
+            response = client.get(f'/api/inventory/{scan_id}/queues?orphans=1&limit=1')
+            page = json.loads(response.data)
+            self.assertEqual((page["total"], len(page["items"])), (2, 1))
+
+            links = json.loads(client.get(f'/api/inventory/{scan_id}/links?queue_arn=arn:aws:sqs:us-east-1:123:orders-events').data)
+            self.assertEqual(links["total"], 2)
+
+            # The whole inventory stays available for exports
+            self.assertEqual(json.loads(client.get(f'/api/inventory/{scan_id}/raw').data), INVENTORY)
+
+            self.assertEqual(client.get('/api/inventory/unknown/topics').status_code, 404)
+            self.assertEqual(client.get('/api/inventory/unknown/raw').status_code, 404)
+            self.assertEqual(client.get(f'/api/inventory/{scan_id}/topics?sort=bogus').status_code, 400)
+
+    def test_indexed_scan(self):
+        from benchmarks.fake_aws import FakeAccountSpec, FakeAwsAccount
+
+        account = FakeAwsAccount(FakeAccountSpec(topics_per_region=5, queues_per_region=7, subscriptions_per_topic=1))
+        with patch.object(app_module, "_inventory_index", self.index), \
+                patch.object(app_module, "get_session", return_value=account.session()):
+            client = app_module.app.test_client()
+            summary = json.loads(client.post('/api/scan', json={"regions": "us-east-1", "index": True}).data)
+            self.assertEqual((summary["topics"], summary["queues"], summary["links"]), (5, 7, 5))
+
+            page = json.loads(client.get(f'/api/inventory/{summary["scan_id"]}/queues?limit=3').data)
+            self.assertEqual((page["total"], len(page["items"])), (7, 3))
+            inventory = json.loads(client.get(f'/api/inventory/{summary["scan_id"]}/raw').data)
+            self.assertEqual(len(inventory[0]["queues"]), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+import io
+import json
+import time
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory_watch import InventoryWatcher, ndjson_writer
+from benchmarks.fake_aws import FakeAccountSpec, FakeAwsAccount
+
+
+class TestInventoryWatcher(unittest.TestCase):
+    def setUp(self):
+        self.account = FakeAwsAccount(FakeAccountSpec(regions=2, topics_per_region=3, queues_per_region=5, subscriptions_per_topic=1))
+        self.session = self.account.session()
+        self.created = []
+        client = self.session.client
+        self.session.client = lambda service, **kwargs: self.created.append(service) or client(service, **kwargs)
+        self.events = []
+
+    def test_baseline_then_changes_only(self):
+        watcher = InventoryWatcher(self.session, ["us-east-1"], 60, self.events.append)
+        watcher.scan_region("us-east-1")
+        self.assertEqual([e["event"] for e in self.events], ["baseline"])
+        self.assertEqual(self.events[0]["counts"], {"topics": 3, "queues": 5, "subscriptions": 3})
+
+        watcher.scan_region("us-east-1")
+        self.assertEqual(len(self.events), 1)
+
+        self.account.data["us-east-1"].add_queue("new-queue")
+        watcher.scan_region("us-east-1")
+        self.assertEqual(len(self.events), 2)
+        event = self.events[1]
+        self.assertEqual((event["event"], event["kind"], event["resource"]["name"]), ("added", "queues", "new-queue"))
+        # Clients are created once per region and kept warm
+        self.assertEqual(sorted(self.created), ["sns", "sqs"])
+
+    def test_unreadable_queue_is_not_reported_removed(self):
+        watcher = InventoryWatcher(self.session, ["us-east-1"], 60, self.events.append)
+        watcher.scan_region("us-east-1")
+        sqs = watcher._clients["us-east-1"][1]
+        get_queue_attributes = sqs.get_queue_attributes
+        failing = next(iter(self.account.data["us-east-1"].queues.values()))["url"]
+
+        def flaky(QueueUrl, **kwargs):
+            if QueueUrl == failing:
+                raise RuntimeError("transient")
+            return get_queue_attributes(QueueUrl=QueueUrl, **kwargs)
+
+        sqs.get_queue_attributes = flaky
+        watcher.scan_region("us-east-1")
+        sqs.get_queue_attributes = get_queue_attributes
+        watcher.scan_region("us-east-1")
+        self.assertEqual([e["event"] for e in self.events], ["baseline"])
+
+    def test_regions_are_spread_over_the_interval(self):
+        scanned = []
+        watcher = InventoryWatcher(self.session, ["us-east-1", "us-east-2"], 0.2, self.events.append)
+        watcher.scan_region = lambda region: scanned.append((region, time.monotonic()))
+        watcher.run(max_scans=3)
+        self.assertEqual([r for r, _ in scanned], ["us-east-1", "us-east-2", "us-east-1"])
+        start = scanned[0][1]
+        self.assertGreaterEqual(scanned[1][1] - start, 0.09)
+        self.assertGreaterEqual(scanned[2][1] - start, 0.19)
+
+    def test_ndjson_output(self):
+        stream = io.StringIO()
+        emit = ndjson_writer(stream)
+        emit({"event": "baseline", "region": "us-east-1"})
+        emit({"event": "error", "region": "us-east-2"})
+        lines = stream.getvalue().splitlines()
+        self.assertEqual([json.loads(l)["event"] for l in lines], ["baseline", "error"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import gzip
+import json
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json_response
+from json_response import dumps
+from app import app
+
+
+def make_inventory(count):
+    return [{
+        "region": "us-east-1",
+        "topics": [{"arn": f"arn:aws:sns:us-east-1:123:topic{i}", "name": f"topic{i}"} for i in range(count)],
+        "queues": [],
+        "links": []
+    }]
+
+
+class TestJsonResponse(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+
+    def test_dumps_compact_and_pretty(self):
+        self.assertEqual(json.loads(dumps({"a": [1, "é"]})), {"a": [1, "é"]})
+        self.assertNotIn(b" ", dumps({"a": [1, 2]}))
+        self.assertIn(b"\n  ", dumps({"a": [1, 2]}, pretty=True))
+
+    def test_large_payload_is_gzipped(self):
+        inventory = make_inventory(200)
+        # Force gzip even if brotli happens to be installed
+        with patch.object(json_response, "brotli", None):
+            response = self.app.post('/api/export/mermaid', json=inventory, headers={"Accept-Encoding": "gzip, deflate"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.headers["Vary"], "Accept-Encoding")
+        data = json.loads(gzip.decompress(response.data))
+        self.assertIn("topic199", data["content"])
+
+    def test_small_or_unaccepted_payload_is_not_compressed(self):
+        small = self.app.post('/api/export/mermaid', json=make_inventory(1), headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", small.headers)
+        self.assertIn("topic0", json.loads(small.data)["content"])
+
+        identity = self.app.post('/api/export/mermaid', json=make_inventory(200))
+        self.assertNotIn("Content-Encoding", identity.headers)
+        self.assertIn("topic199", json.loads(identity.data)["content"])
+
+
+if __name__ == '__main__':
+    unittest.main()
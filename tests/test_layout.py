@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+import json
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from layout import layered_layout
+from app import app
+
+NODES = [("t1", 160, 60), ("t2", 160, 60), ("q1", 120, 60), ("q2", 120, 60), ("q3", 120, 60)]
+EDGES = [("t1", "q3"), ("t2", "q1"), ("t1", "q2"), ("t2", "q3")]
+
+
+def crossings(positions, edges):
+    count = 0
+    for i, (a, b) in enumerate(edges):
+        for c, d in edges[i + 1:]:
+            if len({a, b, c, d}) == 4 and (positions[a][0] - positions[c][0]) * (positions[b][0] - positions[d][0]) < 0:
+                count += 1
+    return count
+
+
+class TestLayeredLayout(unittest.TestCase):
+    def test_layers_and_crossing_reduction(self):
+        positions = layered_layout(NODES, EDGES, origin=(40, 40))
+        self.assertEqual({positions[t][1] for t in ("t1", "t2")}, {40})
+        self.assertTrue(all(positions[q][1] > 40 for q in ("q1", "q2", "q3")))
+        self.assertEqual(crossings(positions, EDGES), 0)
+        # No overlap within a layer
+        xs = sorted(positions[q][0] for q in ("q1", "q2", "q3"))
+        self.assertTrue(all(b - a >= 120 for a, b in zip(xs, xs[1:])))
+
+    def test_left_to_right(self):
+        positions = layered_layout(NODES, EDGES, direction="LR")
+        self.assertTrue(all(positions[q][0] > positions["t1"][0] for q in ("q1", "q2", "q3")))
+        with self.assertRaises(ValueError):
+            layered_layout(NODES, EDGES, direction="RL")
+
+    def test_components_are_packed_in_a_grid(self):
+        nodes = [(f"q{i}", 100, 50) for i in range(100)]
+        positions = layered_layout(nodes, [])
+        self.assertGreater(len({y for _, y in positions.values()}), 3)
+        self.assertGreater(len({x for x, _ in positions.values()}), 3)
+
+    def test_cycles_do_not_hang(self):
+        positions = layered_layout([("a", 10, 10), ("b", 10, 10), ("c", 10, 10)], [("a", "b"), ("b", "c"), ("c", "a")])
+        self.assertEqual(len(positions), 3)
+
+    def test_canvas_export(self):
+        inventory = [{
+            "region": "us-east-1",
+            "topics": [{"arn": "arn:aws:sns:us-east-1:123:topic1", "name": "topic1"}],
+            "queues": [{"arn": "arn:aws:sqs:us-east-1:123:queue1", "name": "queue1", "url": "http://queue1"}],
+            "links": [{"from_arn": "arn:aws:sns:us-east-1:123:topic1", "to_arn": "arn:aws:sqs:us-east-1:123:queue1"}]
+        }]
+        data = json.loads(app.test_client().post('/api/export/canvas', json=inventory).data)
+        topic, queue = data["nodes"]
+        self.assertLess(topic["x"], queue["x"])
+        self.assertEqual(data["edges"][0]["fromNode"], topic["id"])
+
+
+if __name__ == '__main__':
+    unittest.main()
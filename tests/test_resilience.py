@@ -0,0 +1,152 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from botocore.config import Config
+
+from aws_stubs import INTERNAL_ERROR, FakeClock, aws_response, empty_listing, internal_error, stub_session
+from resilience import (BreakerRegistry, CircuitBreaker, CircuitOpenError, Deadline, DeadlineExceeded, bind_deadline,
+                        guard_session, hedged)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_then_half_opens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+
+        clock.now = 10
+        self.assertTrue(breaker.allow())  # single trial call
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+
+        clock.now = 20
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        self.assertTrue(breaker.allow())
+
+    def test_deadline(self):
+        clock = FakeClock()
+        deadline = Deadline(5, clock=clock)
+        deadline.check()
+        clock.now = 5
+        self.assertEqual(deadline.remaining(), 0)
+        self.assertRaises(DeadlineExceeded, deadline.check)
+        self.assertIsNone(Deadline(None).remaining())
+
+
+class TestHedged(unittest.TestCase):
+    def test_second_attempt_wins(self):
+        calls = []
+        lock = threading.Lock()
+
+        def call():
+            with lock:
+                calls.append(1)
+                first = len(calls) == 1
+            time.sleep(1.0 if first else 0.01)
+            return "slow" if first else "fast"
+
+        start = time.monotonic()
+        self.assertEqual(hedged(call, 0.05), "fast")
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(len(calls), 2)
+
+    def test_fast_call_is_not_hedged(self):
+        calls = []
+        self.assertEqual(hedged(lambda: calls.append(1) or "ok", 1.0), "ok")
+        self.assertEqual(hedged(lambda: calls.append(1) or "ok", None), "ok")
+        self.assertEqual(len(calls), 2)
+
+
+class TestGuardSession(unittest.TestCase):
+    def make_client(self, status):
+        sent = []
+
+        def send(request):
+            sent.append(request.url)
+            return aws_response(request, status, INTERNAL_ERROR)
+
+        breakers = BreakerRegistry(failure_threshold=3, reset_timeout=60)
+        session = guard_session(stub_session(send), breakers)
+        client = session.client("sqs", region_name="eu-west-1", config=Config(retries={"total_max_attempts": 1}))
+        return client, sent, breakers
+
+    def test_failing_region_fails_fast(self):
+        client, sent, breakers = self.make_client(500)
+        for _ in range(3):
+            with self.assertRaises(Exception) as ctx:
+                client.list_queues()
+            self.assertNotIsInstance(ctx.exception, CircuitOpenError)
+        with self.assertRaises(CircuitOpenError):
+            client.list_queues()
+        self.assertEqual(len(sent), 3)
+        self.assertEqual(breakers.states(), {("sqs", "eu-west-1"): "open"})
+
+    def test_client_errors_do_not_open(self):
+        client, sent, breakers = self.make_client(400)
+        for _ in range(5):
+            with self.assertRaises(Exception) as ctx:
+                client.list_queues()
+            self.assertNotIsInstance(ctx.exception, CircuitOpenError)
+        self.assertEqual(breakers.states(), {("sqs", "eu-west-1"): "closed"})
+
+    def test_trial_aborted_by_deadline_frees_the_breaker(self):
+        clock = FakeClock()
+        sent = []
+
+        def send(request):
+            sent.append(request.url)
+            return internal_error(request)
+
+        breakers = BreakerRegistry(failure_threshold=1, reset_timeout=10, clock=clock)
+        session = guard_session(stub_session(send), breakers)
+        config = Config(retries={"total_max_attempts": 1})
+        client = session.client("sqs", region_name="eu-west-1", config=config)
+        with self.assertRaises(Exception):
+            client.list_queues()
+        self.assertEqual(breakers.states(), {("sqs", "eu-west-1"): "open"})
+
+        # The half-open trial is aborted by an expired scan deadline before reaching the endpoint
+        clock.now = 10
+        bounded = bind_deadline(session.client("sqs", region_name="eu-west-1", config=config), Deadline(0))
+        with self.assertRaises(DeadlineExceeded):
+            bounded.list_queues()
+        self.assertEqual(len(sent), 1)
+
+        # Neither a failure nor a success: the next call is the trial
+        with self.assertRaises(Exception) as ctx:
+            client.list_queues()
+        self.assertNotIsInstance(ctx.exception, CircuitOpenError)
+        self.assertEqual(len(sent), 2)
+
+    def test_breakers_are_per_credentials(self):
+        from aws_sns_sqs_map import get_session
+
+        config = Config(retries={"total_max_attempts": 1})
+        failing = stub_session(internal_error, get_session(None, "AKIAFAILING", "x", None))
+        healthy = stub_session(empty_listing, get_session(None, "AKIAHEALTHY", "x", None))
+        failing_sqs = failing.client("sqs", region_name="eu-west-1", config=config)
+        healthy_sqs = healthy.client("sqs", region_name="eu-west-1", config=config)
+
+        for _ in range(3):
+            with self.assertRaises(Exception):
+                failing_sqs.list_queues()
+        with self.assertRaises(CircuitOpenError):
+            failing_sqs.list_queues()
+        self.assertEqual(healthy_sqs.list_queues().get("QueueUrls", []), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+import json
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aws_sns_sqs_map import build_inventory, fetch_region_inventory, region_clients
+from aws_stubs import empty_listing, stub_session
+from scan_trace import ScanTracer
+from app import app
+
+
+def make_session():
+    mock_session = MagicMock()
+    mock_client = MagicMock()
+    mock_session.client.return_value = mock_client
+    mock_paginator = MagicMock()
+    mock_client.get_paginator.return_value = mock_paginator
+    mock_paginator.paginate.return_value = [{
+        "Topics": [{"TopicArn": "arn:aws:sns:us-east-1:123:topic1"}],
+        "QueueUrls": ["https://sqs.us-east-1.amazonaws.com/123/queue1"],
+        "Subscriptions": [],
+    }]
+    mock_client.get_queue_attributes.return_value = {"Attributes": {"QueueArn": "arn:aws:sqs:us-east-1:123:queue1"}}
+    return mock_session
+
+
+def aws_call_names(tracer):
+    return sorted(e["name"] for e in tracer.to_chrome_trace()["traceEvents"] if e.get("cat") == "aws-call")
+
+
+class TestScanTrace(unittest.TestCase):
+    def test_span_records_complete_event(self):
+        tracer = ScanTracer()
+        with tracer.span("outer", region="eu-west-1"):
+            with tracer.span("inner"):
+                pass
+        events = [e for e in tracer.to_chrome_trace()["traceEvents"] if e["ph"] == "X"]
+        self.assertEqual([e["name"] for e in events], ["outer", "inner"])
+        outer, inner = events
+        self.assertEqual(outer["args"], {"region": "eu-west-1"})
+        self.assertLessEqual(outer["ts"], inner["ts"])
+        self.assertGreaterEqual(outer["ts"] + outer["dur"], inner["ts"] + inner["dur"])
+
+    def test_build_inventory_records_stages(self):
+        tracer = ScanTracer()
+        inventory = build_inventory(make_session(), ["us-east-1"], tracer=tracer)
+        self.assertEqual(len(inventory[0]["topics"]), 1)
+
+        names = {e["name"] for e in tracer.to_chrome_trace()["traceEvents"] if e["ph"] == "X"}
+        for stage in ["build_inventory", "region", "topics", "queues", "links",
+                      "get_queue_attributes fan-out", "list_subscriptions_by_topic"]:
+            self.assertIn(stage, names)
+
+    def test_consecutive_traces_on_shared_clients(self):
+        session = stub_session(empty_listing)
+        clients = region_clients(session, "eu-west-1")
+        tracers = [ScanTracer() for _ in range(3)]
+        for tracer in tracers:
+            fetch_region_inventory(session, "eu-west-1", tracer, clients=clients)
+        # Every scan gets its own spans, and finished tracers stop recording
+        for tracer in tracers:
+            self.assertEqual(aws_call_names(tracer), ["sns.ListTopics", "sqs.ListQueues"])
+
+    def test_traced_scan_does_not_instrument_cached_clients(self):
+        session = stub_session(empty_listing)
+        sns, sqs = region_clients(session, "eu-west-1")
+        tracer = ScanTracer()
+        build_inventory(session, ["eu-west-1"], tracer=tracer)
+        self.assertEqual(aws_call_names(tracer), ["sns.ListTopics", "sqs.ListQueues"])
+        sqs.list_queues()
+        self.assertEqual(aws_call_names(tracer), ["sns.ListTopics", "sqs.ListQueues"])
+
+    @patch('app.get_session')
+    def test_scan_with_trace_option(self, mock_get_session):
+        mock_get_session.return_value = make_session()
+        response = app.test_client().post('/api/scan', json={"regions": "us-east-1", "trace": True})
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertIsInstance(data["inventory"], list)
+        self.assertIn("traceEvents", data["trace"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,215 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from aws_stubs import FakeClock
+from benchmarks.fake_aws import FakeAccountSpec, FakeAwsAccount
+import shared_cache
+from shared_cache import CacheBackend, ComputeError, MemoryCache, SQLiteCache, get_cache
+
+
+def run_concurrently(fn, count):
+    """fn(i) on `count` threads at once; results in completion order."""
+    results = []
+    threads = [threading.Thread(target=lambda i=i: results.append(fn(i))) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+class TestMemoryCache(unittest.TestCase):
+    def test_lru_and_ttl(self):
+        clock = FakeClock()
+        cache = MemoryCache(maxsize=2, clock=clock)
+        cache.set("a", 1, ttl=10)
+        cache.set("b", 2, ttl=10)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3, ttl=10)
+        self.assertIsNone(cache.get("b"))
+        clock.now = 10
+        self.assertIsNone(cache.get("a"))
+
+    def test_single_flight(self):
+        cache = MemoryCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"value": 42}
+
+        results = run_concurrently(lambda i: cache.get_or_compute("k", compute, ttl=60), 8)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"value": 42}] * 8)
+
+    def test_failures_and_none_are_not_cached(self):
+        cache = MemoryCache()
+        with self.assertRaises(RuntimeError):
+            cache.get_or_compute("k", lambda: (_ for _ in ()).throw(RuntimeError("boom")), ttl=60)
+        self.assertIsNone(cache.get_or_compute("k", lambda: None, ttl=60))
+        self.assertEqual(cache.get_or_compute("k", lambda: [1], ttl=60, should_cache=lambda v: False), [1])
+        self.assertEqual(cache.get("k", "missing"), "missing")
+
+    def test_backend_is_abstract(self):
+        self.assertRaises(TypeError, CacheBackend)
+
+
+class TestSQLiteCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_values_are_shared(self):
+        a, b = SQLiteCache(self.path), SQLiteCache(self.path)
+        a.set("k", {"urls": ["https://q"]}, ttl=60)
+        self.assertEqual(b.get("k"), {"urls": ["https://q"]})
+        b.delete("k")
+        self.assertIsNone(a.get("k"))
+
+    def test_single_flight_across_instances(self):
+        # Two instances stand for two worker processes: distinct lease owners, same file
+        workers = [SQLiteCache(self.path, poll_interval=0.01) for _ in range(2)]
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "scanned"
+
+        results = run_concurrently(lambda i: workers[i % 2].get_or_compute("k", compute, ttl=60), 6)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["scanned"] * 6)
+
+    def test_expired_lease_is_taken_over(self):
+        crashed = SQLiteCache(self.path, lease_timeout=0.05)
+        self.assertTrue(crashed._acquire("k", "crashed"))
+        other = SQLiteCache(self.path, poll_interval=0.01)
+        self.assertFalse(other._acquire("k", "other"))
+        self.assertEqual(other.get_or_compute("k", lambda: 1, ttl=60), 1)
+
+    def test_waiters_share_an_uncached_outcome(self):
+        workers = [SQLiteCache(self.path, poll_interval=0.01) for _ in range(3)]
+        calls = []
+
+        def incomplete_scan():
+            calls.append(1)
+            time.sleep(0.2)
+            return ["partial"]
+
+        results = run_concurrently(lambda i: workers[i].get_or_compute("k", incomplete_scan, ttl=60,
+                                                                        should_cache=lambda v: False), 3)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [["partial"]] * 3)
+
+    def test_waiters_share_the_leader_error(self):
+        workers = [SQLiteCache(self.path, poll_interval=0.01) for _ in range(3)]
+        calls = []
+
+        def failing():
+            calls.append(1)
+            time.sleep(0.2)
+            raise RuntimeError("throttled")
+
+        def call(i):
+            try:
+                return workers[i].get_or_compute("k", failing, ttl=60)
+            except Exception as e:
+                return type(e).__name__, str(e)
+
+        results = run_concurrently(call, 3)
+        self.assertEqual(len(calls), 1)
+        self.assertIn(("RuntimeError", "throttled"), results)
+        self.assertEqual(results.count(("ComputeError", "RuntimeError: throttled")), 2)
+
+    def test_lease_is_renewed_during_long_computations(self):
+        workers = [SQLiteCache(self.path, lease_timeout=0.1, poll_interval=0.01) for _ in range(2)]
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.5)
+            return "done"
+
+        results = run_concurrently(lambda i: workers[i].get_or_compute("k", slow, ttl=60), 2)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["done"] * 2)
+
+    def test_expired_rows_are_purged_every_purge_every_writes(self):
+        cache = SQLiteCache(self.path)
+        cache.set("stale", 1, ttl=-1)
+        run_concurrently(lambda i: [cache.set(f"k{i}-{j}", j, ttl=60) for j in range(20)], 8)
+        rows = cache._conn().execute("SELECT COUNT(*) FROM cache WHERE key = 'stale'").fetchone()[0]
+        self.assertEqual(rows, 1)
+        for j in range(shared_cache.PURGE_EVERY - 161):
+            cache.set(f"last-{j}", j, ttl=60)
+        rows = cache._conn().execute("SELECT COUNT(*) FROM cache WHERE key = 'stale'").fetchone()[0]
+        self.assertEqual(rows, 0)
+
+
+class TestAppCaching(unittest.TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.app = app.test_client()
+        self.account = FakeAwsAccount(FakeAccountSpec(topics_per_region=2, queues_per_region=2))
+        self.body = {"items": self.account.items(), "access_key": "AKIACACHE", "secret_key": "x"}
+
+    def tearDown(self):
+        get_cache().clear()
+
+    def post(self, path):
+        with patch("app.get_session", return_value=self.account.session()):
+            response = self.app.post(path, json=self.body)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_stats_are_cached(self):
+        first = self.post("/api/stats")
+        calls = sum(self.account.calls.values())
+        self.assertEqual(self.post("/api/stats"), first)
+        self.assertEqual(sum(self.account.calls.values()), calls)
+
+    def test_queue_urls_are_resolved_once(self):
+        self.post("/api/monitor")
+        self.post("/api/monitor")
+        self.assertEqual(self.account.calls[("sqs", "GetQueueUrl")], 2)
+        self.assertEqual(self.account.calls[("sqs", "ReceiveMessage")], 4)
+
+    def test_entries_are_scoped_to_the_resolved_credentials(self):
+        # Same queue names and no credentials in the body (e.g. two profiles or instance roles)
+        other = FakeAwsAccount(FakeAccountSpec(topics_per_region=2, queues_per_region=2, account_id="210987654321"))
+        self.body = {"items": self.account.items()}
+        self.post("/api/stats")
+        self.post("/api/monitor")
+        self.account = other
+        self.body = {"items": other.items()}
+        self.post("/api/stats")
+        self.post("/api/monitor")
+        self.assertEqual(other.calls[("sqs", "GetQueueUrl")], 2)
+        self.assertGreater(other.calls[("cloudwatch", "GetMetricStatistics")], 0)
+
+    def test_identical_scans_share_one_result(self):
+        self.body = {"regions": "us-east-1", "access_key": "AKIACACHE", "secret_key": "x"}
+        first = self.post("/api/scan")
+        calls = sum(self.account.calls.values())
+        self.assertEqual(self.post("/api/scan"), first)
+        self.assertEqual(sum(self.account.calls.values()), calls)
+        self.body["refresh"] = True
+        self.post("/api/scan")
+        self.assertGreater(sum(self.account.calls.values()), calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
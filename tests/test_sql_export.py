@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import csv
+import io
+import json
+import sqlite3
+import tempfile
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sql_export import to_sql_copy, to_sql_inserts, write_sqlite
+from app import app
+
+INVENTORY = [{
+    "region": "us-east-1",
+    "topics": [{"arn": "arn:aws:sns:us-east-1:123:o'topic", "name": "o'topic"}],
+    "queues": [
+        {"arn": f"arn:aws:sqs:us-east-1:123:queue{i}", "name": f"queue{i}", "url": f"http://queue{i}"} for i in range(5)
+    ],
+    "links": [
+        {"from_arn": "arn:aws:sns:us-east-1:123:o'topic", "to_arn": "arn:aws:sqs:us-east-1:123:queue1"},
+        # Second subscription to the same queue must not break the primary key
+        {"from_arn": "arn:aws:sns:us-east-1:123:o'topic", "to_arn": "arn:aws:sqs:us-east-1:123:queue1"},
+    ]
+}]
+
+
+def counts(conn):
+    return {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in ["sns_topic", "sqs_queue", "subscription"]}
+
+
+class TestSqlExport(unittest.TestCase):
+    def test_inserts_are_batched_and_escaped(self):
+        script = to_sql_inserts(INVENTORY, batch_size=2)
+        # 1 topic batch, 3 queue batches, 1 subscription batch
+        self.assertEqual(script.count("INSERT INTO"), 5)
+
+        conn = sqlite3.connect(":memory:")
+        conn.executescript(script)
+        self.assertEqual(counts(conn), {"sns_topic": 1, "sqs_queue": 5, "subscription": 1})
+        self.assertEqual(conn.execute("SELECT name FROM sns_topic").fetchone()[0], "o'topic")
+
+    def test_copy_blocks_are_csv(self):
+        script = to_sql_copy(INVENTORY)
+        block = script.split("COPY sqs_queue (arn, name, url, region) FROM stdin WITH (FORMAT csv);\n", 1)[1]
+        data = block.split("\\.", 1)[0]
+        rows = list(csv.reader(io.StringIO(data)))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0], ["arn:aws:sqs:us-east-1:123:queue0", "queue0", "http://queue0", "us-east-1"])
+
+    def test_write_sqlite(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "inventory.sqlite")
+            result = write_sqlite(INVENTORY, path)
+            self.assertEqual(result, {"sns_topic": 1, "sqs_queue": 5, "subscription": 1})
+            conn = sqlite3.connect(path)
+            self.assertEqual(counts(conn), result)
+            conn.close()
+
+    def test_export_endpoint_modes(self):
+        client = app.test_client()
+        response = client.post('/api/export/sql', json=INVENTORY)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("INSERT INTO sqs_queue", json.loads(response.data)["content"])
+
+        response = client.post('/api/export/sql?mode=sqlite', json=INVENTORY)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data.startswith(b"SQLite format 3"))
+
+        response = client.post('/api/export/sql?mode=unknown', json=INVENTORY)
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()